@@ -0,0 +1,302 @@
+"""Benchmark the session and conversation queries of the SQL backends.
+
+Creates databases with the given number of conversation rows (one session per 10 messages) and
+measures the latency of the keyset paginated queries the app runs, as built by
+``BaseDB._build_sessions_query`` and ``BaseDB._build_conversations_query``, with and without the
+indexes added by the schema migrations.
+
+SQLite always runs. PostgreSQL runs when psycopg2 is installed and the server configured with the
+``POSTGRES_*`` variables is reachable, the data is written to a temporary schema dropped afterwards.
+
+Usage::
+
+    python benchmarks/db_queries.py --rows 10000 100000 1000000
+    python benchmarks/db_queries.py --backends postgres --rows 100000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+import uuid
+
+from contextlib import contextmanager
+
+from director.db.base import BaseDB
+from director.db.sqlite.initialize import run_migrations as run_sqlite_migrations
+
+MESSAGES_PER_SESSION = 10
+COLLECTIONS = 10
+# The handlers fetch one row more than the page to know if there is a next page
+PAGE_SIZE = 20 + 1
+
+# Indexes left by the schema migrations
+INDEXES = [
+    "idx_conversations_session_created_msg",
+    "idx_sessions_updated_at_session",
+    "idx_sessions_collection_updated_at_session",
+    "idx_sessions_video_updated_at_session",
+]
+
+
+def build_queries(placeholder, samples):
+    """Queries of the app as ``name -> function returning (sql, params)``, each call picks a new sample.
+
+    The query builders don't use the database, they are called without an instance.
+    """
+
+    def sessions(**kwargs):
+        return BaseDB._build_sessions_query(None, placeholder, **kwargs)
+
+    def conversations(session_id, **kwargs):
+        return BaseDB._build_conversations_query(
+            None, placeholder, session_id, **kwargs
+        )
+
+    def session_cursor():
+        updated_at, session_id, _ = random.choice(samples["sessions"])
+        return {"updated_at": updated_at, "session_id": session_id}
+
+    def message():
+        return random.choice(samples["messages"])
+
+    def conversations_page():
+        session_id, created_at, msg_id = message()
+        return conversations(
+            session_id,
+            limit=PAGE_SIZE,
+            cursor={"created_at": created_at, "msg_id": msg_id},
+        )
+
+    return {
+        "sessions first page": lambda: sessions(limit=PAGE_SIZE),
+        "sessions next page": lambda: sessions(
+            limit=PAGE_SIZE, cursor=session_cursor()
+        ),
+        "sessions of collection": lambda: sessions(
+            limit=PAGE_SIZE,
+            collection_id=random.choice(samples["sessions"])[2],
+            fields=["session_id", "updated_at", "metadata"],
+        ),
+        "conversations first page": lambda: conversations(
+            message()[0], limit=PAGE_SIZE
+        ),
+        "conversations next page": conversations_page,
+        "conversations all": lambda: conversations(message()[0]),
+    }
+
+
+class BackendUnavailable(Exception):
+    """The database of a backend can't be used, e.g. its driver is not installed."""
+
+
+class SQLiteBench:
+    name = "sqlite"
+    placeholder = "?"
+
+    @contextmanager
+    def connect(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.conn = sqlite3.connect(os.path.join(tmp_dir, "bench.db"))
+            try:
+                run_sqlite_migrations(self.conn)
+                yield self
+            finally:
+                self.conn.close()
+
+    def execute(self, sql, params=()):
+        cursor = self.conn.execute(sql, params)
+        return cursor.fetchall() if cursor.description else None
+
+    def insert_many(self, sql, rows):
+        self.conn.executemany(sql, rows)
+        self.conn.commit()
+
+    def add_indexes(self):
+        self.conn.execute("DELETE FROM schema_migrations WHERE version >= 3")
+        self.conn.commit()
+        run_sqlite_migrations(self.conn)
+
+    def plan(self, sql, params):
+        return " / ".join(
+            row[-1] for row in self.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        )
+
+
+class PostgresBench:
+    name = "postgres"
+    placeholder = "%s"
+
+    @contextmanager
+    def connect(self):
+        try:
+            import psycopg2
+            import psycopg2.extras
+        except ImportError:
+            raise BackendUnavailable("psycopg2 is not installed")
+
+        from director.db.postgres.initialize import run_migrations
+
+        self._execute_batch = psycopg2.extras.execute_batch
+        self._run_migrations = run_migrations
+        try:
+            self.conn = psycopg2.connect(
+                dbname=os.getenv("POSTGRES_DB", "postgres"),
+                user=os.getenv("POSTGRES_USER", "postgres"),
+                password=os.getenv("POSTGRES_PASSWORD", "postgres"),
+                host=os.getenv("POSTGRES_HOST", "localhost"),
+                port=os.getenv("POSTGRES_PORT", "5432"),
+            )
+        except psycopg2.OperationalError as e:
+            raise BackendUnavailable(f"can't connect to PostgreSQL: {e}")
+        schema = f"bench_{uuid.uuid4().hex[:8]}"
+        try:
+            self.execute(f"CREATE SCHEMA {schema}")
+            self.execute(f"SET search_path TO {schema}")
+            self.conn.commit()
+            run_migrations(self.conn)
+            yield self
+        finally:
+            self.conn.rollback()
+            self.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+            self.conn.commit()
+            self.conn.close()
+
+    def execute(self, sql, params=()):
+        with self.conn.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall() if cursor.description else None
+
+    def insert_many(self, sql, rows):
+        with self.conn.cursor() as cursor:
+            self._execute_batch(cursor, sql.replace("?", "%s"), rows, page_size=1000)
+        self.conn.commit()
+        # Fresh statistics, otherwise the planner guesses the table sizes
+        self.execute("ANALYZE")
+        self.conn.commit()
+
+    def add_indexes(self):
+        self.execute("DELETE FROM schema_migrations WHERE version >= 3")
+        self.conn.commit()
+        self._run_migrations(self.conn)
+        self.execute("ANALYZE")
+        self.conn.commit()
+
+    def plan(self, sql, params):
+        return self.execute(f"EXPLAIN {sql}", params)[0][0].strip()
+
+
+BACKENDS = {"sqlite": SQLiteBench, "postgres": PostgresBench}
+
+
+def populate(db, rows):
+    """Insert the benchmark rows and return samples of them to build the cursors from."""
+    sessions = max(rows // MESSAGES_PER_SESSION, 1)
+    now = int(time.time())
+    session_rows = [
+        (
+            f"s-{i}",
+            f"v-{i}",
+            f"c-{random.randrange(COLLECTIONS)}",
+            now - i,
+            now - random.randrange(rows),
+            "{}",
+        )
+        for i in range(sessions)
+    ]
+    db.insert_many(
+        "INSERT INTO sessions (session_id, video_id, collection_id, created_at, updated_at, metadata)"
+        " VALUES (?, ?, ?, ?, ?, ?)",
+        session_rows,
+    )
+    message_rows = [
+        (
+            f"s-{random.randrange(sessions)}",
+            f"c-{i}",
+            f"m-{i}",
+            "output",
+            "[]",
+            "[]",
+            '[{"type": "text", "text": "benchmark"}]',
+            "success",
+            now - i,
+            now - i,
+            "{}",
+        )
+        for i in range(rows)
+    ]
+    db.insert_many(
+        "INSERT INTO conversations (session_id, conv_id, msg_id, msg_type, agents, actions, content, status,"
+        " created_at, updated_at, metadata) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        message_rows,
+    )
+    return {
+        "sessions": [
+            (row[4], row[0], row[2])
+            for row in random.sample(session_rows, min(1000, sessions))
+        ],
+        "messages": [
+            (row[0], row[8], row[2])
+            for row in random.sample(message_rows, min(1000, rows))
+        ],
+    }
+
+
+def measure(db, query, runs):
+    timings = []
+    for _ in range(runs):
+        sql, params = query()
+        start = time.perf_counter()
+        db.execute(sql, params)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def run_backend(db, rows, runs):
+    with db.connect():
+        for index in INDEXES:
+            db.execute(f"DROP INDEX {index}")
+        samples = populate(db, rows)
+        queries = build_queries(db.placeholder, samples)
+
+        results = {name: [measure(db, query, runs)] for name, query in queries.items()}
+        db.add_indexes()
+        for name, query in queries.items():
+            results[name].append(measure(db, query, runs))
+            results[name].append(db.plan(*query()))
+
+    for name, (without_index, with_index, plan) in results.items():
+        print(
+            f"{db.name:>8} | {rows:>10} | {name:<24} | {without_index:>14.3f} | {with_index:>10.3f}"
+        )
+        print(f"{'':>8} | {'':>10} | plan: {plan}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument(
+        "--backends", nargs="+", choices=list(BACKENDS), default=list(BACKENDS)
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'backend':>8} | {'rows':>10} | {'query':<24} | {'no index (ms)':>14} | {'index (ms)':>10}"
+    )
+    for backend in args.backends:
+        for rows in args.rows:
+            try:
+                run_backend(BACKENDS[backend](), rows, args.runs)
+            except BackendUnavailable as e:
+                print(f"Skipping {backend}, {e}")
+                break
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import logging
+import concurrent.futures
 
 from abc import ABC, abstractmethod
 from pydantic import BaseModel
@@ -6,6 +7,12 @@ from pydantic import BaseModel
 from openai_function_calling import FunctionInferrer
 
 from director.core.session import Session, OutputMessage
+from director.utils.cancellation import (
+    CancellationToken,
+    RunCancelled,
+    cancellation_scope,
+    current_cancel_token,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +31,15 @@ class AgentResponse(BaseModel):
 
 
 class BaseAgent(ABC):
-    """Interface for all agents. All agents should inherit from this class."""
+    """Interface for all agents. All agents should inherit from this class.
+
+    Agents can be dispatched concurrently by the reasoning engine when the LLM
+    requests several tool calls in one turn. Agents which depend on shared
+    session state (e.g. ``session.reasoning_context``) should set
+    ``parallel_safe`` to ``False`` so that they always run alone.
+    """
+
+    parallel_safe: bool = True
 
     def __init__(self, session: Session, **kwargs):
         self.session: Session = session
@@ -68,9 +83,25 @@ class BaseAgent(ABC):
     def agent_description(self):
         return self.description
 
-    def safe_call(self, *args, **kwargs):
+    def safe_call(self, *args, cancel_token: CancellationToken = None, **kwargs):
+        """Run the agent and turn its errors into an error response.
+
+        :param cancel_token: Cancellation token of the run, defaults to the token of the current context.
+            It is the current token while the agent runs, so tools started by the agent can check it.
+        """
+        cancel_token = cancel_token or current_cancel_token()
         try:
-            return self.run(*args, **kwargs)
+            if cancel_token is None:
+                return self.run(*args, **kwargs)
+            cancel_token.raise_if_cancelled()
+            with cancellation_scope(cancel_token):
+                return self.run(*args, **kwargs)
+
+        except (RunCancelled, concurrent.futures.CancelledError):
+            logger.info(f"{self.agent_name} agent cancelled")
+            return AgentResponse(
+                status=AgentStatus.ERROR, message="Cancelled by the user"
+            )
 
         except Exception as e:
             logger.exception(f"error in {self.agent_name} agent: {e}")
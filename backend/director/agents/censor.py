@@ -1,6 +1,7 @@
 import json
 import logging
 import os
+import concurrent.futures
 
 from videodb.asset import VideoAsset, AudioAsset
 
@@ -15,15 +16,22 @@ from director.core.session import (
 )
 from director.llm import get_default_llm
 from director.tools.videodb_tool import VideoDBTool
+from director.utils.chunking import chunk_by_tokens
+from director.utils.profanity import ProfanityMatcher
 
 logger = logging.getLogger(__name__)
 
 BEEP_AUDIO_ID = os.getenv("BEEP_AUDIO_ID")
+# Words around an ambiguous word sent to the LLM
+CONTEXT_WORDS = 8
 DEFAULT_CENSOR_PROMPT = """
-Given the following transcript give the list of timestamps where profanity is there for censoring.
+Given the following parts of a transcript, find the words marked with * which are used as profanity and need censoring.
+"""
+TRANSCRIPT_PROMPT = """
+The words of the transcript are prefixed with their id like `12:word`.
 """
 OUTPUT_PROMPT = """
-Expected output format is json like {"timestamps": [(start, end), (start, end)]} where start and end are float in seconds
+Expected output format is json like {"word_ids": [12, 57]} with the ids of the words to censor. If there is nothing to censor return {"word_ids": []}
 """
 
 
@@ -39,6 +47,128 @@ class CensorAgent(BaseAgent):
         self.llm = get_default_llm()
         super().__init__(session=session, **kwargs)
 
+    @staticmethod
+    def _format_words(words, marked_id=None):
+        return " ".join(
+            f"{word['id']}:{'*' if word['id'] == marked_id else ''}{word['text']}"
+            for word in words
+        )
+
+    def _flag_words(self, prompt, docs):
+        """Send the docs to the LLM in parallel chunks and return the ids of the words to censor."""
+        chunks = chunk_by_tokens(
+            docs,
+            count_tokens=self.llm.count_tokens,
+            token_budget=self.llm.chunk_token_budget,
+            overlap_tokens=0,
+        )
+
+        def flag_chunk(chunk):
+            censor_llm_message = ContextMessage(
+                content=f"{prompt}{TRANSCRIPT_PROMPT}{OUTPUT_PROMPT}\n\ntranscript:\n"
+                + "\n".join(chunk),
+                role=RoleTypes.user,
+            )
+            llm_response = self.llm.chat_completions(
+                [censor_llm_message.to_llm_msg()],
+                response_format={"type": "json_object"},
+            )
+            if not llm_response.status:
+                raise Exception(f"LLM failed with {llm_response.content}")
+            return json.loads(llm_response.content).get("word_ids", [])
+
+        word_ids = set()
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.llm.max_concurrent_requests
+        ) as executor:
+            for ids in executor.map(flag_chunk, chunks):
+                word_ids.update(int(word_id) for word_id in ids)
+        return word_ids
+
+    @staticmethod
+    def _merge_timestamps(timestamps, gap=0.1):
+        """Merge overlapping or adjacent (start, end) spans into one beep timeline."""
+        merged = []
+        for start, end in sorted(timestamps):
+            if merged and start <= merged[-1][1] + gap:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    def censor_timeline(self, transcript, censor_prompt="", language_code=None):
+        """Find the timestamps to censor in the transcript.
+
+        Without a prompt the words of English transcripts are classified locally, words which are always profane
+        are censored and only the context windows of ambiguous words are checked by the LLM. Custom prompts and
+        other languages can't be matched locally, the whole transcript is then checked by the LLM in parallel
+        chunks.
+        """
+        words = [
+            {
+                "id": i,
+                "start": float(word["start"]),
+                "end": float(word["end"]),
+                "text": word["text"],
+            }
+            for i, word in enumerate(transcript)
+            if word.get("text", "").strip() not in ("", "-")
+        ]
+        words_by_id = {word["id"]: word for word in words}
+
+        # The local word lists are English, an unknown language is taken to be English like the default index
+        local_match = not censor_prompt and (
+            not language_code or language_code.lower().startswith("en")
+        )
+        if not local_match:
+            chunks = chunk_by_tokens(
+                words,
+                count_tokens=self.llm.count_tokens,
+                token_budget=self.llm.chunk_token_budget,
+                overlap_tokens=0,
+                to_text=lambda word: f"{word['id']}:{word['text']} ",
+            )
+            word_ids = self._flag_words(
+                censor_prompt or DEFAULT_CENSOR_PROMPT,
+                [self._format_words(chunk) for chunk in chunks],
+            )
+        else:
+            matcher = ProfanityMatcher()
+            word_ids = {
+                word["id"] for word in words if matcher.is_profane(word["text"])
+            }
+            ambiguous = [
+                position
+                for position, word in enumerate(words)
+                if matcher.is_ambiguous(word["text"])
+            ]
+            self.output_message.actions.append(
+                f"Found {len(word_ids)} profanities, checking {len(ambiguous)} words in context.."
+            )
+            self.output_message.push_update()
+            if ambiguous:
+                windows = [
+                    self._format_words(
+                        words[
+                            max(position - CONTEXT_WORDS, 0) : position
+                            + CONTEXT_WORDS
+                            + 1
+                        ],
+                        marked_id=words[position]["id"],
+                    )
+                    for position in ambiguous
+                ]
+                ambiguous_ids = {words[position]["id"] for position in ambiguous}
+                word_ids |= (
+                    self._flag_words(DEFAULT_CENSOR_PROMPT, windows) & ambiguous_ids
+                )
+
+        return self._merge_timestamps(
+            (words_by_id[word_id]["start"], words_by_id[word_id]["end"])
+            for word_id in word_ids
+            if word_id in words_by_id
+        )
+
     def add_beep(
         self, videodb_tool, video_id, beep_audio_id, beep_audio_length, timestamps
     ):
@@ -66,6 +196,7 @@ class CensorAgent(BaseAgent):
         video_id: str,
         beep_audio_id: str = None,
         censor_prompt: str = "",
+        language_code: str = None,
         *args,
         **kwargs,
     ) -> AgentResponse:
@@ -76,6 +207,7 @@ class CensorAgent(BaseAgent):
         :param str video_id: video_id on which adding censor needs to run.
         :param str beep_audio_id: audio id of beep asset in videodb, defaults to BEEP_AUDIO_ID
         :param str censor_prompt: direction by users on what to censor
+        :param str language_code: language of the spoken words (e.g. ``en``, ``es``) if the user mentions it
         :param args: Additional positional arguments.
         :param kwargs: Additional keyword arguments.
         :return: The response containing information about the sample processing operation.
@@ -125,32 +257,24 @@ class CensorAgent(BaseAgent):
                 beep_audio_id = beep_audio.get("id")
                 beep_audio_length = beep_audio.get("length")
             try:
-                transcript = videodb_tool.get_transcript(video_id, text=False)
+                transcript = videodb_tool.get_transcript(
+                    video_id, text=False, language_code=language_code
+                )
             except Exception:
                 logger.error("Failed to get transcript, indexing")
                 self.output_message.actions.append("Indexing the video..")
                 self.output_message.push_update()
-                videodb_tool.index_spoken_words(video_id)
-                transcript = videodb_tool.get_transcript(video_id, text=False)
-            if not censor_prompt:
-                censor_prompt = DEFAULT_CENSOR_PROMPT
+                videodb_tool.index_spoken_words(video_id, language_code=language_code)
+                transcript = videodb_tool.get_transcript(
+                    video_id, text=False, language_code=language_code
+                )
             self.output_message.actions.append(
-                f"Censoring the video with prompt: '{censor_prompt[:1000]}..'"
+                f"Censoring the video with prompt: '{(censor_prompt or DEFAULT_CENSOR_PROMPT)[:1000]}..'"
             )
             self.output_message.push_update()
-            final_censor_prompt = (
-                f"{censor_prompt}{OUTPUT_PROMPT}\n\ntranscript: {transcript}"
-            )
-            censor_llm_message = ContextMessage(
-                content=final_censor_prompt,
-                role=RoleTypes.user,
-            )
-            llm_response = self.llm.chat_completions(
-                [censor_llm_message.to_llm_msg()],
-                response_format={"type": "json_object"},
+            censor_timeline = self.censor_timeline(
+                transcript, censor_prompt, language_code
             )
-            censor_timeline_response = json.loads(llm_response.content)
-            censor_timeline = censor_timeline_response.get("timestamps")
             clean_stream = self.add_beep(
                 videodb_tool,
                 video_id,
@@ -1,7 +1,9 @@
+import time
 import logging
-import asyncio
+import threading
+import contextvars
+import concurrent.futures
 
-from director.utils.asyncio import is_event_loop_running
 from director.agents.base import BaseAgent, AgentResponse, AgentStatus
 from director.core.session import (
     Session,
@@ -12,9 +14,19 @@ from director.core.session import (
 )
 from director.agents.video_generation import VideoGenerationAgent
 from director.agents.video_generation import VIDEO_GENERATION_AGENT_PARAMETERS
+from director.utils.cancellation import (
+    CancellationToken,
+    cancellation_scope,
+    current_cancel_token,
+)
+from director.utils.env import env_int
 
 logger = logging.getLogger(__name__)
 
+# Maximum video generation runs at the same time and seconds after which a run is abandoned
+COMPARISON_MAX_PARALLEL = env_int("COMPARISON_MAX_PARALLEL", 4)
+COMPARISON_TASK_TIMEOUT = env_int("COMPARISON_TASK_TIMEOUT", 900)
+
 COMPARISON_AGENT_PARAMETERS = {
     "type": "object",
     "properties": {
@@ -53,14 +65,28 @@ class ComparisonAgent(BaseAgent):
         self.description = """Primary agent for video generation from prompts. Handles all video creation requests including single and multi-model generation. If multiple models or variations are mentioned, automatically parallelizes the work. For single model requests, delegates to specialized video generation subsystem. Keywords: generate video, create video, make video, text to video. """
 
         self.parameters = COMPARISON_AGENT_PARAMETERS
+        self.max_parallel = COMPARISON_MAX_PARALLEL
+        self.task_timeout = COMPARISON_TASK_TIMEOUT
+        self._cancel_event = threading.Event()
+        self._started_at = {}
         super().__init__(session=session, **kwargs)
 
-    def _run_video_generation(self, index, params):
-        """Helper method to run video generation with given params"""
-        video_gen_agent = VideoGenerationAgent(session=self.session)
-        res = video_gen_agent.run(**params, stealth_mode=True)
+    def _run_video_generation(self, index, params, cancel_token):
+        """Helper method to run video generation with given params
+
+        The run sees ``cancel_token`` as the token of its run, cancelling it stops the provider polls and downloads.
+        """
+        self._started_at[index] = time.monotonic()
+        with cancellation_scope(cancel_token):
+            cancel_token.raise_if_cancelled()
+            video_gen_agent = VideoGenerationAgent(session=self.session)
+            res = video_gen_agent.run(**params, stealth_mode=True)
         return index, res
 
+    def cancel(self):
+        """Cancel the video generation runs which are still pending."""
+        self._cancel_event.set()
+
     def done_callback(self, index, result):
         if result.status == AgentStatus.SUCCESS:
             self.videos_content.videos[index] = result.data["video_content"].video
@@ -75,9 +101,75 @@ class ComparisonAgent(BaseAgent):
         self.output_message.push_update()
 
     def run_tasks(self, tasks):
-        for index, task in enumerate(tasks):
-            _, task_res = self._run_video_generation(index, task)
-            self.done_callback(index, task_res)
+        """Run the video generations concurrently, at most ``max_parallel`` at a time.
+
+        Results are passed to ``done_callback`` as each run completes. Runs which take longer than
+        ``task_timeout`` seconds, or are still pending when the agent is cancelled, are reported as errors and
+        their results are discarded. Every run has its own cancellation token linked to the token of the
+        reasoning run, abandoned runs are cancelled so they stop polling and downloading.
+        """
+        if not tasks:
+            return
+        # Cancelling the reasoning run cancels the comparison and every run
+        cancel_token = current_cancel_token()
+        task_tokens = [CancellationToken() for _ in tasks]
+        remove_callbacks = []
+        if cancel_token is not None:
+            remove_callbacks.append(cancel_token.add_callback(self.cancel))
+            remove_callbacks.extend(
+                cancel_token.add_callback(task_token.cancel)
+                for task_token in task_tokens
+            )
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(self.max_parallel, len(tasks))
+        )
+        pending = {
+            executor.submit(
+                contextvars.copy_context().run,
+                self._run_video_generation,
+                index,
+                task,
+                task_tokens[index],
+            ): index
+            for index, task in enumerate(tasks)
+        }
+        try:
+            while pending:
+                done, _ = concurrent.futures.wait(
+                    pending, timeout=1, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        _, task_res = future.result()
+                    except Exception as e:
+                        logger.exception(f"Video generation {index} failed: {e}")
+                        task_res = AgentResponse(
+                            status=AgentStatus.ERROR, message=str(e)
+                        )
+                    self.done_callback(index, task_res)
+
+                now = time.monotonic()
+                for future, index in list(pending.items()):
+                    if self._cancel_event.is_set():
+                        message = "Cancelled"
+                    elif now - self._started_at.get(index, now) > self.task_timeout:
+                        message = f"Timed out after {self.task_timeout} seconds"
+                    else:
+                        continue
+                    future.cancel()
+                    task_tokens[index].cancel()
+                    del pending[future]
+                    self.done_callback(
+                        index, AgentResponse(status=AgentStatus.ERROR, message=message)
+                    )
+        finally:
+            # Abandoned runs stop at their next cancellation check, don't wait for them
+            for index in pending.values():
+                task_tokens[index].cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+            for remove_callback in remove_callbacks:
+                remove_callback()
 
     def run(
         self, job_type: str, video_generation_comparison: list, *args, **kwargs
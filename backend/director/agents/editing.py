@@ -147,6 +147,8 @@ class EditingAgent(BaseAgent):
         self.agent_name = "editing"
         self.description = "An agent designed to edit and combine videos and audio files uploaded on VideoDB."
         self.parameters = EDITING_AGENT_PARAMETERS
+        # Reads session.reasoning_context, so it must not run alongside other agents
+        self.parallel_safe = False
         super().__init__(session=session, **kwargs)
         self.timeline = None
         self.editing_response = None
@@ -11,8 +11,10 @@ from director.core.session import (
     VideoContent,
     VideoData,
 )
-from director.tools.videodb_tool import VideoDBTool
+from director.tools.videodb_tool import VideoDBTool, transcript_text
 from director.llm import get_default_llm
+from director.utils.alignment import TranscriptAligner, match_scene
+from director.utils.chunking import chunk_by_tokens, split_field, transcript_sentences
 
 logger = logging.getLogger(__name__)
 
@@ -51,16 +53,6 @@ class PromptClipAgent(BaseAgent):
         self.llm = get_default_llm()
         super().__init__(session=session, **kwargs)
 
-    def _chunk_docs(self, docs, chunk_size):
-        """
-        chunk docs to fit into context of your LLM
-        :param docs:
-        :param chunk_size:
-        :return:
-        """
-        for i in range(0, len(docs), chunk_size):
-            yield docs[i : i + chunk_size]  # Yield the current chunk
-
     def _filter_transcript(self, transcript, start, end):
         result = []
         for entry in transcript:
@@ -91,7 +83,9 @@ class PromptClipAgent(BaseAgent):
     def _prompt_runner(self, prompts):
         """Run the prompts in parallel."""
         matches = []
-        with concurrent.futures.ThreadPoolExecutor() as executor:
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.llm.max_concurrent_requests
+        ) as executor:
             future_to_index = {
                 executor.submit(
                     self.llm.chat_completions,
@@ -111,12 +105,35 @@ class PromptClipAgent(BaseAgent):
                 except Exception as e:
                     logger.exception(f"Error in getting matches: {e}")
                     continue
-        return matches
+        # Overlapping chunks can return the same sentence twice
+        unique_matches = []
+        for match in matches:
+            if match not in unique_matches:
+                unique_matches.append(match)
+        return unique_matches
 
-    def _text_prompter(self, transcript_text, prompt):
-        chunk_size = 10000
-        # sentence tokenizer
-        chunks = self._chunk_docs(transcript_text, chunk_size=chunk_size)
+    def _chunk_by_tokens(self, docs, to_text=str, split_on=None):
+        """Pack the docs into chunks that fit the token budget of the LLM.
+
+        Docs over the budget are split on the text of their ``split_on`` field.
+        """
+
+        def split(doc, budget):
+            return split_field(doc, split_on, self.llm.count_tokens, budget, to_text)
+
+        return chunk_by_tokens(
+            docs,
+            count_tokens=self.llm.count_tokens,
+            token_budget=self.llm.chunk_token_budget,
+            to_text=to_text,
+            split=split if split_on else None,
+        )
+
+    def _text_prompter(self, transcript, prompt):
+        sentences = transcript_sentences(
+            transcript, self.llm.count_tokens, self.llm.chunk_token_budget
+        )
+        chunks = [" ".join(chunk) for chunk in self._chunk_by_tokens(sentences)]
         prompts = []
         i = 0
         for chunk in chunks:
@@ -154,8 +171,11 @@ class PromptClipAgent(BaseAgent):
         return self._prompt_runner(prompts)
 
     def _scene_prompter(self, scene_index, prompt):
-        chunk_size = 10000
-        chunks = self._chunk_docs(scene_index, chunk_size=chunk_size)
+        chunks = self._chunk_by_tokens(
+            scene_index,
+            to_text=lambda scene: json.dumps(scene["description"]),
+            split_on="description",
+        )
 
         prompts = []
         i = 0
@@ -190,8 +210,7 @@ class PromptClipAgent(BaseAgent):
 
     def _multimodal_prompter(self, transcript, scene_index, prompt):
         docs = self._get_multimodal_docs(transcript, scene_index)
-        chunk_size = 80
-        chunks = self._chunk_docs(docs, chunk_size=chunk_size)
+        chunks = self._chunk_by_tokens(docs, split_on="spoken")
 
         prompts = []
         i = 0
@@ -238,18 +257,15 @@ class PromptClipAgent(BaseAgent):
         self.output_message.actions.append("Retrieving video transcript..")
         self.output_message.push_update()
         try:
-            return self.videodb_tool.get_transcript(
-                video_id
-            ), self.videodb_tool.get_transcript(video_id, text=False)
+            transcript = self.videodb_tool.get_transcript(video_id, text=False)
         except Exception:
             self.output_message.actions.append(
                 "Transcript unavailable. Indexing spoken content."
             )
             self.output_message.push_update()
             self.videodb_tool.index_spoken_words(video_id)
-            return self.videodb_tool.get_transcript(
-                video_id
-            ), self.videodb_tool.get_transcript(video_id, text=False)
+            transcript = self.videodb_tool.get_transcript(video_id, text=False)
+        return transcript_text(transcript), transcript
 
     def run(
         self,
@@ -265,8 +281,8 @@ class PromptClipAgent(BaseAgent):
             result = []
             try:
                 if content_type == "spoken_content":
-                    transcript_text, _ = self._get_transcript(video_id=video_id)
-                    result = self._text_prompter(transcript_text, prompt)
+                    _, transcript = self._get_transcript(video_id=video_id)
+                    result = self._text_prompter(transcript, prompt)
 
                 elif content_type == "visual_content":
                     scene_index_id, scenes = self._get_scenes(video_id=video_id)
@@ -284,42 +300,60 @@ class PromptClipAgent(BaseAgent):
             self.output_message.actions.append("Identifying key moments..")
             self.output_message.push_update()
             result_timestamps = []
-            with concurrent.futures.ThreadPoolExecutor() as executor:
+            unmatched = []
+            if content_type == "spoken_content":
+                aligner = TranscriptAligner(transcript)
+            for description in result:
+                if isinstance(description, dict):
+                    description = description.get("sentence", "")
                 if content_type == "spoken_content":
-                    future_to_index = {
-                        executor.submit(
-                            self.videodb_tool.keyword_search,
-                            query=description,
-                            video_id=video_id,
-                        ): description
-                        for description in result
-                    }
+                    match = aligner.align(description)
                 else:
-                    future_to_index = {
-                        executor.submit(
-                            self.videodb_tool.keyword_search,
-                            query=description,
-                            index_type="scene",
-                            video_id=video_id,
-                            scene_index_id=scene_index_id,
-                        ): description
-                        for description in result
-                    }
-
-                for future in concurrent.futures.as_completed(future_to_index):
-                    description = future_to_index[future]
-                    try:
-                        search_res = future.result()
-                        matched_segments = search_res.get_shots()
-                        video_shot = matched_segments[0]
-                        result_timestamps.append(
-                            (video_shot.start, video_shot.end, video_shot.text)
-                        )
-                    except Exception as e:
-                        logger.error(
-                            f"Error in getting timestamps of {description}: {e}"
-                        )
-                        continue
+                    match = match_scene(description, scenes)
+                if match:
+                    result_timestamps.append(match)
+                else:
+                    unmatched.append(description)
+
+            if unmatched:
+                # Search remotely only the sentences without a confident local match
+                logger.info(f"No local match for {len(unmatched)} sentences")
+                with concurrent.futures.ThreadPoolExecutor() as executor:
+                    if content_type == "spoken_content":
+                        future_to_index = {
+                            executor.submit(
+                                self.videodb_tool.keyword_search,
+                                query=description,
+                                video_id=video_id,
+                            ): description
+                            for description in unmatched
+                        }
+                    else:
+                        future_to_index = {
+                            executor.submit(
+                                self.videodb_tool.keyword_search,
+                                query=description,
+                                index_type="scene",
+                                video_id=video_id,
+                                scene_index_id=scene_index_id,
+                            ): description
+                            for description in unmatched
+                        }
+
+                    for future in concurrent.futures.as_completed(future_to_index):
+                        description = future_to_index[future]
+                        try:
+                            search_res = future.result()
+                            matched_segments = search_res.get_shots()
+                            video_shot = matched_segments[0]
+                            result_timestamps.append(
+                                (video_shot.start, video_shot.end, video_shot.text)
+                            )
+                        except Exception as e:
+                            logger.error(
+                                f"Error in getting timestamps of {description}: {e}"
+                            )
+                            continue
             if result_timestamps:
                 try:
                     self.output_message.actions.append("Key moments identified..")
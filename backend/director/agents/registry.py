@@ -0,0 +1,130 @@
+import logging
+import threading
+
+from types import SimpleNamespace
+from typing import Dict, List, Type
+
+from director.agents.base import BaseAgent
+from director.core.session import Session
+
+logger = logging.getLogger(__name__)
+
+
+class AgentSpec:
+    """Static metadata of an agent, built once from the agent class.
+
+    :param agent_class: The agent class
+    :param str name: The name of the agent
+    :param str description: The description of the agent
+    :param dict parameters: The JSON schema of the agent parameters
+    :param bool parallel_safe: Whether the agent can run alongside other agents
+    """
+
+    def __init__(
+        self,
+        agent_class: Type[BaseAgent],
+        name: str,
+        description: str,
+        parameters: dict,
+        parallel_safe: bool = True,
+    ):
+        self.agent_class = agent_class
+        self.name = name
+        self.description = description
+        self.parameters = parameters
+        self.parallel_safe = parallel_safe
+        self.llm_format = {
+            "name": name,
+            "description": description,
+            "parameters": parameters,
+        }
+
+    @classmethod
+    def from_agent_class(cls, agent_class: Type[BaseAgent]) -> "AgentSpec":
+        """Build the spec by instantiating the agent once without a session."""
+        agent = agent_class(session=SimpleNamespace(output_message=None))
+        return cls(
+            agent_class=agent_class,
+            name=agent.agent_name,
+            description=agent.description,
+            parameters=agent.parameters,
+            parallel_safe=agent.parallel_safe,
+        )
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "description": self.description}
+
+
+class AgentBinding(BaseAgent):
+    """Binding of an agent spec to a session.
+
+    The binding serves the cached metadata of the agent, the agent itself is only instantiated when it is called.
+    """
+
+    def __init__(self, spec: AgentSpec, session: Session, **kwargs):
+        self.spec = spec
+        self.agent_name = spec.name
+        self.description = spec.description
+        self.parameters = spec.parameters
+        self.parallel_safe = spec.parallel_safe
+        self._agent = None
+        self._lock = threading.Lock()
+        super().__init__(session=session, **kwargs)
+
+    @property
+    def agent(self) -> BaseAgent:
+        """The agent instance bound to the session, created on first use."""
+        with self._lock:
+            if self._agent is None:
+                self._agent = self.spec.agent_class(session=self.session)
+            return self._agent
+
+    def to_llm_format(self):
+        return self.spec.llm_format
+
+    def run(self, *args, **kwargs):
+        return self.agent.run(*args, **kwargs)
+
+
+class AgentRegistry:
+    """Registry of the agents available to the reasoning engine.
+
+    The metadata of every agent is built once when the registry is created, chats only create light bindings of
+    the agents to their session.
+
+    :param list agents: The agent classes to register
+    """
+
+    def __init__(self, agents: List[Type[BaseAgent]]):
+        self.specs: Dict[str, AgentSpec] = {}
+        for agent_class in agents:
+            self.register(agent_class)
+
+    def register(self, agent_class: Type[BaseAgent]) -> AgentSpec:
+        """Register an agent class.
+
+        :param agent_class: The agent class to register
+        :return: The spec of the agent
+        """
+        spec = AgentSpec.from_agent_class(agent_class)
+        if spec.name in self.specs:
+            logger.warning(f"Agent {spec.name} is already registered, replacing it")
+        self.specs[spec.name] = spec
+        return spec
+
+    def agents_list(self) -> List[dict]:
+        """Return the name and description of all the registered agents."""
+        return [spec.to_dict() for spec in self.specs.values()]
+
+    def bind(self, session: Session, names: List[str] = None) -> List[AgentBinding]:
+        """Bind the agents to a session.
+
+        :param session: The session of the chat
+        :param list names: Names of the agents to bind, all the agents are bound if None
+        :return: The agent bindings
+        """
+        if names is None:
+            specs = self.specs.values()
+        else:
+            specs = [self.specs[name] for name in names]
+        return [AgentBinding(spec, session=session) for spec in specs]
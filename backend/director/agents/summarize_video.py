@@ -1,12 +1,36 @@
 import logging
+import concurrent.futures
 
 from director.agents.base import BaseAgent, AgentResponse, AgentStatus
 from director.core.session import ContextMessage, RoleTypes, TextContent, MsgStatus
 from director.llm import get_default_llm
-from director.tools.videodb_tool import VideoDBTool
+from director.tools.videodb_tool import VideoDBTool, index_cache, transcript_text
+from director.utils.chunking import chunk_by_tokens, timed_sentences
 
 logger = logging.getLogger(__name__)
 
+WINDOW_SUMMARY_PROMPT = """
+Summarize the following part of a video transcript, from {start} to {end}.
+Keep the key topics, facts, names, numbers and notable moments in the order they happen, the summary will be combined with the summaries of the other parts of the video.
+
+Transcript:
+{text}
+"""
+
+REDUCE_SUMMARY_PROMPT = """
+The following are summaries of consecutive parts of a video, with their timestamps.
+
+{summaries}
+
+Use them as the transcript of the video. {prompt}
+"""
+
+
+def _format_time(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
 
 class SummarizeVideoAgent(BaseAgent):
     def __init__(self, session=None, **kwargs):
@@ -16,6 +40,90 @@ class SummarizeVideoAgent(BaseAgent):
         self.parameters = self.get_parameters()
         super().__init__(session=session, **kwargs)
 
+    def _summarize(self, content: str) -> str:
+        llm_response = self.llm.chat_completions(
+            [ContextMessage(content=content, role=RoleTypes.user).to_llm_msg()]
+        )
+        if not llm_response.status:
+            raise Exception(f"LLM failed with {llm_response.content}")
+        return llm_response.content
+
+    def _summarize_window(self, video_id: str, window: list) -> str:
+        """Summarize a window of the transcript, the summary is cached per video, window and model."""
+        start, end = window[0]["start"], window[-1]["end"]
+        key = f"window_summary:{video_id}:{start}:{end}:{self.llm.chat_model}"
+        summary = index_cache.get(key)
+        if summary is None:
+            summary = self._summarize(
+                WINDOW_SUMMARY_PROMPT.format(
+                    start=_format_time(start),
+                    end=_format_time(end),
+                    text=" ".join(sentence["text"] for sentence in window),
+                )
+            )
+            index_cache.set(key, summary)
+        return f"[{_format_time(start)} - {_format_time(end)}] {summary}"
+
+    def _map_transcript(self, video_id, transcript, prompt, output_text_content):
+        """Summarize the windows of a long transcript in parallel and build the reduce prompt.
+
+        Window summaries don't depend on the prompt, so asking again with another prompt only reruns the reduce step.
+        If the summaries are still over the token budget they are summarized again.
+        """
+        windows = chunk_by_tokens(
+            timed_sentences(
+                transcript, self.llm.count_tokens, self.llm.chunk_token_budget
+            ),
+            count_tokens=self.llm.count_tokens,
+            token_budget=self.llm.chunk_token_budget,
+            overlap_tokens=0,
+            to_text=lambda sentence: sentence["text"],
+        )
+        output_text_content.status_message = (
+            f"Summarizing the video in {len(windows)} parts.."
+        )
+        self.output_message.push_update()
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.llm.max_concurrent_requests
+        ) as executor:
+            summaries = list(
+                executor.map(
+                    lambda window: self._summarize_window(video_id, window), windows
+                )
+            )
+
+        while (
+            len(summaries) > 1
+            and self.llm.count_tokens("\n\n".join(summaries))
+            > self.llm.chunk_token_budget
+        ):
+            groups = chunk_by_tokens(
+                summaries,
+                count_tokens=self.llm.count_tokens,
+                token_budget=self.llm.chunk_token_budget,
+                overlap_tokens=0,
+            )
+            if len(groups) == len(summaries):
+                break
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.llm.max_concurrent_requests
+            ) as executor:
+                summaries = list(
+                    executor.map(
+                        lambda group: self._summarize(
+                            REDUCE_SUMMARY_PROMPT.format(
+                                summaries="\n\n".join(group),
+                                prompt="Combine them into one summary, keep the timestamps of the key moments.",
+                            )
+                        ),
+                        groups,
+                    )
+                )
+
+        return REDUCE_SUMMARY_PROMPT.format(
+            summaries="\n\n".join(summaries), prompt=prompt
+        )
+
     def run(
         self,
         collection_id: str,
@@ -45,14 +153,26 @@ class SummarizeVideoAgent(BaseAgent):
             self.output_message.push_update()
             videodb_tool = VideoDBTool(collection_id=collection_id)
             try:
-                transcript_text = videodb_tool.get_transcript(video_id)
+                transcript = videodb_tool.get_transcript(video_id, text=False)
             except Exception:
                 logger.error("Failed to get transcript, indexing")
                 self.output_message.actions.append("Indexing the video..")
                 self.output_message.push_update()
                 videodb_tool.index_spoken_words(video_id)
-                transcript_text = videodb_tool.get_transcript(video_id)
-            summary_llm_prompt = f"{transcript_text} {prompt}"
+                transcript = videodb_tool.get_transcript(video_id, text=False)
+
+            full_text = transcript_text(transcript)
+            # Transcripts which fit in one request with the prompt are summarized at once, the windows of the
+            # hierarchical summary lose details and don't see the prompt
+            single_request_budget = (
+                self.llm.context_token_budget - self.llm.count_tokens(prompt)
+            )
+            if self.llm.count_tokens(full_text) > single_request_budget:
+                summary_llm_prompt = self._map_transcript(
+                    video_id, transcript, prompt, output_text_content
+                )
+            else:
+                summary_llm_prompt = f"{full_text} {prompt}"
             summary_llm_message = ContextMessage(
                 content=summary_llm_prompt, role=RoleTypes.user
             )
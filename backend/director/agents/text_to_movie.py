@@ -2,6 +2,9 @@ import logging
 import os
 import json
 import uuid
+import threading
+import contextvars
+import concurrent.futures
 from typing import List, Optional, Dict
 from dataclasses import dataclass
 
@@ -27,10 +30,32 @@ from director.tools.elevenlabs import (
 )
 from director.tools.videodb_tool import VDBAudioGenerationTool, VDBVideoGenerationTool, VideoDBTool
 from director.constants import DOWNLOADS_PATH
+from director.utils.env import env_int
+from director.utils.cancellation import (
+    CancellationToken,
+    cancellation_scope,
+    RunCancelled,
+    current_cancel_token,
+    raise_if_cancelled,
+)
 
 
 logger = logging.getLogger(__name__)
 
+# Process-wide limit of concurrent generation jobs per engine, shared by all chats
+_engine_semaphores = {}
+_engine_semaphores_lock = threading.Lock()
+
+
+def get_engine_semaphore(engine: str) -> threading.BoundedSemaphore:
+    """Return the semaphore limiting concurrent jobs of the engine, set with ``<ENGINE>_MAX_CONCURRENT_JOBS``."""
+    with _engine_semaphores_lock:
+        if engine not in _engine_semaphores:
+            limit = env_int(f"{engine.upper()}_MAX_CONCURRENT_JOBS", 3)
+            _engine_semaphores[engine] = threading.BoundedSemaphore(max(limit, 1))
+        return _engine_semaphores[engine]
+
+
 SUPPORTED_ENGINES = ["stabilityai", "kling", "videodb"]
 SUPPORTED_AUDIO_ENGINES = ["elevenlabs", "videodb"]
 TEXT_TO_MOVIE_AGENT_PARAMETERS = {
@@ -245,99 +270,100 @@ class TextToMovieAgent(BaseAgent):
                 self.output_message.push_update()
 
                 engine_config = self.engine_configs[engine]
-                generated_videos_results = []
-
-                # Generate videos sequentially
-                for index, scene in enumerate(scenes):
-                    self.output_message.actions.append(
-                        f"Generating video for scene {index + 1}..."
-                    )
-                    self.output_message.push_update()
-
-                    suggested_duration = min(
+                for scene in scenes:
+                    scene["suggested_duration"] = min(
                         scene.get("suggested_duration", 5), engine_config.max_duration
                     )
-                    # Generate engine-specific prompt
-                    prompt = self.generate_engine_prompt(scene, visual_style, engine)
-
-                    print(f"Generating video for scene {index + 1}...")
-                    print("This is the prompt", prompt)
-
-                    video_path = f"{DOWNLOADS_PATH}/{str(uuid.uuid4())}.mp4"
-                    os.makedirs(DOWNLOADS_PATH, exist_ok=True)
+                estimated_duration = sum(
+                    scene["suggested_duration"] for scene in scenes
+                )
 
-                    video = self.video_gen_tool.text_to_video(
-                        prompt=prompt,
-                        save_at=video_path,
-                        duration=suggested_duration,
-                        config=video_gen_config,
+                # Scenes are generated concurrently and uploaded as soon as each one finishes,
+                # the background music only needs the durations and starts right away.
+                # The music has its own token, so it can be stopped when every scene failed.
+                audio_token = CancellationToken()
+                run_token = current_cancel_token()
+                remove_audio_callback = (
+                    run_token.add_callback(audio_token.cancel)
+                    if run_token is not None
+                    else None
+                )
+                executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=len(scenes) + 1
+                )
+                try:
+                    audio_future = executor.submit(
+                        contextvars.copy_context().run,
+                        self.generate_background_audio,
+                        raw_storyline,
+                        estimated_duration,
+                        audio_gen_config,
+                        audio_token,
                     )
-                    generated_videos_results.append(
-                        VideoGenResult(
-                            step_index=index, video_path=video_path, success=True, video=video
+                    scene_futures = [
+                        executor.submit(
+                            contextvars.copy_context().run,
+                            self.generate_scene_video,
+                            index,
+                            scene,
+                            visual_style,
+                            engine,
+                            video_gen_config,
                         )
-                    )
-
-                self.output_message.actions.append(
-                    f"Uploading {len(generated_videos_results)} videos to VideoDB..."
-                )
-                self.output_message.push_update()
+                        for index, scene in enumerate(scenes)
+                    ]
+                    generated_videos_results = []
+                    for future in concurrent.futures.as_completed(scene_futures):
+                        result = future.result()
+                        generated_videos_results.append(result)
+                        if result.success:
+                            scenes[result.step_index]["video"] = result.video
+                            self.output_message.actions.append(
+                                f"Scene {result.step_index + 1} ready "
+                                f"({len(generated_videos_results)}/{len(scenes)})"
+                            )
+                        else:
+                            self.output_message.actions.append(
+                                f"Scene {result.step_index + 1} failed: {result.error}"
+                            )
+                        self.output_message.push_update()
 
-                # Process videos and track duration
-                total_duration = 0
-                for result in generated_videos_results:
-                    if not result.success:
+                    failed_results = sorted(
+                        (
+                            result
+                            for result in generated_videos_results
+                            if not result.success
+                        ),
+                        key=lambda result: result.step_index,
+                    )
+                    if len(failed_results) == len(scenes):
                         raise Exception(
-                            f"Failed to generate video {result.step_index}: {result.error}"
+                            f"Failed to generate videos: {failed_results[0].error}"
                         )
-                    if result.video is None:
+                    raise_if_cancelled()
+                    try:
+                        sound_effects_media = audio_future.result()
+                    except Exception as e:
+                        # The music is stopped with the run, that is not a music failure
+                        raise_if_cancelled()
+                        logger.exception(f"Failed to generate background music: {e}")
                         self.output_message.actions.append(
-                            f"Uploading video {result.step_index + 1}..."
+                            "Background music failed, continuing without it..."
                         )
                         self.output_message.push_update()
-                        media = self.videodb_tool.upload(
-                            result.video_path,
-                            source_type="file_path",
-                            media_type="video",
-                        )
-                    else:
-                        media = result.video
-
-                    total_duration += float(media.get("length", 0))
-                    scenes[result.step_index]["video"] = media
-
-                    if os.path.exists(result.video_path):
-                        os.remove(result.video_path)
-
-                # Generate audio prompt
-                sound_effects_description = self.generate_audio_prompt(raw_storyline)
-
-                self.output_message.actions.append("Generating background music...")
-                self.output_message.push_update()
-
-                # Generate and add sound effects
-                os.makedirs(DOWNLOADS_PATH, exist_ok=True)
-                sound_effects_path = f"{DOWNLOADS_PATH}/{str(uuid.uuid4())}.mp3"
-
-                sound_effects_media = self.audio_gen_tool.generate_sound_effect(
-                    prompt=sound_effects_description,
-                    save_at=sound_effects_path,
-                    duration=total_duration,
-                    config=audio_gen_config,
-                )
-
-                if sound_effects_media is None:
-                    self.output_message.actions.append(
-                        "Uploading background music to VideoDB..."
-                    )
-                    self.output_message.push_update()
-
-                    sound_effects_media = self.videodb_tool.upload(
-                        sound_effects_path, source_type="file_path", media_type="audio"
-                    )
-
-                if os.path.exists(sound_effects_path):
-                    os.remove(sound_effects_path)
+                        sound_effects_media = None
+                except BaseException:
+                    # Stop the background music of a failed run instead of waiting for it
+                    audio_token.cancel()
+                    raise
+                finally:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    if remove_audio_callback is not None:
+                        remove_audio_callback()
+
+                scenes = [scene for scene in scenes if scene.get("video")]
+                # Don't combine and upload a partial movie after the user cancelled
+                raise_if_cancelled()
 
                 self.output_message.actions.append(
                     "Combining assets into final video..."
@@ -349,18 +375,37 @@ class TextToMovieAgent(BaseAgent):
 
                 video_content.video = VideoData(stream_url=final_video)
                 video_content.status = MsgStatus.success
-                video_content.status_message = "Movie generation complete"
+                if failed_results:
+                    failed_scenes = ", ".join(
+                        str(result.step_index + 1) for result in failed_results
+                    )
+                    message = f"Movie generated without scenes {failed_scenes} which failed to generate"
+                    video_content.status_message = message
+                else:
+                    message = "Movie generated successfully"
+                    video_content.status_message = "Movie generation complete"
                 self.output_message.publish()
 
                 return AgentResponse(
                     status=AgentStatus.SUCCESS,
-                    message="Movie generated successfully",
-                    data={"video_url": final_video},
+                    message=message,
+                    data={
+                        "video_url": final_video,
+                        "failed_scenes": [
+                            {"scene": result.step_index + 1, "error": result.error}
+                            for result in failed_results
+                        ],
+                    },
                 )
 
             else:
                 raise ValueError(f"Unsupported job type: {job_type}")
 
+        except RunCancelled:
+            video_content.status = MsgStatus.error
+            video_content.status_message = "Movie generation cancelled"
+            self.output_message.publish()
+            raise
         except Exception as e:
             logger.exception(f"Error in {self.agent_name} agent: {e}")
             video_content.status = MsgStatus.error
@@ -370,6 +415,119 @@ class TextToMovieAgent(BaseAgent):
                 status=AgentStatus.ERROR, message=f"Agent failed with error: {str(e)}"
             )
 
+    def generate_scene_video(
+        self,
+        index: int,
+        scene: dict,
+        visual_style: VisualStyle,
+        engine: str,
+        video_gen_config: dict,
+    ) -> VideoGenResult:
+        """Generate and upload the video of a scene, errors are returned in the result.
+
+        :raises RunCancelled: If the run is cancelled
+        """
+        video_path = f"{DOWNLOADS_PATH}/{str(uuid.uuid4())}.mp4"
+        try:
+            # Generate engine-specific prompt
+            prompt = self.generate_engine_prompt(scene, visual_style, engine)
+            print(f"Generating video for scene {index + 1}...")
+            print("This is the prompt", prompt)
+            os.makedirs(DOWNLOADS_PATH, exist_ok=True)
+
+            with get_engine_semaphore(engine):
+                # Scenes still waiting for a slot don't start once the run is cancelled
+                raise_if_cancelled()
+                self.output_message.actions.append(
+                    f"Generating video for scene {index + 1}..."
+                )
+                self.output_message.push_update()
+                video = self.video_gen_tool.text_to_video(
+                    prompt=prompt,
+                    save_at=video_path,
+                    duration=scene["suggested_duration"],
+                    config=video_gen_config,
+                )
+
+            if video is None:
+                self.output_message.actions.append(f"Uploading video {index + 1}...")
+                self.output_message.push_update()
+                video = self.videodb_tool.upload(
+                    video_path,
+                    source_type="file_path",
+                    media_type="video",
+                )
+            return VideoGenResult(
+                step_index=index, video_path=video_path, success=True, video=video
+            )
+        except RunCancelled:
+            # A cancelled scene stops the run instead of being reported as a failed scene
+            raise
+        except Exception as e:
+            logger.exception(f"Failed to generate video for scene {index + 1}: {e}")
+            return VideoGenResult(
+                step_index=index, video_path=video_path, success=False, error=str(e)
+            )
+        finally:
+            if os.path.exists(video_path):
+                os.remove(video_path)
+
+    def generate_background_audio(
+        self,
+        storyline: str,
+        duration: float,
+        audio_gen_config: dict,
+        cancel_token: CancellationToken = None,
+    ) -> Optional[dict]:
+        """Generate and upload the background music of the movie.
+
+        :param cancel_token: Token stopping the generation between steps and in the provider polls and downloads,
+            defaults to the token of the run
+        """
+        cancel_token = cancel_token or current_cancel_token() or CancellationToken()
+        with cancellation_scope(cancel_token):
+            return self._generate_background_audio(
+                storyline, duration, audio_gen_config, cancel_token
+            )
+
+    def _generate_background_audio(
+        self,
+        storyline: str,
+        duration: float,
+        audio_gen_config: dict,
+        cancel_token: CancellationToken,
+    ) -> Optional[dict]:
+        sound_effects_description = self.generate_audio_prompt(storyline)
+        cancel_token.raise_if_cancelled()
+
+        self.output_message.actions.append("Generating background music...")
+        self.output_message.push_update()
+
+        os.makedirs(DOWNLOADS_PATH, exist_ok=True)
+        sound_effects_path = f"{DOWNLOADS_PATH}/{str(uuid.uuid4())}.mp3"
+        try:
+            sound_effects_media = self.audio_gen_tool.generate_sound_effect(
+                prompt=sound_effects_description,
+                save_at=sound_effects_path,
+                duration=duration,
+                config=audio_gen_config,
+            )
+            cancel_token.raise_if_cancelled()
+
+            if sound_effects_media is None:
+                self.output_message.actions.append(
+                    "Uploading background music to VideoDB..."
+                )
+                self.output_message.push_update()
+
+                sound_effects_media = self.videodb_tool.upload(
+                    sound_effects_path, source_type="file_path", media_type="audio"
+                )
+            return sound_effects_media
+        finally:
+            if os.path.exists(sound_effects_path):
+                os.remove(sound_effects_path)
+
     def generate_visual_style(self, storyline: str) -> VisualStyle:
         """Generate consistent visual style for entire film."""
         style_prompt = f"""
@@ -521,6 +679,11 @@ class TextToMovieAgent(BaseAgent):
         return llm_response.content[:100]
 
     def combine_assets(self, scenes: List[dict], audio_media: Optional[dict]) -> str:
+        """Put the scene videos in order with the background music over them.
+
+        The music is generated for the estimated duration of every scene while they are generated, it is cut
+        to the length of the scenes that made it into the movie.
+        """
         timeline = self.videodb_tool.get_and_set_timeline()
 
         # Add videos sequentially
@@ -530,8 +693,16 @@ class TextToMovieAgent(BaseAgent):
 
         # Add background score if available
         if audio_media:
+            movie_length = sum(
+                float(scene["video"].get("length") or scene["suggested_duration"])
+                for scene in scenes
+            )
+            audio_length = float(audio_media.get("length") or movie_length)
             audio_asset = AudioAsset(
-                asset_id=audio_media["id"], start=0, disable_other_tracks=True
+                asset_id=audio_media["id"],
+                start=0,
+                end=min(audio_length, movie_length),
+                disable_other_tracks=True,
             )
             timeline.add_overlay(0, audio_asset)
 
@@ -1,3 +1,5 @@
+import os
+
 from enum import Enum
 
 
@@ -14,6 +16,10 @@ class DBType(str, Enum):
     POSTGRES = "postgres"
 
 
+class JobQueueType(str, Enum):
+    LOCAL = "local"
+
+
 class LLMType(str, Enum):
     """Enum for LLM types"""
 
@@ -31,3 +37,6 @@ class EnvPrefix(str, Enum):
     GOOGLEAI_ = "GOOGLEAI_"
 
 DOWNLOADS_PATH="director/downloads"
+
+# Default directory of the transcript cache and the resumable upload sessions, outside of the source tree
+DATA_PATH = os.path.join(os.path.expanduser("~"), ".director")
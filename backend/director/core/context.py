@@ -0,0 +1,187 @@
+import json
+import logging
+
+from typing import List
+
+from director.core.session import ContextMessage, RoleTypes
+from director.llm.base import BaseLLM
+
+logger = logging.getLogger(__name__)
+
+
+class ContextWindow:
+    """Fits the reasoning context into the token budget of the LLM.
+
+    The reasoning context of a session grows with every turn, this class builds the list of LLM messages sent for a step without modifying the stored context:
+
+    * The system prompt and the most recent turns are always kept verbatim.
+    * Tool outputs of older turns are truncated to ``max_tool_output_tokens``.
+    * If the context is still over budget, the oldest turns are dropped as a whole, so assistant tool calls are never separated from their tool results.
+    * As a last resort, tool outputs of the recent turns are truncated too, then their oldest messages are dropped, keeping the latest user message and each assistant tool call with its results.
+    """
+
+    def __init__(
+        self,
+        llm: BaseLLM,
+        token_budget: int = None,
+        keep_recent_turns: int = 2,
+        max_tool_output_tokens: int = 500,
+    ):
+        """
+        :param BaseLLM llm: The LLM used to count tokens.
+        :param int token_budget: Maximum tokens of the context, defaults to ``context_token_budget`` of the LLM config.
+        :param int keep_recent_turns: Number of most recent turns to keep verbatim.
+        :param int max_tool_output_tokens: Maximum tokens of a tool output in older turns.
+        """
+        self.llm = llm
+        self.token_budget = token_budget or llm.context_token_budget
+        self.keep_recent_turns = keep_recent_turns
+        self.max_tool_output_tokens = max_tool_output_tokens
+
+    def count_message_tokens(self, message: dict) -> int:
+        """Count the tokens of an LLM message."""
+        content = message.get("content") or ""
+        if not isinstance(content, str):
+            content = json.dumps(content)
+        tokens = self.llm.count_tokens(content) + 4
+        if message.get("tool_calls"):
+            tokens += self.llm.count_tokens(json.dumps(message["tool_calls"]))
+        return tokens
+
+    def _truncate(self, message: dict) -> dict:
+        content = message.get("content")
+        if not isinstance(content, str):
+            return message
+        tokens = self.llm.count_tokens(content)
+        if tokens <= self.max_tool_output_tokens:
+            return message
+        keep_chars = len(content) * self.max_tool_output_tokens // tokens
+        return {
+            **message,
+            "content": f"{content[:keep_chars]}... [truncated {tokens - self.max_tool_output_tokens} tokens of the tool output]",
+        }
+
+    def _split_turns(self, messages: List[dict]) -> List[List[dict]]:
+        """Split messages into turns, each turn starts with a user message."""
+        turns = []
+        for message in messages:
+            if message["role"] == RoleTypes.user or not turns:
+                turns.append([])
+            turns[-1].append(message)
+        return turns
+
+    def build(self, context: List[ContextMessage]) -> List[dict]:
+        """Build the LLM messages for the given reasoning context.
+
+        :param list context: The reasoning context messages.
+        :return: The LLM messages that fit into the token budget.
+        :rtype: List[dict]
+        """
+        messages = [message.to_llm_msg() for message in context]
+        system = []
+        if messages and messages[0]["role"] == RoleTypes.system:
+            system, messages = messages[:1], messages[1:]
+
+        turns = self._split_turns(messages)
+        recent_turns = (
+            turns[-self.keep_recent_turns :] if self.keep_recent_turns else []
+        )
+        old_turns = turns[: len(turns) - len(recent_turns)]
+        old_turns = [
+            [
+                (
+                    self._truncate(message)
+                    if message["role"] == RoleTypes.tool
+                    else message
+                )
+                for message in turn
+            ]
+            for turn in old_turns
+        ]
+
+        def turn_tokens(turn):
+            return sum(self.count_message_tokens(message) for message in turn)
+
+        total_tokens = turn_tokens(system) + sum(
+            turn_tokens(turn) for turn in old_turns + recent_turns
+        )
+        dropped = 0
+        while old_turns and total_tokens > self.token_budget:
+            total_tokens -= turn_tokens(old_turns.pop(0))
+            dropped += 1
+        if dropped:
+            logger.info(
+                f"Dropped {dropped} old turns from the context to fit {self.token_budget} tokens"
+            )
+
+        recent_messages = [message for turn in recent_turns for message in turn]
+        if total_tokens > self.token_budget:
+            recent_messages = self._fit_recent(
+                recent_messages, self.token_budget - turn_tokens(system)
+            )
+
+        return (
+            system
+            + [message for turn in old_turns for message in turn]
+            + recent_messages
+        )
+
+    def _fit_recent(self, messages: List[dict], token_budget: int) -> List[dict]:
+        """Fit the messages of the recent turns into the budget left by the system prompt."""
+        messages = [
+            self._truncate(message) if message["role"] == RoleTypes.tool else message
+            for message in messages
+        ]
+
+        # An assistant message and its tool results are kept or dropped together
+        groups = []
+        for message in messages:
+            if message["role"] == RoleTypes.tool and groups:
+                groups[-1].append(message)
+            else:
+                groups.append([message])
+        sizes = [
+            sum(self.count_message_tokens(message) for message in group)
+            for group in groups
+        ]
+        # Earlier turns are dropped whole, so the context still starts with a user message. The last turn keeps
+        # its user message and loses its oldest answers.
+        starts = [
+            index
+            for index, group in enumerate(groups)
+            if group[0]["role"] == RoleTypes.user
+        ]
+        if not starts or starts[0] != 0:
+            starts.insert(0, 0)
+        turns = [
+            range(start, end) for start, end in zip(starts, starts[1:] + [len(groups)])
+        ]
+        last_turn = turns[-1]
+        candidates = [list(turn) for turn in turns[:-1]] + [
+            [index]
+            for index in last_turn
+            if index != last_turn.start or groups[index][0]["role"] != RoleTypes.user
+        ]
+
+        total_tokens = sum(sizes)
+        kept = set(range(len(groups)))
+        for indices in candidates:
+            if total_tokens <= token_budget:
+                break
+            for index in indices:
+                kept.discard(index)
+                total_tokens -= sizes[index]
+        if len(kept) < len(groups):
+            logger.info(
+                f"Dropped {len(groups) - len(kept)} messages of the recent turns from the context to fit {self.token_budget} tokens"
+            )
+        if total_tokens > token_budget:
+            logger.warning(
+                f"The context still takes {total_tokens} tokens after trimming, over the budget of {token_budget} tokens"
+            )
+        return [
+            message
+            for index, group in enumerate(groups)
+            if index in kept
+            for message in group
+        ]
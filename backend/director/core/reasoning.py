@@ -1,8 +1,13 @@
 import logging
+import contextvars
+import concurrent.futures
+
 from typing import List
 
 
 from director.agents.base import BaseAgent, AgentStatus, AgentResponse
+from director.core.context import ContextWindow
+from director.tools.videodb_tool import media_cache
 from director.core.session import (
     Session,
     OutputMessage,
@@ -12,8 +17,11 @@ from director.core.session import (
     TextContent,
     MsgStatus,
 )
+from director.core.runs import active_runs
 from director.llm.base import LLMResponse
 from director.llm import get_default_llm
+from director.utils.cancellation import CancellationToken, cancellation_scope
+from director.utils.env import env_int
 
 
 logger = logging.getLogger(__name__)
@@ -103,9 +111,13 @@ class ReasoningEngine:
         self.session = session
         self.system_prompt = REASONING_SYSTEM_PROMPT
         self.max_iterations = 10
+        self.max_parallel_agents = env_int("MAX_PARALLEL_AGENTS", 4)
         self.llm = get_default_llm()
+        self.context_window = ContextWindow(llm=self.llm)
         self.agents: List[BaseAgent] = []
+        self.tools: List[dict] = []
         self.stop_flag = False
+        self.cancel_token = CancellationToken()
         self.output_message: OutputMessage = self.session.output_message
         self.summary_content = None
         self.failed_agents = []
@@ -116,6 +128,7 @@ class ReasoningEngine:
         :param agents: The list of agents to register.
         """
         self.agents.extend(agents)
+        self.tools = [agent.to_llm_format() for agent in self.agents]
 
     def build_context(self):
         """Build the context for the reasoning engine it adds the information about the video or collection to the reasoning context."""
@@ -135,6 +148,7 @@ class ReasoningEngine:
                 )
             else:
                 videos = self.session.state["collection"].get_videos()
+                media_cache.seed_videos(videos)
                 video_title_list = []
                 for video in videos:
                     video_title_list.append(
@@ -142,6 +156,7 @@ class ReasoningEngine:
                     )
                 video_titles = "\n".join(video_title_list)
                 images = self.session.state["collection"].get_images()
+                media_cache.seed_images(images)
                 image_title_list = []
                 for image in images:
                     image_title_list.append(
@@ -176,6 +191,17 @@ class ReasoningEngine:
         self.output_message.push_update()
         return self.summary_content
 
+    def _on_summary_delta(self, delta: str):
+        """Append a streamed piece of the summary and push it to the client without storing it."""
+        self.summary_content.text += delta
+        self.output_message.push_update(persist=False)
+
+    def get_agent(self, agent_name: str) -> BaseAgent:
+        """Get a registered agent by its name."""
+        return next(
+            (agent for agent in self.agents if agent.agent_name == agent_name), None
+        )
+
     def run_agent(self, agent_name: str, *args, **kwargs) -> AgentResponse:
         """Run an agent with the given name and arguments.
 
@@ -187,18 +213,88 @@ class ReasoningEngine:
         print("-" * 40, f"Running {agent_name} Agent", "-" * 40)
         print(kwargs, "\n\n")
 
-        agent = next(
-            (agent for agent in self.agents if agent.agent_name == agent_name), None
-        )
+        agent = self.get_agent(agent_name)
+        if self.cancel_token.cancelled:
+            return AgentResponse(
+                status=AgentStatus.ERROR, message="Cancelled by the user"
+            )
         self.output_message.actions.append(f"Running @{agent_name} agent")
         self.output_message.agents.append(agent_name)
         self.output_message.push_update()
-        return agent.safe_call(*args, **kwargs)
+        return agent.safe_call(*args, cancel_token=self.cancel_token, **kwargs)
+
+    def _run_tool_call(self, tool_call: dict) -> AgentResponse:
+        return self.run_agent(
+            tool_call["tool"]["name"],
+            **tool_call["tool"]["arguments"],
+        )
+
+    def _run_tool_call_batch(self, tool_calls: List[dict]) -> List[AgentResponse]:
+        """Run a batch of tool calls concurrently, results are in the order of the tool calls."""
+        if len(tool_calls) == 1:
+            return [self._run_tool_call(tool_calls[0])]
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(self.max_parallel_agents, len(tool_calls))
+        ) as executor:
+            # Each worker gets its own copy of the context so that socket emits
+            # still find the request context of the chat event.
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run, self._run_tool_call, tool_call
+                )
+                for tool_call in tool_calls
+            ]
+            return [future.result() for future in futures]
+
+    def run_tool_calls(self, tool_calls: List[dict]) -> List[AgentResponse]:
+        """Run the tool calls requested by the LLM in a single turn.
+
+        Consecutive calls to different ``parallel_safe`` agents are run concurrently with
+        at most ``max_parallel_agents`` workers. Agents which opt out, and repeated calls
+        to the same agent, run on their own.
+
+        :param list tool_calls: The tool calls from the LLM response
+        :return: The agent responses in the same order as the tool calls
+        :rtype: List[AgentResponse]
+        """
+        responses = []
+        batch = []
+        for tool_call in tool_calls:
+            agent = self.get_agent(tool_call["tool"]["name"])
+            can_batch = (
+                self.max_parallel_agents > 1
+                and agent is not None
+                and agent.parallel_safe
+            )
+            if batch and (
+                not can_batch
+                or tool_call["tool"]["name"]
+                in [call["tool"]["name"] for call in batch]
+            ):
+                responses.extend(self._run_tool_call_batch(batch))
+                batch = []
+            if can_batch:
+                batch.append(tool_call)
+            else:
+                responses.append(self._run_tool_call(tool_call))
+        if batch:
+            responses.extend(self._run_tool_call_batch(batch))
+        return responses
 
     def stop(self):
         """Flag the tool to stop processing and exit the run() thread."""
         self.stop_flag = True
 
+    def cancel(self):
+        """Cancel the run on behalf of the user.
+
+        The engine stops after the current step, running agents and the tools they started see the
+        cancellation token and give up at their next check.
+        """
+        self.cancel_token.cancel()
+        self.stop()
+
     def step(self):
         """Run a single step of the reasoning engine."""
         status = AgentStatus.ERROR
@@ -213,17 +309,14 @@ class ReasoningEngine:
             tries += 1
             if tries > max_tries:
                 break
-            print("-" * 40, "Context", "-" * 40)
-            print(
-                [message.to_llm_msg() for message in self.session.reasoning_context],
-                "\n\n",
+            context_messages = self.context_window.build(
+                self.session.reasoning_context
             )
+            print("-" * 40, "Context", "-" * 40)
+            print(context_messages, "\n\n")
             llm_response: LLMResponse = self.llm.chat_completions(
-                messages=[
-                    message.to_llm_msg() for message in self.session.reasoning_context
-                ]
-                + temp_messages,
-                tools=[agent.to_llm_format() for agent in self.agents],
+                messages=context_messages + temp_messages,
+                tools=self.tools,
             )
             logger.info(f"LLM Response: {llm_response}")
 
@@ -253,11 +346,10 @@ class ReasoningEngine:
                         role=RoleTypes.assistant,
                     )
                 )
-                for tool_call in llm_response.tool_calls:
-                    agent_response: AgentResponse = self.run_agent(
-                        tool_call["tool"]["name"],
-                        **tool_call["tool"]["arguments"],
-                    )
+                agent_responses = self.run_tool_calls(llm_response.tool_calls)
+                for tool_call, agent_response in zip(
+                    llm_response.tool_calls, agent_responses
+                ):
                     if agent_response.status == AgentStatus.ERROR:
                         self.failed_agents.append(tool_call["tool"]["name"])
                     self.session.reasoning_context.append(
@@ -299,11 +391,14 @@ class ReasoningEngine:
                             role=RoleTypes.system,
                         )
                     )
-                    summary_response = self.llm.chat_completions(
+                    # Stream the summary, the complete text is stored once at the end
+                    self.summary_content.text = ""
+                    summary_response = self.llm.stream_chat_completions(
                         messages=[
                             message.to_llm_msg()
                             for message in self.get_current_run_context()
-                        ]
+                        ],
+                        on_delta=self._on_summary_delta,
                     )
                     self.session.reasoning_context.pop()
                     self.summary_content.text = summary_response.content
@@ -324,19 +419,34 @@ class ReasoningEngine:
         :param int max_iterations: The number of max_iterations to run the reasoning engine
         """
         self.iterations = max_iterations or self.max_iterations
-        self.build_context()
-        self.output_message.actions.append("Reasoning the message..")
-        self.output_message.push_update()
-
-        it = 0
-        while self.iterations > 0:
-            self.iterations -= 1
-            print("-" * 40, "Reasoning Engine Iteration", it, "-" * 40)
-            if self.stop_flag:
-                break
-
-            self.step()
-            it = it + 1
+        active_runs.register(self.session.session_id, self.session.conv_id, self)
+        try:
+            with cancellation_scope(self.cancel_token):
+                self.build_context()
+                self.output_message.actions.append("Reasoning the message..")
+                self.output_message.push_update()
+
+                it = 0
+                while self.iterations > 0:
+                    self.iterations -= 1
+                    print("-" * 40, "Reasoning Engine Iteration", it, "-" * 40)
+                    if self.stop_flag:
+                        break
+
+                    self.step()
+                    it = it + 1
+        finally:
+            active_runs.unregister(self.session.session_id, self.session.conv_id, self)
+
+        if (
+            self.cancel_token.cancelled
+            and self.output_message.status == MsgStatus.progress
+        ):
+            if self.summary_content:
+                self.remove_summary_content()
+            self.output_message.actions.append("Cancelled by the user")
+            self.output_message.status = MsgStatus.error
+            self.output_message.publish()
 
         self.session.save_context_messages()
         print("-" * 40, "Reasoning Engine Finished", "-" * 40)
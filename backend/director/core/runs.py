@@ -0,0 +1,50 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class RunRegistry:
+    """Registry of the reasoning runs in progress, keyed by session and conversation.
+
+    The reasoning engine registers itself for the duration of :meth:`ReasoningEngine.run`, so a cancel
+    request coming from any socket or worker can reach it.
+    """
+
+    def __init__(self):
+        self._runs = {}
+        self._lock = threading.Lock()
+
+    def register(self, session_id: str, conv_id: str, engine):
+        with self._lock:
+            self._runs[(session_id, conv_id)] = engine
+
+    def unregister(self, session_id: str, conv_id: str, engine=None):
+        with self._lock:
+            if engine is None or self._runs.get((session_id, conv_id)) is engine:
+                self._runs.pop((session_id, conv_id), None)
+
+    def get(self, session_id: str, conv_id: str):
+        with self._lock:
+            return self._runs.get((session_id, conv_id))
+
+    def cancel(self, session_id: str, conv_id: str = None) -> int:
+        """Cancel the run of a conversation, or every run of the session if ``conv_id`` is None.
+
+        :return: Number of runs cancelled
+        """
+        with self._lock:
+            engines = [
+                engine
+                for (run_session_id, run_conv_id), engine in self._runs.items()
+                if run_session_id == session_id
+                and (conv_id is None or run_conv_id == conv_id)
+            ]
+        for engine in engines:
+            engine.cancel()
+        if engines:
+            logger.info(f"Cancelled {len(engines)} run(s) of session {session_id}")
+        return len(engines)
+
+
+active_runs = RunRegistry()
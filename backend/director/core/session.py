@@ -1,13 +1,28 @@
+import os
 import json
+import time
+import weakref
+import threading
+import contextvars
 
 from enum import Enum
 from datetime import datetime
 from typing import Optional, List, Union
 
 from flask_socketio import emit
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, PrivateAttr
 
 from director.db.base import BaseDB
+from director.utils.env import env_float, env_int
+from director.utils.json_diff import json_diff
+
+# Minimum seconds between socket emits of progress updates of an output message
+OUTPUT_PUBLISH_INTERVAL = env_float("OUTPUT_PUBLISH_INTERVAL", 0.3)
+# Minimum seconds between database writes of progress updates of an output message
+OUTPUT_PERSIST_INTERVAL = env_float("OUTPUT_PERSIST_INTERVAL", 5)
+
+# Output messages which are still being generated, keyed by msg_id, used to answer resync requests
+_active_output_messages = weakref.WeakValueDictionary()
 
 
 class RoleTypes(str, Enum):
@@ -213,21 +228,71 @@ class InputMessage(BaseMessage):
 
 
 class OutputMessage(BaseMessage):
-    """Output message from the director. This class is used to create the output message from the director."""
+    """Output message from the director. This class is used to create the output message from the director.
+
+    Agents may run concurrently and share the same output message, publishing is guarded by a lock so that socket emits and database writes stay consistent.
+    Progress updates are coalesced: at most one emit per ``OUTPUT_PUBLISH_INTERVAL`` seconds and one database write per ``OUTPUT_PERSIST_INTERVAL`` seconds,
+    while :meth:`publish` and terminal statuses are always emitted and stored right away.
+
+    With delta updates enabled, the first emit is a full ``chat`` snapshot and subsequent emits are ``chat_delta`` events::
+
+        {"msg_id": "...", "session_id": "...", "conv_id": "...", "seq": 4, "ops": [{"op": "replace", "path": "/content/0/status", "value": "success"}]}
+
+    ``ops`` are JSON patch operations to apply on the snapshot with ``seq - 1``. Clients that miss a sequence number send a ``resync`` event to get the latest snapshot.
+    """
 
     db: BaseDB = Field(exclude=True)
     msg_type: MsgType = MsgType.output
     status: MsgStatus = MsgStatus.progress
+    _lock: threading.RLock = PrivateAttr(default_factory=threading.RLock)
+    _timer: Optional[threading.Timer] = PrivateAttr(default=None)
+    _last_emit_at: float = PrivateAttr(default=0)
+    _last_persist_at: float = PrivateAttr(default=0)
+    _persist_pending: bool = PrivateAttr(default=False)
+    _delta_updates: bool = PrivateAttr(default=False)
+    _seq: int = PrivateAttr(default=0)
+    _last_snapshot: Optional[dict] = PrivateAttr(default=None)
+
+    def enable_delta_updates(self):
+        """Send JSON patch deltas instead of the full message after the first snapshot."""
+        self._delta_updates = True
+        _active_output_messages[self.msg_id] = self
+
+    def get_snapshot(self) -> dict:
+        """Get the last emitted state of the message along with its sequence number."""
+        with self._lock:
+            if self._last_snapshot is None:
+                return None
+            return {**self._last_snapshot, "seq": self._seq}
 
     def update_status(self, status: MsgStatus):
         """Update the status of the message and publish the message to the socket. for loading state."""
         self.status = status
         self._publish()
 
-    def push_update(self):
-        """Publish the message to the socket."""
+    def push_update(self, persist: bool = True):
+        """Publish the message to the socket, rapid updates are merged into a single emit.
+
+        :param bool persist: Whether the update may be stored in the database, set it to False for transient
+            updates such as streamed text which is stored once complete
+        """
         try:
-            self._publish()
+            if self.status in (MsgStatus.success, MsgStatus.error):
+                self._publish()
+                return
+
+            with self._lock:
+                self._persist_pending = self._persist_pending or persist
+                delay = self._last_emit_at + OUTPUT_PUBLISH_INTERVAL - time.monotonic()
+                if delay <= 0:
+                    self._publish(persist=self._should_persist())
+                elif self._timer is None:
+                    # Emit the latest state once the interval is over, the copied context keeps the socket request context
+                    self._timer = threading.Timer(
+                        delay, contextvars.copy_context().run, args=(self._flush,)
+                    )
+                    self._timer.daemon = True
+                    self._timer.start()
         except Exception as e:
             print(f"Error in emitting message: {str(e)}")
 
@@ -235,12 +300,56 @@ class OutputMessage(BaseMessage):
         """Store the message in the database. for conversation history and publish the message to the socket."""
         self._publish()
 
-    def _publish(self):
-        try:
-            emit("chat", self.model_dump(), namespace="/chat")
-        except Exception as e:
-            print(f"Error in emitting message: {str(e)}")
-        self.db.add_or_update_msg_to_conv(**self.model_dump())
+    def _should_persist(self) -> bool:
+        return (
+            self._persist_pending
+            and time.monotonic() - self._last_persist_at >= OUTPUT_PERSIST_INTERVAL
+        )
+
+    def _flush(self):
+        with self._lock:
+            self._timer = None
+            self._publish(persist=self._should_persist())
+
+    def _emit(self, message: dict):
+        if not self._delta_updates:
+            emit("chat", message, namespace="/chat")
+            return
+
+        last_snapshot, self._last_snapshot = self._last_snapshot, message
+        self._seq += 1
+        if last_snapshot is None:
+            emit("chat", {**message, "seq": self._seq}, namespace="/chat")
+        else:
+            emit(
+                "chat_delta",
+                {
+                    "msg_id": self.msg_id,
+                    "session_id": self.session_id,
+                    "conv_id": self.conv_id,
+                    "seq": self._seq,
+                    "ops": json_diff(last_snapshot, message),
+                },
+                namespace="/chat",
+            )
+        if self.status in (MsgStatus.success, MsgStatus.error):
+            _active_output_messages.pop(self.msg_id, None)
+
+    def _publish(self, persist: bool = True):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            message = self.model_dump()
+            try:
+                self._emit(message)
+            except Exception as e:
+                print(f"Error in emitting message: {str(e)}")
+            self._last_emit_at = time.monotonic()
+            if persist:
+                self.db.add_or_update_msg_to_conv(**message)
+                self._last_persist_at = self._last_emit_at
+                self._persist_pending = False
 
 
 def format_user_message(message: dict) -> dict:
@@ -264,6 +373,35 @@ def format_user_message(message: dict) -> dict:
         return message
 
 
+def summarize_content(content: list, text_length: int = 200) -> list:
+    """Summarize the content of a message, large fields are replaced by short previews and counts."""
+    summaries = []
+    for item in content or []:
+        if not isinstance(item, dict):
+            summaries.append(item)
+            continue
+        summary = {
+            key: item.get(key)
+            for key in ("type", "status", "status_message", "agent_name")
+            if key in item
+        }
+        if item.get("text"):
+            summary["text"] = item["text"][:text_length]
+        if item.get("video"):
+            summary["video"] = {
+                key: item["video"].get(key) for key in ("id", "name", "thumbnail_url")
+            }
+        if item.get("image"):
+            summary["image"] = {
+                key: item["image"].get(key) for key in ("id", "name", "url")
+            }
+        for key in ("videos", "search_results"):
+            if item.get(key) is not None:
+                summary[f"{key}_count"] = len(item[key])
+        summaries.append(summary)
+    return summaries
+
+
 class ContextMessage(BaseModel):
     """Context message class. This class is used to create the context message for the reasoning context."""
 
@@ -317,6 +455,7 @@ class Session:
         conv_id: str = "",
         collection_id: str = None,
         video_id: str = None,
+        delta_updates: bool = False,
         **kwargs,
     ):
         self.db = db
@@ -326,28 +465,52 @@ class Session:
         self.video_id = video_id
         self.collection_id = collection_id
         self.reasoning_context = []
+        self.context_limit = env_int("CONTEXT_MESSAGES_LIMIT", 200)
         self.state = {}
         self.output_message = OutputMessage(
             db=self.db, session_id=self.session_id, conv_id=self.conv_id
         )
+        if delta_updates:
+            self.output_message.enable_delta_updates()
+        # Number of context messages stored in the database and how many of them are loaded
+        self._stored_context_count = 0
+        self._loaded_context_count = 0
 
         self.get_context_messages()
 
     def save_context_messages(self):
-        """Save the reasoning context messages to the database."""
-        context = {
-            "reasoning": [message.to_llm_msg() for message in self.reasoning_context],
-        }
-        self.db.add_or_update_context_msg(self.session_id, context)
+        """Append the new reasoning context messages to the database."""
+        new_messages = self.reasoning_context[self._loaded_context_count :]
+        if not new_messages:
+            return
+        self.db.append_context_messages(
+            self.session_id,
+            [message.to_llm_msg() for message in new_messages],
+            start_seq=self._stored_context_count,
+        )
+        self._stored_context_count += len(new_messages)
+        self._loaded_context_count = len(self.reasoning_context)
 
     def get_context_messages(self):
-        """Get the reasoning context messages from the database."""
+        """Get the reasoning context messages from the database.
+
+        Only the system prompt and the last ``context_limit`` messages are loaded, starting at a user message so that tool results are never separated from their tool calls.
+        """
         if not self.reasoning_context:
-            context = self.db.get_context_messages(self.session_id)
+            context = self.db.get_context_messages(
+                self.session_id, limit=self.context_limit
+            )
+            messages = context.get("reasoning", [])
+            self._stored_context_count = context.get("count", len(messages))
+            if len(messages) < self._stored_context_count:
+                head, tail = messages[:1], messages[1:]
+                while tail and tail[0]["role"] != RoleTypes.user:
+                    tail.pop(0)
+                messages = head + tail
             self.reasoning_context = [
-                ContextMessage.from_json(message)
-                for message in context.get("reasoning", [])
+                ContextMessage.from_json(message) for message in messages
             ]
+            self._loaded_context_count = len(self.reasoning_context)
 
         return self.reasoning_context
 
@@ -385,14 +548,22 @@ class Session:
         session["conversation"] = conversation
         return session
 
-    def get_all(self):
-        """Get all the sessions from the database."""
-        return self.db.get_sessions()
+    def get_all(self, **kwargs):
+        """Get the sessions from the database, kwargs are the pagination and filter options of ``BaseDB.get_sessions``."""
+        return self.db.get_sessions(**kwargs)
 
     def delete(self):
         """Delete the session from the database."""
         return self.db.delete_session(self.session_id)
 
+    @staticmethod
+    def get_output_message_snapshot(msg_id: str) -> Optional[dict]:
+        """Get the last emitted snapshot of an output message which is still in progress."""
+        output_message = _active_output_messages.get(msg_id)
+        if output_message is None:
+            return None
+        return output_message.get_snapshot()
+
     def emit_event(self, event: BaseEvent, namespace="/chat"):
         """Emits a structured WebSocket event to notify all clients about updates."""
 
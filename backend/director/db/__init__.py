@@ -1,4 +1,7 @@
 import os
+import atexit
+import threading
+
 from director.constants import DBType
 from .base import BaseDB
 from .sqlite.db import SQLiteDB
@@ -9,11 +12,28 @@ db_types = {
     DBType.POSTGRES: PostgresDB,
 }
 
+_db_instances = {}
+_db_instances_lock = threading.Lock()
+
+
 def load_db(db_type: str = None) -> BaseDB:
+    """Return the process-wide database handle of the given type, it is created on first use."""
     if db_type is None:
         db_type = os.getenv("DB_TYPE", "sqlite").lower()
     if db_type not in db_types:
         raise ValueError(
             f"Unknown DB type: {db_type}, Valid db types are: {[db_type.value for db_type in db_types]}"
         )
-    return db_types[DBType(db_type)]()
+    with _db_instances_lock:
+        if db_type not in _db_instances:
+            _db_instances[db_type] = db_types[DBType(db_type)]()
+        return _db_instances[db_type]
+
+
+@atexit.register
+def close_db():
+    """Close the connections of all the database handles."""
+    with _db_instances_lock:
+        for db in _db_instances.values():
+            db.close()
+        _db_instances.clear()
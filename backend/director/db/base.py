@@ -1,5 +1,15 @@
 from abc import ABC, abstractmethod
 
+# Columns of the sessions table that can be selected with the fields projection of get_sessions
+SESSION_FIELDS = (
+    "session_id",
+    "video_id",
+    "collection_id",
+    "created_at",
+    "updated_at",
+    "metadata",
+)
+
 
 class BaseDB(ABC):
     """Interface for all databases. It provides a common interface for all databases to follow."""
@@ -17,23 +27,149 @@ class BaseDB(ABC):
         pass
 
     @abstractmethod
-    def get_sessions(self) -> list:
-        """Get all sessions."""
+    def get_sessions(
+        self,
+        limit: int = None,
+        cursor: dict = None,
+        collection_id: str = None,
+        video_id: str = None,
+        fields: list = None,
+    ) -> list:
+        """Get sessions ordered by updated_at (newest first).
+
+        :param int limit: Maximum number of sessions to return, all sessions if None.
+        :param dict cursor: Keyset cursor ``{"updated_at": ..., "session_id": ...}``, only sessions after it are returned.
+        :param str collection_id: Only return sessions of this collection.
+        :param str video_id: Only return sessions of this video.
+        :param list fields: Columns to return, see ``SESSION_FIELDS``. ``session_id`` and ``updated_at`` are always included.
+        """
         pass
 
+    def _build_sessions_query(
+        self,
+        placeholder: str,
+        limit: int = None,
+        cursor: dict = None,
+        collection_id: str = None,
+        video_id: str = None,
+        fields: list = None,
+    ) -> tuple:
+        """Build the keyset paginated sessions query shared by the SQL backends.
+
+        :return: The SQL query and its parameters.
+        :rtype: tuple
+        """
+        if fields:
+            invalid_fields = set(fields) - set(SESSION_FIELDS)
+            if invalid_fields:
+                raise ValueError(f"Invalid session fields: {sorted(invalid_fields)}")
+            columns = [
+                field
+                for field in SESSION_FIELDS
+                if field in fields or field in ("session_id", "updated_at")
+            ]
+        else:
+            columns = list(SESSION_FIELDS)
+
+        conditions = []
+        params = []
+        if collection_id:
+            conditions.append(f"collection_id = {placeholder}")
+            params.append(collection_id)
+        if video_id:
+            conditions.append(f"video_id = {placeholder}")
+            params.append(video_id)
+        if cursor:
+            conditions.append(
+                f"(updated_at < {placeholder} OR (updated_at = {placeholder} AND session_id < {placeholder}))"
+            )
+            params.extend(
+                [cursor["updated_at"], cursor["updated_at"], cursor["session_id"]]
+            )
+
+        query = f"SELECT {', '.join(columns)} FROM sessions"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY updated_at DESC, session_id DESC"
+        if limit is not None:
+            query += f" LIMIT {placeholder}"
+            params.append(limit)
+        return query, params
+
     @abstractmethod
     def add_or_update_msg_to_conv() -> None:
         """Add a new message (input or output) to the conversation."""
         pass
 
     @abstractmethod
-    def get_conversations(self, session_id: str) -> list:
-        """Get all conversations for a given session."""
+    def get_conversations(
+        self,
+        session_id: str,
+        limit: int = None,
+        cursor: dict = None,
+        msg_id: str = None,
+    ) -> list:
+        """Get the conversation messages for a given session.
+
+        Without limit and cursor all messages are returned oldest first, otherwise messages are returned newest first.
+
+        :param str session_id: Unique session ID.
+        :param int limit: Maximum number of messages to return.
+        :param dict cursor: Keyset cursor ``{"created_at": ..., "msg_id": ...}``, only older messages are returned.
+        :param str msg_id: Only return the message with this ID.
+        """
+        pass
+
+    def _build_conversations_query(
+        self,
+        placeholder: str,
+        session_id: str,
+        limit: int = None,
+        cursor: dict = None,
+        msg_id: str = None,
+    ) -> tuple:
+        """Build the keyset paginated conversations query shared by the SQL backends.
+
+        :return: The SQL query and its parameters.
+        :rtype: tuple
+        """
+        conditions = [f"session_id = {placeholder}"]
+        params = [session_id]
+        if msg_id:
+            conditions.append(f"msg_id = {placeholder}")
+            params.append(msg_id)
+        if cursor:
+            conditions.append(
+                f"(created_at < {placeholder} OR (created_at = {placeholder} AND msg_id < {placeholder}))"
+            )
+            params.extend(
+                [cursor["created_at"], cursor["created_at"], cursor["msg_id"]]
+            )
+
+        order = "DESC" if limit is not None or cursor else "ASC"
+        query = (
+            f"SELECT * FROM conversations WHERE {' AND '.join(conditions)}"
+            f" ORDER BY created_at {order}, msg_id {order}"
+        )
+        if limit is not None:
+            query += f" LIMIT {placeholder}"
+            params.append(limit)
+        return query, params
+
+    @abstractmethod
+    def get_context_messages(self, session_id: str, limit: int = None) -> dict:
+        """Get context messages for a session.
+
+        If limit is given only the first message (system prompt) and the last ``limit`` messages are returned.
+        The result is ``{"reasoning": [...], "count": <total number of stored messages>}``.
+        """
         pass
 
     @abstractmethod
-    def get_context_messages(self, session_id: str) -> list:
-        """Get context messages for a session."""
+    def append_context_messages(
+        self, session_id: str, context_messages: list, start_seq: int
+    ) -> None:
+        """Append context messages for a session, starting at sequence number start_seq."""
         pass
 
     @abstractmethod
@@ -47,3 +183,7 @@ class BaseDB(ABC):
     def health_check(self) -> bool:
         """Check if the database is healthy."""
         pass
+
+    def close(self) -> None:
+        """Close the connections held by the database."""
+        pass
@@ -2,35 +2,126 @@ import json
 import time
 import logging
 import os
+import threading
+
+from contextlib import contextmanager
 from typing import List
 
 from director.constants import DBType
 from director.db.base import BaseDB
-from director.db.postgres.initialize import initialize_postgres
+from director.db.postgres.initialize import run_migrations
+from director.utils.env import env_float, env_int
 
 logger = logging.getLogger(__name__)
 
 
 class PostgresDB(BaseDB):
+    """PostgreSQL database backed by a process-wide connection pool.
+
+    Connections are checked out of a ``psycopg2`` ``ThreadedConnectionPool`` for each operation, the pool size is
+    configured with ``POSTGRES_POOL_MIN_SIZE`` and ``POSTGRES_POOL_MAX_SIZE`` environment variables. When all the
+    connections are in use callers wait up to ``POSTGRES_POOL_TIMEOUT`` seconds (30) for one to be returned.
+    """
+
+    _pool = None
+    _pool_slots = None
+    _pool_lock = threading.Lock()
+
     def __init__(self):
-        """Initialize PostgreSQL connection using environment variables."""
+        """Initialize PostgreSQL connection pool using environment variables."""
 
         try:
-            import psycopg2
-            from psycopg2.extras import RealDictCursor
+            import psycopg2  # noqa: F401
 
         except ImportError:
             raise ImportError("Please install psycopg2 library to use PostgreSQL.")
 
         self.db_type = DBType.POSTGRES
-        self.conn = psycopg2.connect(
-            dbname=os.getenv("POSTGRES_DB", "postgres"),
-            user=os.getenv("POSTGRES_USER", "postgres"),
-            password=os.getenv("POSTGRES_PASSWORD", "postgres"),
-            host=os.getenv("POSTGRES_HOST", "localhost"),
-            port=os.getenv("POSTGRES_PORT", "5432"),
-        )
-        self.cursor = self.conn.cursor(cursor_factory=RealDictCursor)
+        self.pool = self._get_pool()
+        self.pool_slots = PostgresDB._pool_slots
+
+    @classmethod
+    def _get_pool(cls):
+        from psycopg2.pool import ThreadedConnectionPool
+
+        with cls._pool_lock:
+            if cls._pool is None or cls._pool.closed:
+                maxconn = env_int("POSTGRES_POOL_MAX_SIZE", 10)
+                cls._pool = ThreadedConnectionPool(
+                    minconn=min(env_int("POSTGRES_POOL_MIN_SIZE", 1), maxconn),
+                    maxconn=maxconn,
+                    dbname=os.getenv("POSTGRES_DB", "postgres"),
+                    user=os.getenv("POSTGRES_USER", "postgres"),
+                    password=os.getenv("POSTGRES_PASSWORD", "postgres"),
+                    host=os.getenv("POSTGRES_HOST", "localhost"),
+                    port=os.getenv("POSTGRES_PORT", "5432"),
+                )
+                # getconn raises as soon as the pool is exhausted, the semaphore makes callers wait instead
+                cls._pool_slots = threading.BoundedSemaphore(maxconn)
+                logger.info("Created PostgreSQL connection pool...")
+            return cls._pool
+
+    @contextmanager
+    def _connection(self):
+        """Check out a connection from the pool, the transaction is committed on success and rolled back on error."""
+        import psycopg2
+        import psycopg2.pool
+
+        if not self.pool_slots.acquire(timeout=env_float("POSTGRES_POOL_TIMEOUT", 30)):
+            raise psycopg2.pool.PoolError(
+                "Timed out waiting for a connection from the pool"
+            )
+        try:
+            conn = self._checkout()
+        except BaseException:
+            self.pool_slots.release()
+            raise
+
+        broken = False
+        try:
+            yield conn
+            conn.commit()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            try:
+                self.pool.putconn(conn, close=broken or bool(conn.closed))
+            finally:
+                self.pool_slots.release()
+
+    def _checkout(self):
+        """Get a live connection from the pool, a connection dropped by the server is discarded and replaced once."""
+        import psycopg2
+
+        conn = self.pool.getconn()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            logger.warning(f"Discarding a dropped PostgreSQL connection: {e}")
+            self.pool.putconn(conn, close=True)
+        return self.pool.getconn()
+
+    @contextmanager
+    def _cursor(self):
+        """Yield a cursor on a pooled connection."""
+        from psycopg2.extras import RealDictCursor
+
+        with self._connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                yield cursor
+
+    def close(self):
+        """Close all the connections of the pool."""
+        with self._pool_lock:
+            if PostgresDB._pool is not None and not PostgresDB._pool.closed:
+                PostgresDB._pool.closeall()
 
     def create_session(
         self,
@@ -45,37 +136,49 @@ class PostgresDB(BaseDB):
         created_at = created_at or int(time.time())
         updated_at = updated_at or int(time.time())
 
-        self.cursor.execute(
-            """
-            INSERT INTO sessions (session_id, video_id, collection_id, created_at, updated_at, metadata)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            ON CONFLICT (session_id) DO NOTHING
-            """,
-            (
-                session_id,
-                video_id,
-                collection_id,
-                created_at,
-                updated_at,
-                json.dumps(metadata),
-            ),
-        )
-        self.conn.commit()
+        with self._cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO sessions (session_id, video_id, collection_id, created_at, updated_at, metadata)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                ON CONFLICT (session_id) DO NOTHING
+                """,
+                (
+                    session_id,
+                    video_id,
+                    collection_id,
+                    created_at,
+                    updated_at,
+                    json.dumps(metadata),
+                ),
+            )
 
     def get_session(self, session_id: str) -> dict:
-        self.cursor.execute(
-            "SELECT * FROM sessions WHERE session_id = %s", (session_id,)
-        )
-        row = self.cursor.fetchone()
-        if row is not None:
-            session = dict(row)
-            return session
-        return {}
+        with self._cursor() as cursor:
+            cursor.execute(
+                "SELECT * FROM sessions WHERE session_id = %s", (session_id,)
+            )
+            row = cursor.fetchone()
+            if row is not None:
+                session = dict(row)
+                return session
+            return {}
 
-    def get_sessions(self) -> list:
-        self.cursor.execute("SELECT * FROM sessions ORDER BY updated_at DESC")
-        rows = self.cursor.fetchall()
-        return [dict(r) for r in rows]
+    def get_sessions(
+        self,
+        limit: int = None,
+        cursor: dict = None,
+        collection_id: str = None,
+        video_id: str = None,
+        fields: list = None,
+    ) -> list:
+        query, params = self._build_sessions_query(
+            "%s", limit, cursor, collection_id, video_id, fields
+        )
+        with self._cursor() as db_cursor:
+            db_cursor.execute(query, params)
+            rows = db_cursor.fetchall()
+            return [dict(r) for r in rows]
 
     def add_or_update_msg_to_conv(
         self,
@@ -95,60 +198,122 @@ class PostgresDB(BaseDB):
         created_at = created_at or int(time.time())
         updated_at = updated_at or int(time.time())
 
-        self.cursor.execute(
-            """
-            INSERT INTO conversations (
-                session_id, conv_id, msg_id, msg_type, agents, actions,
-                content, status, created_at, updated_at, metadata
+        with self._cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO conversations (
+                    session_id, conv_id, msg_id, msg_type, agents, actions,
+                    content, status, created_at, updated_at, metadata
+                )
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT (msg_id) DO UPDATE SET
+                    session_id = EXCLUDED.session_id,
+                    conv_id = EXCLUDED.conv_id,
+                    msg_type = EXCLUDED.msg_type,
+                    agents = EXCLUDED.agents,
+                    actions = EXCLUDED.actions,
+                    content = EXCLUDED.content,
+                    status = EXCLUDED.status,
+                    updated_at = EXCLUDED.updated_at,
+                    metadata = EXCLUDED.metadata
+                """,
+                (
+                    session_id,
+                    conv_id,
+                    msg_id,
+                    msg_type,
+                    json.dumps(agents),
+                    json.dumps(actions),
+                    json.dumps(content),
+                    status,
+                    created_at,
+                    updated_at,
+                    json.dumps(metadata),
+                ),
             )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (msg_id) DO UPDATE SET
-                session_id = EXCLUDED.session_id,
-                conv_id = EXCLUDED.conv_id,
-                msg_type = EXCLUDED.msg_type,
-                agents = EXCLUDED.agents,
-                actions = EXCLUDED.actions,
-                content = EXCLUDED.content,
-                status = EXCLUDED.status,
-                updated_at = EXCLUDED.updated_at,
-                metadata = EXCLUDED.metadata
-            """,
-            (
-                session_id,
-                conv_id,
-                msg_id,
-                msg_type,
-                json.dumps(agents),
-                json.dumps(actions),
-                json.dumps(content),
-                status,
-                created_at,
-                updated_at,
-                json.dumps(metadata),
-            ),
-        )
-        self.conn.commit()
 
-    def get_conversations(self, session_id: str) -> list:
-        self.cursor.execute(
-            "SELECT * FROM conversations WHERE session_id = %s ORDER BY created_at ASC",
-            (session_id,),
-        )
-        rows = self.cursor.fetchall()
-        conversations = []
-        for row in rows:
-            if row is not None:
-                conv_dict = dict(row)
-                conversations.append(conv_dict)
-        return conversations
-
-    def get_context_messages(self, session_id: str) -> list:
-        self.cursor.execute(
-            "SELECT context_data FROM context_messages WHERE session_id = %s",
-            (session_id,),
+    def get_conversations(
+        self,
+        session_id: str,
+        limit: int = None,
+        cursor: dict = None,
+        msg_id: str = None,
+    ) -> list:
+        query, params = self._build_conversations_query(
+            "%s", session_id, limit, cursor, msg_id
         )
-        result = self.cursor.fetchone()
-        return result["context_data"] if result else {}
+        with self._cursor() as db_cursor:
+            db_cursor.execute(query, params)
+            rows = db_cursor.fetchall()
+            conversations = []
+            for row in rows:
+                if row is not None:
+                    conv_dict = dict(row)
+                    conversations.append(conv_dict)
+            return conversations
+
+    def get_context_messages(self, session_id: str, limit: int = None) -> dict:
+        with self._cursor() as cursor:
+            cursor.execute(
+                "SELECT MAX(seq) AS max_seq FROM context_message_items WHERE session_id = %s",
+                (session_id,),
+            )
+            max_seq = cursor.fetchone()["max_seq"]
+            if max_seq is None:
+                cursor.execute(
+                    "SELECT context_data FROM context_messages WHERE session_id = %s",
+                    (session_id,),
+                )
+                result = cursor.fetchone()
+            else:
+                start_seq = 0 if limit is None else max_seq + 1 - limit
+                cursor.execute(
+                    """
+                    SELECT message FROM context_message_items
+                    WHERE session_id = %s AND (seq = 0 OR seq >= %s)
+                    ORDER BY seq ASC
+                    """,
+                    (session_id, start_seq),
+                )
+                rows = cursor.fetchall()
+                return {
+                    "reasoning": [row["message"] for row in rows],
+                    "count": max_seq + 1,
+                }
+
+        if not result:
+            return {"reasoning": [], "count": 0}
+        messages = (result["context_data"] or {}).get("reasoning", [])
+        self.append_context_messages(session_id, messages, start_seq=0)
+        count = len(messages)
+        if limit is not None and count > limit + 1:
+            messages = messages[:1] + messages[-limit:]
+        return {"reasoning": messages, "count": count}
+
+    def append_context_messages(
+        self,
+        session_id: str,
+        context_messages: list,
+        start_seq: int,
+        created_at: int = None,
+        **kwargs,
+    ) -> None:
+        created_at = created_at or int(time.time())
+
+        with self._cursor() as cursor:
+            cursor.executemany(
+                """
+                INSERT INTO context_message_items (session_id, seq, message, created_at)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (session_id, seq) DO UPDATE SET
+                    message = EXCLUDED.message,
+                    created_at = EXCLUDED.created_at
+                """,
+                [
+                    (session_id, seq, json.dumps(message), created_at)
+                    for seq, message in enumerate(context_messages, start=start_seq)
+                ],
+            )
 
     def add_or_update_context_msg(
         self,
@@ -162,38 +327,42 @@ class PostgresDB(BaseDB):
         created_at = created_at or int(time.time())
         updated_at = updated_at or int(time.time())
 
-        self.cursor.execute(
-            """
-            INSERT INTO context_messages (context_data, session_id, created_at, updated_at, metadata)
-            VALUES (%s, %s, %s, %s, %s)
-            ON CONFLICT (session_id) DO UPDATE SET
-                context_data = EXCLUDED.context_data,
-                updated_at = EXCLUDED.updated_at,
-                metadata = EXCLUDED.metadata
-            """,
-            (
-                json.dumps(context_messages),
-                session_id,
-                created_at,
-                updated_at,
-                json.dumps(metadata),
-            ),
-        )
-        self.conn.commit()
+        with self._cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO context_messages (context_data, session_id, created_at, updated_at, metadata)
+                VALUES (%s, %s, %s, %s, %s)
+                ON CONFLICT (session_id) DO UPDATE SET
+                    context_data = EXCLUDED.context_data,
+                    updated_at = EXCLUDED.updated_at,
+                    metadata = EXCLUDED.metadata
+                """,
+                (
+                    json.dumps(context_messages),
+                    session_id,
+                    created_at,
+                    updated_at,
+                    json.dumps(metadata),
+                ),
+            )
 
     def delete_conversation(self, session_id: str) -> bool:
-        self.cursor.execute(
-            "DELETE FROM conversations WHERE session_id = %s", (session_id,)
-        )
-        self.conn.commit()
-        return self.cursor.rowcount > 0
+        with self._cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM conversations WHERE session_id = %s", (session_id,)
+            )
+            return cursor.rowcount > 0
 
     def delete_context(self, session_id: str) -> bool:
-        self.cursor.execute(
-            "DELETE FROM context_messages WHERE session_id = %s", (session_id,)
-        )
-        self.conn.commit()
-        return self.cursor.rowcount > 0
+        with self._cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM context_message_items WHERE session_id = %s", (session_id,)
+            )
+            deleted = cursor.rowcount > 0
+            cursor.execute(
+                "DELETE FROM context_messages WHERE session_id = %s", (session_id,)
+            )
+            return deleted or cursor.rowcount > 0
 
     def delete_session(self, session_id: str) -> bool:
         failed_components = []
@@ -202,34 +371,23 @@ class PostgresDB(BaseDB):
         if not self.delete_context(session_id):
             failed_components.append("context")
 
-        self.cursor.execute("DELETE FROM sessions WHERE session_id = %s", (session_id,))
-        self.conn.commit()
-        if not self.cursor.rowcount > 0:
-            failed_components.append("session")
+        with self._cursor() as cursor:
+            cursor.execute("DELETE FROM sessions WHERE session_id = %s", (session_id,))
+            if not cursor.rowcount > 0:
+                failed_components.append("session")
 
         success = len(failed_components) < 3
         return success, failed_components
 
     def health_check(self) -> bool:
+        """Check if the PostgreSQL database is healthy and apply the pending schema migrations."""
         try:
-            query = """
-                SELECT COUNT(table_name)
-                FROM information_schema.tables
-                WHERE table_name IN ('sessions', 'conversations', 'context_messages')
-                AND table_schema = 'public';
-            """
-            self.cursor.execute(query)
-            table_count = self.cursor.fetchone()["count"]
-
-            if table_count < 3:
-                logger.info("Tables not found. Initializing PostgreSQL DB...")
-                initialize_postgres()
+            with self._connection() as conn:
+                applied = run_migrations(conn)
+            if applied:
+                logger.info(f"Applied PostgreSQL schema migrations: {applied}")
             return True
 
         except Exception as e:
             logger.exception(f"PostgreSQL health check failed: {e}")
             return False
-
-    def __del__(self):
-        if hasattr(self, "conn") and self.conn:
-            self.conn.close()
@@ -1,4 +1,6 @@
 import os
+import json
+import time
 import logging
 from dotenv import load_dotenv
 
@@ -45,9 +47,185 @@ CREATE TABLE IF NOT EXISTS context_messages (
 );
 """
 
+CREATE_CONTEXT_MESSAGE_ITEMS_TABLE = """
+CREATE TABLE IF NOT EXISTS context_message_items (
+    session_id TEXT,
+    seq INTEGER,
+    message JSONB,
+    created_at BIGINT,
+    PRIMARY KEY (session_id, seq),
+    FOREIGN KEY (session_id) REFERENCES sessions(session_id)
+);
+"""
+
+
+def migrate_context_messages(conn):
+    """Split the reasoning context blobs of context_messages into context_message_items rows.
+
+    Sessions which already have rows are skipped, so the migration can be run multiple times.
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT session_id, context_data FROM context_messages
+        WHERE session_id NOT IN (SELECT DISTINCT session_id FROM context_message_items)
+        """
+    )
+    for session_id, context_data in cursor.fetchall():
+        messages = (context_data or {}).get("reasoning", [])
+        cursor.executemany(
+            """
+            INSERT INTO context_message_items (session_id, seq, message, created_at)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (session_id, seq) DO NOTHING
+            """,
+            [
+                (session_id, seq, json.dumps(message), int(time.time()))
+                for seq, message in enumerate(messages)
+            ],
+        )
+    conn.commit()
+    cursor.close()
+
+
+CREATE_CONVERSATIONS_SESSION_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_conversations_session_created
+ON conversations (session_id, created_at);
+"""
+
+CREATE_SESSIONS_UPDATED_AT_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_sessions_updated_at
+ON sessions (updated_at DESC);
+"""
+
+CREATE_SESSIONS_KEYSET_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_sessions_updated_at_session
+ON sessions (updated_at DESC, session_id DESC);
+"""
+
+CREATE_SESSIONS_COLLECTION_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_sessions_collection_updated_at
+ON sessions (collection_id, updated_at DESC);
+"""
+
+CREATE_SESSIONS_VIDEO_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_sessions_video_updated_at
+ON sessions (video_id, updated_at DESC);
+"""
+
+# SQL to cover the full keyset order of the conversations and filtered sessions queries, so the rows come
+# out of the index in order instead of being sorted in a temporary B-tree
+CREATE_CONVERSATIONS_KEYSET_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_conversations_session_created_msg
+ON conversations (session_id, created_at, msg_id);
+"""
+
+CREATE_SESSIONS_COLLECTION_KEYSET_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_sessions_collection_updated_at_session
+ON sessions (collection_id, updated_at DESC, session_id DESC);
+"""
+
+CREATE_SESSIONS_VIDEO_KEYSET_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_sessions_video_updated_at_session
+ON sessions (video_id, updated_at DESC, session_id DESC);
+"""
+
+# The keyset indexes above and idx_sessions_updated_at_session make these redundant
+DROP_REDUNDANT_INDEXES = [
+    "DROP INDEX IF EXISTS idx_conversations_session_created;",
+    "DROP INDEX IF EXISTS idx_sessions_updated_at;",
+    "DROP INDEX IF EXISTS idx_sessions_collection_updated_at;",
+    "DROP INDEX IF EXISTS idx_sessions_video_updated_at;",
+]
+
+CREATE_SCHEMA_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    applied_at BIGINT
+);
+"""
+
+# Advisory lock key, so that only one server process applies the migrations at a time
+MIGRATIONS_LOCK_KEY = 7283104
+
+# Versioned schema migrations, a step is either an SQL statement or a callable taking the connection.
+# Migrations are applied in order and only once, never change a released migration, add a new one instead.
+MIGRATIONS = [
+    (
+        1,
+        [
+            CREATE_SESSIONS_TABLE,
+            CREATE_CONVERSATIONS_TABLE,
+            CREATE_CONTEXT_MESSAGES_TABLE,
+        ],
+    ),
+    (2, [CREATE_CONTEXT_MESSAGE_ITEMS_TABLE, migrate_context_messages]),
+    (3, [CREATE_CONVERSATIONS_SESSION_INDEX, CREATE_SESSIONS_UPDATED_AT_INDEX]),
+    (
+        4,
+        [
+            CREATE_SESSIONS_KEYSET_INDEX,
+            CREATE_SESSIONS_COLLECTION_INDEX,
+            CREATE_SESSIONS_VIDEO_INDEX,
+        ],
+    ),
+    (
+        5,
+        [
+            CREATE_CONVERSATIONS_KEYSET_INDEX,
+            CREATE_SESSIONS_COLLECTION_KEYSET_INDEX,
+            CREATE_SESSIONS_VIDEO_KEYSET_INDEX,
+            *DROP_REDUNDANT_INDEXES,
+        ],
+    ),
+]
+
+
+def run_migrations(conn):
+    """Apply the pending schema migrations.
+
+    :param conn: psycopg2 connection.
+    :return: List of the applied migration versions.
+    :rtype: list
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATIONS_LOCK_KEY,))
+    try:
+        cursor.execute(CREATE_SCHEMA_MIGRATIONS_TABLE)
+        cursor.execute("SELECT version FROM schema_migrations")
+        applied_versions = {row[0] for row in cursor.fetchall()}
+        conn.commit()
+
+        applied = []
+        for version, steps in MIGRATIONS:
+            if version in applied_versions:
+                continue
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    cursor.execute(step)
+            cursor.execute(
+                """
+                INSERT INTO schema_migrations (version, applied_at) VALUES (%s, %s)
+                ON CONFLICT (version) DO NOTHING
+                """,
+                (version, int(time.time())),
+            )
+            conn.commit()
+            applied.append(version)
+        return applied
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATIONS_LOCK_KEY,))
+        conn.commit()
+        cursor.close()
+
 
 def initialize_postgres():
-    """Initialize the PostgreSQL database by creating the necessary tables."""
+    """Initialize the PostgreSQL database by applying all the schema migrations."""
 
     try:
         import psycopg2
@@ -62,19 +240,13 @@ def initialize_postgres():
         host=os.getenv("POSTGRES_HOST", "localhost"),
         port=os.getenv("POSTGRES_PORT", "5432"),
     )
-    cursor = conn.cursor()
 
     try:
-        cursor.execute(CREATE_SESSIONS_TABLE)
-        cursor.execute(CREATE_CONVERSATIONS_TABLE)
-        cursor.execute(CREATE_CONTEXT_MESSAGES_TABLE)
-        conn.commit()
-        logger.info("PostgreSQL tables created successfully")
+        applied = run_migrations(conn)
+        logger.info(f"PostgreSQL schema migrations applied: {applied}")
     except Exception as e:
-        logger.exception(f"Error creating PostgreSQL tables: {e}")
-        conn.rollback()
+        logger.exception(f"Error applying PostgreSQL schema migrations: {e}")
     finally:
-        cursor.close()
         conn.close()
 
 
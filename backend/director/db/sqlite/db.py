@@ -1,5 +1,6 @@
 import json
 import sqlite3
+import threading
 import time
 import logging
 import os
@@ -8,12 +9,21 @@ from typing import List
 
 from director.constants import DBType
 from director.db.base import BaseDB
-from director.db.sqlite.initialize import initialize_sqlite
+from director.db.sqlite.initialize import run_migrations
+from director.utils.env import env_float, env_int
 
 logger = logging.getLogger(__name__)
 
 
 class SQLiteDB(BaseDB):
+    """SQLite database with one connection per thread.
+
+    Connections use WAL journal mode, so that concurrent readers are not blocked by a writer. A thread gets a
+    connection the first time it uses the database and holds it until it finishes, the connection then goes
+    back to an idle set reused by the next threads, so short lived threads such as the update timers of output
+    messages don't open a connection each. At most ``SQLITE_POOL_SIZE`` (4) idle connections are kept open.
+    """
+
     def __init__(self, db_path: str = None):
         """
         :param db_path: Path to the SQLite database file.
@@ -23,11 +33,59 @@ class SQLiteDB(BaseDB):
             self.db_path = os.getenv("SQLITE_DB_PATH", "director.db")
         else:
             self.db_path = db_path
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=True)
-        self.conn.row_factory = sqlite3.Row
-        self.cursor = self.conn.cursor()
+        self.pool_size = env_int("SQLITE_POOL_SIZE", 4)
+        self._local = threading.local()
+        self._connections = []
+        self._idle_connections = []
+        self._connections_lock = threading.Lock()
         logger.info("Connected to SQLite DB...")
 
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            timeout=env_float("SQLITE_BUSY_TIMEOUT", 30),
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _acquire(self):
+        """Lease a connection to the current thread, reusing the connections of finished threads."""
+        with self._connections_lock:
+            leased = []
+            for thread, thread_conn in self._connections:
+                if thread.is_alive():
+                    leased.append((thread, thread_conn))
+                elif len(self._idle_connections) < self.pool_size:
+                    thread_conn.rollback()
+                    self._idle_connections.append(thread_conn)
+                else:
+                    thread_conn.close()
+            self._connections = leased
+            if self._idle_connections:
+                conn = self._idle_connections.pop()
+            else:
+                conn = self._connect()
+            self._connections.append((threading.current_thread(), conn))
+        return conn
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Connection of the current thread."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._acquire()
+            self._local.cursor = conn.cursor()
+        return conn
+
+    @property
+    def cursor(self) -> sqlite3.Cursor:
+        """Cursor of the current thread."""
+        self.conn
+        return self._local.cursor
+
     def create_session(
         self,
         session_id: str,
@@ -85,17 +143,33 @@ class SQLiteDB(BaseDB):
         else:
             return {}  # Return an empty dictionary if no data found
 
-    def get_sessions(self) -> list:
-        """Get all sessions.
+    def get_sessions(
+        self,
+        limit: int = None,
+        cursor: dict = None,
+        collection_id: str = None,
+        video_id: str = None,
+        fields: list = None,
+    ) -> list:
+        """Get sessions ordered by updated_at (newest first).
 
-        :return: List of all sessions.
+        :param int limit: Maximum number of sessions to return, all sessions if None.
+        :param dict cursor: Keyset cursor ``{"updated_at": ..., "session_id": ...}``, only sessions after it are returned.
+        :param str collection_id: Only return sessions of this collection.
+        :param str video_id: Only return sessions of this video.
+        :param list fields: Columns to return, ``session_id`` and ``updated_at`` are always included.
+        :return: List of sessions.
         :rtype: list
         """
-        self.cursor.execute("SELECT * FROM sessions ORDER BY updated_at DESC")
+        query, params = self._build_sessions_query(
+            "?", limit, cursor, collection_id, video_id, fields
+        )
+        self.cursor.execute(query, params)
         row = self.cursor.fetchall()
         sessions = [dict(r) for r in row]
         for s in sessions:
-            s["metadata"] = json.loads(s["metadata"])
+            if "metadata" in s:
+                s["metadata"] = json.loads(s["metadata"])
         return sessions
 
     def add_or_update_msg_to_conv(
@@ -151,11 +225,26 @@ class SQLiteDB(BaseDB):
         )
         self.conn.commit()
 
-    def get_conversations(self, session_id: str) -> list:
-        self.cursor.execute(
-            "SELECT * FROM conversations WHERE session_id = ? ORDER BY created_at ASC",
-            (session_id,),
+    def get_conversations(
+        self,
+        session_id: str,
+        limit: int = None,
+        cursor: dict = None,
+        msg_id: str = None,
+    ) -> list:
+        """Get the conversation messages for a given session.
+
+        :param str session_id: Unique session ID.
+        :param int limit: Maximum number of messages to return, newest first.
+        :param dict cursor: Keyset cursor ``{"created_at": ..., "msg_id": ...}``, only older messages are returned.
+        :param str msg_id: Only return the message with this ID.
+        :return: List of messages.
+        :rtype: list
+        """
+        query, params = self._build_conversations_query(
+            "?", session_id, limit, cursor, msg_id
         )
+        self.cursor.execute(query, params)
         rows = self.cursor.fetchall()
         conversations = []
         for row in rows:
@@ -168,19 +257,79 @@ class SQLiteDB(BaseDB):
                 conversations.append(conv_dict)
         return conversations
 
-    def get_context_messages(self, session_id: str) -> list:
+    def get_context_messages(self, session_id: str, limit: int = None) -> dict:
         """Get context messages for a session.
 
+        Sessions stored as a single context blob are split into per-message rows on first read.
+
         :param str session_id: Unique session ID.
-        :return: List of context messages.
-        :rtype: list
+        :param int limit: Number of most recent messages to load, the first message is always included.
+        :return: Context messages and the total number of stored messages.
+        :rtype: dict
         """
         self.cursor.execute(
-            "SELECT context_data FROM context_messages WHERE session_id = ?",
+            "SELECT MAX(seq) FROM context_message_items WHERE session_id = ?",
             (session_id,),
         )
-        result = self.cursor.fetchone()
-        return json.loads(result[0]) if result else {}
+        max_seq = self.cursor.fetchone()[0]
+        if max_seq is None:
+            self.cursor.execute(
+                "SELECT context_data FROM context_messages WHERE session_id = ?",
+                (session_id,),
+            )
+            result = self.cursor.fetchone()
+            if not result:
+                return {"reasoning": [], "count": 0}
+            messages = json.loads(result[0]).get("reasoning", [])
+            self.append_context_messages(session_id, messages, start_seq=0)
+            count = len(messages)
+            if limit is not None and count > limit + 1:
+                messages = messages[:1] + messages[-limit:]
+            return {"reasoning": messages, "count": count}
+
+        start_seq = 0 if limit is None else max_seq + 1 - limit
+        self.cursor.execute(
+            """
+            SELECT message FROM context_message_items
+            WHERE session_id = ? AND (seq = 0 OR seq >= ?)
+            ORDER BY seq ASC
+            """,
+            (session_id, start_seq),
+        )
+        rows = self.cursor.fetchall()
+        return {
+            "reasoning": [json.loads(row["message"]) for row in rows],
+            "count": max_seq + 1,
+        }
+
+    def append_context_messages(
+        self,
+        session_id: str,
+        context_messages: list,
+        start_seq: int,
+        created_at: int = None,
+        **kwargs,
+    ) -> None:
+        """Append context messages for a session.
+
+        :param str session_id: Unique session ID.
+        :param list context_messages: List of context messages to append.
+        :param int start_seq: Sequence number of the first message.
+        :param int created_at: Timestamp when the context messages were created.
+        """
+        created_at = created_at or int(time.time())
+
+        self.cursor.executemany(
+            """
+        INSERT OR REPLACE INTO context_message_items (session_id, seq, message, created_at)
+        VALUES (?, ?, ?, ?)
+        """,
+            [
+                (session_id, seq, json.dumps(message), created_at)
+                for seq, message in enumerate(context_messages, start=start_seq)
+            ],
+        )
+        self.conn.commit()
 
     def add_or_update_context_msg(
         self,
@@ -235,11 +384,15 @@ class SQLiteDB(BaseDB):
         :param str session_id: Unique session ID.
         :return: True if context messages were deleted, False otherwise.
         """
+        self.cursor.execute(
+            "DELETE FROM context_message_items WHERE session_id = ?", (session_id,)
+        )
+        deleted = self.cursor.rowcount > 0
         self.cursor.execute(
             "DELETE FROM context_messages WHERE session_id = ?", (session_id,)
         )
         self.conn.commit()
-        return self.cursor.rowcount > 0
+        return deleted or self.cursor.rowcount > 0
 
     def delete_session(self, session_id: str) -> bool:
         """Delete a session and all its associated data.
@@ -260,24 +413,24 @@ class SQLiteDB(BaseDB):
         return success, failed_components
 
     def health_check(self) -> bool:
-        """Check if the SQLite database is healthy and the necessary tables exist. If not, create them."""
+        """Check if the SQLite database is healthy and apply the pending schema migrations."""
         try:
-            query = """
-                SELECT COUNT(name)
-                FROM sqlite_master
-                WHERE type='table'
-                AND name IN ('sessions', 'conversations', 'context_messages');
-            """
-            self.cursor.execute(query)
-            table_count = self.cursor.fetchone()[0]
-            if table_count < 3:
-                logger.info("Tables not found. Initializing SQLite DB...")
-                initialize_sqlite(self.db_path)
+            applied = run_migrations(self.conn)
+            if applied:
+                logger.info(f"Applied SQLite schema migrations: {applied}")
             return True
 
         except Exception as e:
             logger.exception(f"SQLite health check failed: {e}")
             return False
 
-    def __del__(self):
-        self.conn.close()
+    def close(self):
+        """Close the connections of all threads."""
+        with self._connections_lock:
+            for _, conn in self._connections:
+                conn.close()
+            for conn in self._idle_connections:
+                conn.close()
+            self._connections = []
+            self._idle_connections = []
+        self._local = threading.local()
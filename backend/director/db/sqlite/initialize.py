@@ -1,5 +1,7 @@
+import json
 import sqlite3
 import os
+import time
 
 # SQL to create the sessions table
 CREATE_SESSIONS_TABLE = """
@@ -43,17 +45,173 @@ CREATE TABLE IF NOT EXISTS context_messages (
 )
 """
 
+# SQL to create the context_message_items table, one row per reasoning context message
+CREATE_CONTEXT_MESSAGE_ITEMS_TABLE = """
+CREATE TABLE IF NOT EXISTS context_message_items (
+    session_id TEXT,
+    seq INTEGER,
+    message JSON,
+    created_at INTEGER,
+    PRIMARY KEY (session_id, seq),
+    FOREIGN KEY (session_id) REFERENCES sessions(session_id)
+)
+"""
 
-def initialize_sqlite(db_name="director.db"):
-    """Initialize the SQLite database by creating the necessary tables."""
-    conn = sqlite3.connect(db_name)
-    cursor = conn.cursor()
 
-    cursor.execute(CREATE_SESSIONS_TABLE)
-    cursor.execute(CREATE_CONVERSATIONS_TABLE)
-    cursor.execute(CREATE_CONTEXT_MESSAGES_TABLE)
+def migrate_context_messages(conn):
+    """Split the reasoning context blobs of context_messages into context_message_items rows.
 
+    Sessions which already have rows are skipped, so the migration can be run multiple times.
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT session_id, context_data FROM context_messages
+        WHERE session_id NOT IN (SELECT DISTINCT session_id FROM context_message_items)
+        """
+    )
+    for session_id, context_data in cursor.fetchall():
+        messages = json.loads(context_data or "{}").get("reasoning", [])
+        cursor.executemany(
+            """
+            INSERT OR IGNORE INTO context_message_items (session_id, seq, message, created_at)
+            VALUES (?, ?, ?, ?)
+            """,
+            [
+                (session_id, seq, json.dumps(message), int(time.time()))
+                for seq, message in enumerate(messages)
+            ],
+        )
     conn.commit()
+
+
+# SQL to create the indexes used by get_conversations and get_sessions
+CREATE_CONVERSATIONS_SESSION_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_conversations_session_created
+ON conversations (session_id, created_at)
+"""
+
+CREATE_SESSIONS_UPDATED_AT_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_sessions_updated_at
+ON sessions (updated_at DESC)
+"""
+
+# SQL to create the indexes used by the keyset pagination and filters of get_sessions
+CREATE_SESSIONS_KEYSET_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_sessions_updated_at_session
+ON sessions (updated_at DESC, session_id DESC)
+"""
+
+CREATE_SESSIONS_COLLECTION_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_sessions_collection_updated_at
+ON sessions (collection_id, updated_at DESC)
+"""
+
+CREATE_SESSIONS_VIDEO_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_sessions_video_updated_at
+ON sessions (video_id, updated_at DESC)
+"""
+
+# SQL to cover the full keyset order of the conversations and filtered sessions queries, so the rows come
+# out of the index in order instead of being sorted in a temporary B-tree
+CREATE_CONVERSATIONS_KEYSET_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_conversations_session_created_msg
+ON conversations (session_id, created_at, msg_id)
+"""
+
+CREATE_SESSIONS_COLLECTION_KEYSET_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_sessions_collection_updated_at_session
+ON sessions (collection_id, updated_at DESC, session_id DESC)
+"""
+
+CREATE_SESSIONS_VIDEO_KEYSET_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_sessions_video_updated_at_session
+ON sessions (video_id, updated_at DESC, session_id DESC)
+"""
+
+# The keyset indexes above and idx_sessions_updated_at_session make these redundant
+DROP_REDUNDANT_INDEXES = [
+    "DROP INDEX IF EXISTS idx_conversations_session_created",
+    "DROP INDEX IF EXISTS idx_sessions_updated_at",
+    "DROP INDEX IF EXISTS idx_sessions_collection_updated_at",
+    "DROP INDEX IF EXISTS idx_sessions_video_updated_at",
+]
+
+# SQL to create the table which records the applied schema migrations
+CREATE_SCHEMA_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    applied_at INTEGER
+)
+"""
+
+# Versioned schema migrations, a step is either an SQL statement or a callable taking the connection.
+# Migrations are applied in order and only once, never change a released migration, add a new one instead.
+MIGRATIONS = [
+    (
+        1,
+        [
+            CREATE_SESSIONS_TABLE,
+            CREATE_CONVERSATIONS_TABLE,
+            CREATE_CONTEXT_MESSAGES_TABLE,
+        ],
+    ),
+    (2, [CREATE_CONTEXT_MESSAGE_ITEMS_TABLE, migrate_context_messages]),
+    (3, [CREATE_CONVERSATIONS_SESSION_INDEX, CREATE_SESSIONS_UPDATED_AT_INDEX]),
+    (
+        4,
+        [
+            CREATE_SESSIONS_KEYSET_INDEX,
+            CREATE_SESSIONS_COLLECTION_INDEX,
+            CREATE_SESSIONS_VIDEO_INDEX,
+        ],
+    ),
+    (
+        5,
+        [
+            CREATE_CONVERSATIONS_KEYSET_INDEX,
+            CREATE_SESSIONS_COLLECTION_KEYSET_INDEX,
+            CREATE_SESSIONS_VIDEO_KEYSET_INDEX,
+            *DROP_REDUNDANT_INDEXES,
+        ],
+    ),
+]
+
+
+def run_migrations(conn):
+    """Apply the pending schema migrations.
+
+    :param conn: SQLite connection.
+    :return: List of the applied migration versions.
+    :rtype: list
+    """
+    cursor = conn.cursor()
+    cursor.execute(CREATE_SCHEMA_MIGRATIONS_TABLE)
+    cursor.execute("SELECT version FROM schema_migrations")
+    applied_versions = {row[0] for row in cursor.fetchall()}
+
+    applied = []
+    for version, steps in MIGRATIONS:
+        if version in applied_versions:
+            continue
+        for step in steps:
+            if callable(step):
+                step(conn)
+            else:
+                cursor.execute(step)
+        cursor.execute(
+            "INSERT OR IGNORE INTO schema_migrations (version, applied_at) VALUES (?, ?)",
+            (version, int(time.time())),
+        )
+        conn.commit()
+        applied.append(version)
+    return applied
+
+
+def initialize_sqlite(db_name="director.db"):
+    """Initialize the SQLite database by applying all the schema migrations."""
+    conn = sqlite3.connect(db_name)
+    run_migrations(conn)
     conn.close()
 
 
@@ -6,18 +6,29 @@ Create an application factory function, which will be used to create a new app i
 docs: https://flask.palletsprojects.com/en/2.3.x/patterns/appfactories/
 """
 
+import logging
+
 from flask_cors import CORS
 from flask import Flask
 from flask_socketio import SocketIO
 from logging.config import dictConfig
 
-from director.entrypoint.api.routes import agent_bp, session_bp, videodb_bp, config_bp
+from director.entrypoint.api.routes import (
+    agent_bp,
+    session_bp,
+    videodb_bp,
+    config_bp,
+    job_bp,
+)
 from director.entrypoint.api.socket_io import ChatNamespace
+from director.handler import ChatHandler
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 socketio = SocketIO()
 
 
@@ -56,8 +67,15 @@ def create_app(app_config: object):
     app.register_blueprint(session_bp)
     app.register_blueprint(videodb_bp)
     app.register_blueprint(config_bp)
+    app.register_blueprint(job_bp)
 
     # register socket namespaces
     socketio.on_namespace(ChatNamespace("/chat"))
 
+    # Build the agent metadata once at startup
+    try:
+        ChatHandler.get_registry()
+    except Exception as e:
+        logger.exception(f"Failed to build the agent registry: {e}")
+
     return app
@@ -4,13 +4,21 @@ from flask import Blueprint, request, current_app as app
 from werkzeug.utils import secure_filename
 
 from director.db import load_db
-from director.handler import ChatHandler, SessionHandler, VideoDBHandler, ConfigHandler
+from director.handler import (
+    ChatHandler,
+    SessionHandler,
+    VideoDBHandler,
+    ConfigHandler,
+    JobHandler,
+)
+from director.tools.videodb_upload import UploadOffsetMismatch, UploadSessionNotFound
 
 
 agent_bp = Blueprint("agent", __name__, url_prefix="/agent")
 session_bp = Blueprint("session", __name__, url_prefix="/session")
 videodb_bp = Blueprint("videodb", __name__, url_prefix="/videodb")
 config_bp = Blueprint("config", __name__, url_prefix="/config")
+job_bp = Blueprint("job", __name__, url_prefix="/job")
 
 
 @agent_bp.route("/", methods=["GET"], strict_slashes=False)
@@ -27,18 +35,35 @@ def agent():
 @session_bp.route("/", methods=["GET"], strict_slashes=False)
 def get_sessions():
     """
-    Get all the sessions
+    Get the sessions, newest first
+
+    Query params: limit, cursor, collection_id, video_id and fields (comma separated)
     """
     session_handler = SessionHandler(
         db=load_db(os.getenv("SERVER_DB_TYPE", app.config["DB_TYPE"]))
     )
-    return session_handler.get_sessions()
+    try:
+        limit = request.args.get("limit", type=int)
+        if limit is not None and not 0 < limit <= 100:
+            return {"message": "limit must be between 1 and 100."}, 400
+        fields = request.args.get("fields")
+        return session_handler.get_sessions(
+            limit=limit,
+            cursor=request.args.get("cursor"),
+            collection_id=request.args.get("collection_id"),
+            video_id=request.args.get("video_id"),
+            fields=fields.split(",") if fields else None,
+        )
+    except ValueError as e:
+        return {"message": str(e)}, 400
 
 
 @session_bp.route("/<session_id>", methods=["GET", "DELETE"])
 def get_session(session_id):
     """
     Get or delete the session details
+
+    Query params for GET: limit and cursor to paginate the conversation (newest first), summary=true for content summaries
     """
     if not session_id:
         return {"message": f"Please provide {session_id}."}, 400
@@ -46,7 +71,21 @@ def get_session(session_id):
     session_handler = SessionHandler(
         db=load_db(os.getenv("SERVER_DB_TYPE", app.config["DB_TYPE"]))
     )
-    session = session_handler.get_session(session_id)
+    try:
+        limit = request.args.get("limit", type=int)
+        if limit is not None and not 0 < limit <= 100:
+            return {"message": "limit must be between 1 and 100."}, 400
+        if request.method == "DELETE":
+            # Only the session row is needed to check if it exists
+            limit = 1
+        session = session_handler.get_session(
+            session_id,
+            limit=limit,
+            cursor=request.args.get("cursor"),
+            summary=request.args.get("summary", "false").lower() == "true",
+        )
+    except ValueError as e:
+        return {"message": str(e)}, 400
     if not session:
         return {"message": "Session not found."}, 404
 
@@ -62,6 +101,20 @@ def get_session(session_id):
             }, 500
 
 
+@session_bp.route("/<session_id>/message/<msg_id>", methods=["GET"])
+def get_session_message(session_id, msg_id):
+    """
+    Get a message of the session with its full content
+    """
+    session_handler = SessionHandler(
+        db=load_db(os.getenv("SERVER_DB_TYPE", app.config["DB_TYPE"]))
+    )
+    message = session_handler.get_message(session_id, msg_id)
+    if not message:
+        return {"message": "Message not found."}, 404
+    return message
+
+
 @videodb_bp.route("/collection", defaults={"collection_id": None}, methods=["GET"])
 @videodb_bp.route("/collection/<collection_id>", methods=["GET"])
 def get_collection_or_all(collection_id):
@@ -226,25 +279,63 @@ def generate_audio_url(collection_id, audio_id):
     except Exception as e:
         return {"message": str(e)}, 500
 
+
+def _upload_progress(upload_id=None):
+    """Build a callback emitting ``upload_progress`` events to the socket given by the ``socket_id`` param."""
+    socket_id = request.args.get("socket_id") or request.headers.get("X-Socket-Id")
+    if not socket_id and request.mimetype == "multipart/form-data":
+        socket_id = request.form.get("socket_id")
+    if not socket_id:
+        return None
+    socketio = app.socketio
+
+    def on_progress(sent, total):
+        socketio.emit(
+            "upload_progress",
+            {"upload_id": upload_id, "sent": sent, "total": total},
+            namespace="/chat",
+            to=socket_id,
+        )
+
+    return on_progress
+
+
+def _content_range_offset():
+    """Start offset of a chunk from the ``Content-Range`` header or the ``offset`` query param."""
+    content_range = request.headers.get("Content-Range")
+    if content_range:
+        unit, _, byte_range = content_range.partition(" ")
+        start = byte_range.partition("-")[0]
+        if unit != "bytes" or not start.isdigit():
+            raise ValueError(f"Invalid Content-Range: {content_range}")
+        return int(start)
+    return request.args.get("offset", default=0, type=int)
+
+
 @videodb_bp.route("/collection/<collection_id>/upload", methods=["POST"])
 def upload_video(collection_id):
-    """Upload a video to a collection."""
+    """Upload a video to a collection.
+
+    Uploaded files are streamed to VideoDB from the spooled request file, pass ``socket_id`` to receive
+    ``upload_progress`` events. Large files should use an upload session instead.
+    """
     try:
         videodb = VideoDBHandler(collection_id)
 
         if "file" in request.files:
             file = request.files["file"]
-            file_bytes = file.read()
             safe_filename = secure_filename(file.filename)
             if not safe_filename:
                 return {"message": "Invalid filename"}, 400
             file_name = os.path.splitext(safe_filename)[0]
             media_type = file.content_type.split("/")[0]
             return videodb.upload(
-                source=file_bytes,
+                source=file.stream,
                 source_type="file",
                 media_type=media_type,
                 name=file_name,
+                content_type=file.content_type,
+                on_progress=_upload_progress(),
             )
         elif "source" in request.json:
             source = request.json["source"]
@@ -256,7 +347,90 @@ def upload_video(collection_id):
         return {"message": str(e)}, 500
 
 
+@videodb_bp.route("/collection/<collection_id>/upload/session", methods=["POST"])
+def create_upload_session(collection_id):
+    """Start a resumable upload.
+
+    Body: ``name``, ``size`` in bytes and ``content_type`` of the file
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        safe_filename = secure_filename(data.get("name") or "")
+        if not safe_filename:
+            return {"message": "Invalid filename"}, 400
+        content_type = data.get("content_type") or "video/mp4"
+        size = data.get("size")
+        if not isinstance(size, int) or size <= 0:
+            return {"message": "size must be a positive number of bytes"}, 400
+
+        videodb = VideoDBHandler(collection_id)
+        return videodb.create_upload_session(
+            name=os.path.splitext(safe_filename)[0],
+            size=size,
+            media_type=content_type.split("/")[0],
+            content_type=content_type,
+        ), 201
+    except Exception as e:
+        return {"message": str(e)}, 500
+
+
+@videodb_bp.route(
+    "/collection/<collection_id>/upload/session/<upload_id>",
+    methods=["GET", "PUT", "DELETE"],
+)
+def upload_session(collection_id, upload_id):
+    """Get the offset to resume from, send a chunk or abort a resumable upload.
+
+    A ``PUT`` body is the raw chunk starting at the offset of the ``Content-Range`` header (or ``offset``
+    param). The chunk completing the file uploads it to VideoDB and returns the media.
+    """
+    try:
+        videodb = VideoDBHandler(collection_id)
+        if request.method == "GET":
+            return videodb.get_upload_session(upload_id)
+        if request.method == "DELETE":
+            videodb.delete_upload_session(upload_id)
+            return {"message": "Upload session deleted"}, 200
+
+        session = videodb.upload_chunk(
+            upload_id, _content_range_offset(), request.stream
+        )
+        if session["offset"] < session["size"]:
+            return session, 202
+        return videodb.complete_upload(
+            upload_id, on_progress=_upload_progress(upload_id)
+        )
+    except UploadSessionNotFound as e:
+        return {"message": str(e)}, 404
+    except UploadOffsetMismatch as e:
+        return {"message": str(e), "offset": e.offset}, 409
+    except ValueError as e:
+        return {"message": str(e)}, 400
+    except Exception as e:
+        return {"message": str(e)}, 500
+
+
 @config_bp.route("/check", methods=["GET"])
 def config_check():
     config_handler = ConfigHandler()
     return config_handler.check()
+
+
+@job_bp.route("/", methods=["GET"], strict_slashes=False)
+def job_stats():
+    """Get the queue depth and job counts of the job queue"""
+    return JobHandler().stats()
+
+
+@job_bp.route("/<job_id>", methods=["GET", "DELETE"])
+def job(job_id):
+    """Get the status of a job, or cancel it"""
+    job_handler = JobHandler()
+    if request.method == "DELETE":
+        if not job_handler.cancel_job(job_id):
+            return {"message": "Job not found or already finished"}, 404
+        return {"message": "Job cancelled"}, 200
+    job = job_handler.get_job(job_id)
+    if job is None:
+        return {"message": "Job not found"}, 404
+    return job
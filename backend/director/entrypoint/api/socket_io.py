@@ -1,18 +1,60 @@
 import os
 
 from flask import current_app as app
-from flask_socketio import Namespace
+from flask_socketio import Namespace, emit
 
 from director.db import load_db
-from director.handler import ChatHandler
+from director.handler import ChatHandler, JobHandler
+from director.jobs import JobQueueFull
+from director.core.session import Session
 
 
 class ChatNamespace(Namespace):
     """Chat namespace for socket.io"""
 
     def on_chat(self, message):
-        """Handle chat messages"""
+        """Handle chat messages
+
+        The turn runs as a background job so the socket worker is free right away, the ack returns the ``job_id``.
+        """
         chat_handler = ChatHandler(
             db=load_db(os.getenv("SERVER_DB_TYPE", app.config["DB_TYPE"]))
         )
-        chat_handler.chat(message)
+        try:
+            job = chat_handler.submit_chat(message)
+        except JobQueueFull as e:
+            return {"status": "error", "message": str(e)}
+        return {"status": "queued", "job_id": job.job_id}
+
+    def on_cancel(self, message):
+        """Cancel the turn of a conversation, keyed by ``session_id`` and ``conv_id``.
+
+        Without ``conv_id`` every turn of the session is cancelled. The output message ends with an error status
+        and the "Cancelled by the user" action.
+        """
+        session_id = message.get("session_id")
+        if not session_id:
+            return {"status": "error", "message": "session_id is required"}
+        chat_handler = ChatHandler(
+            db=load_db(os.getenv("SERVER_DB_TYPE", app.config["DB_TYPE"]))
+        )
+        if chat_handler.cancel(session_id, message.get("conv_id")):
+            return {"status": "success"}
+        return {"status": "not_found"}
+
+    def on_cancel_job(self, message):
+        """Cancel a queued or running chat job by its ``job_id``."""
+        if JobHandler().cancel_job(message.get("job_id")):
+            return {"status": "success"}
+        return {"status": "not_found"}
+
+    def on_resync(self, message):
+        """Handle resync requests from clients receiving delta updates.
+
+        Emits the latest snapshot of the output message as a ``chat`` event, finished messages should be fetched from the session API instead.
+        """
+        snapshot = Session.get_output_message_snapshot(message.get("msg_id"))
+        if snapshot is None:
+            return {"status": "not_found"}
+        emit("chat", snapshot, namespace="/chat")
+        return {"status": "success", "seq": snapshot["seq"]}
@@ -1,5 +1,8 @@
 import os
+import json
+import base64
 import logging
+import threading
 
 from director.agents.frame import FrameAgent
 from director.agents.summarize_video import SummarizeVideoAgent
@@ -26,13 +29,23 @@ from director.agents.code_assistant import CodeAssistantAgent
 from director.agents.web_search_agent import WebSearchAgent
 from director.agents.clone_voice import CloneVoiceAgent
 from director.agents.voice_replacement import VoiceReplacementAgent
+from director.agents.registry import AgentRegistry
 
 
-from director.core.session import Session, InputMessage, MsgStatus
+from director.core.session import (
+    Session,
+    InputMessage,
+    MsgStatus,
+    summarize_content,
+)
 from director.core.reasoning import ReasoningEngine
+from director.core.runs import active_runs
 from director.db.base import BaseDB
 from director.db import load_db
-from director.tools.videodb_tool import VideoDBTool
+from director.jobs import current_job, load_job_queue
+from director.tools.videodb_tool import VideoDBTool, media_cache
+from director.tools.videodb_connection import get_videodb_connection
+from director.tools.videodb_upload import UploadSessionNotFound, upload_sessions
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -41,61 +54,89 @@ logger = logging.getLogger(__name__)
 
 
 class ChatHandler:
+    # Register the agents here
+    agents = [
+        SummarizeVideoAgent,
+        UploadAgent,
+        IndexAgent,
+        SearchAgent,
+        PromptClipAgent,
+        FrameAgent,
+        DownloadAgent,
+        CloneVoiceAgent,
+        CensorAgent,
+        ImageGenerationAgent,
+        AudioGenerationAgent,
+        VideoGenerationAgent,
+        StreamVideoAgent,
+        SubtitleAgent,
+        SlackAgent,
+        EditingAgent,
+        DubbingAgent,
+        TranscriptionAgent,
+        TextToMovieAgent,
+        ComposioAgent,
+        ComparisonAgent,
+        CodeAssistantAgent,
+        WebSearchAgent,
+        VoiceReplacementAgent,
+        PricingAgent,
+    ]
+
+    _registry = None
+    _registry_lock = threading.Lock()
+
     def __init__(self, db, **kwargs):
         self.db = db
 
-        # Register the agents here
-        self.agents = [
-            SummarizeVideoAgent,
-            UploadAgent,
-            IndexAgent,
-            SearchAgent,
-            PromptClipAgent,
-            FrameAgent,
-            DownloadAgent,
-            CloneVoiceAgent,
-            CensorAgent,
-            ImageGenerationAgent,
-            AudioGenerationAgent,
-            VideoGenerationAgent,
-            StreamVideoAgent,
-            SubtitleAgent,
-            SlackAgent,
-            EditingAgent,
-            DubbingAgent,
-            TranscriptionAgent,
-            TextToMovieAgent,
-            ComposioAgent,
-            ComparisonAgent,
-            CodeAssistantAgent,
-            WebSearchAgent,
-            VoiceReplacementAgent,
-            PricingAgent,
-        ]
+    @classmethod
+    def get_registry(cls) -> AgentRegistry:
+        """Return the process-wide agent registry, built on first use."""
+        with cls._registry_lock:
+            if cls._registry is None:
+                cls._registry = AgentRegistry(cls.agents)
+            return cls._registry
 
     def add_videodb_state(self, session):
-        from videodb import connect
-
-        session.state["conn"] = connect(
-            base_url=os.getenv("VIDEO_DB_BASE_URL", "https://api.videodb.io")
-        )
-        session.state["collection"] = session.state["conn"].get_collection(
+        session.state["conn"], session.state["collection"] = get_videodb_connection(
             session.collection_id
         )
         if session.video_id:
             session.state["video"] = session.state["collection"].get_video(
                 session.video_id
             )
+            media_cache.seed_videos([session.state["video"]])
 
     def agents_list(self):
-        return [
-            {
-                "name": agent_instance.name,
-                "description": agent_instance.agent_description,
-            }
-            for agent in self.agents
-            for agent_instance in [agent(Session(db=self.db))]
-        ]
+        return self.get_registry().agents_list()
+
+    def submit_chat(self, message):
+        """Queue the chat turn as a background job, the output is still streamed to the sender's socket."""
+        return load_job_queue().submit(
+            self.chat,
+            message,
+            name="chat",
+            metadata={
+                "session_id": message.get("session_id"),
+                "conv_id": message.get("conv_id"),
+            },
+        )
+
+    def cancel(self, session_id, conv_id=None):
+        """Cancel the queued and running turns of a conversation, or of the whole session if ``conv_id`` is None.
+
+        :return: True if a queued or running turn was found
+        """
+        metadata = {"session_id": session_id}
+        if conv_id is not None:
+            metadata["conv_id"] = conv_id
+        job_queue = load_job_queue()
+        cancelled = sum(
+            job_queue.cancel(job.job_id) for job in job_queue.find(**metadata)
+        )
+        # Runs started outside of the job queue are reached through the registry
+        cancelled += active_runs.cancel(session_id, conv_id)
+        return cancelled > 0
 
     def chat(self, message):
         logger.info(f"ChatHandler input message: {message}")
@@ -107,34 +148,137 @@ class ChatHandler:
 
         try:
             self.add_videodb_state(session)
-            agents = [agent(session=session) for agent in self.agents]
-            agents_mapping = {agent.name: agent for agent in agents}
-
             res_eng = ReasoningEngine(input_message=input_message, session=session)
-            if input_message.agents:
-                for agent_name in input_message.agents:
-                    res_eng.register_agents([agents_mapping[agent_name]])
-            else:
-                res_eng.register_agents(agents)
+            res_eng.register_agents(
+                self.get_registry().bind(session, input_message.agents or None)
+            )
 
-            res_eng.run()
+            job = current_job()
+            remove_cancel_callback = (
+                job.add_cancel_callback(res_eng.cancel) if job is not None else None
+            )
+            try:
+                res_eng.run()
+            finally:
+                if remove_cancel_callback is not None:
+                    remove_cancel_callback()
 
         except Exception as e:
             session.output_message.update_status(MsgStatus.error)
             logger.exception(f"Error in chat handler: {e}")
 
 
+class JobHandler:
+    def __init__(self, **kwargs):
+        self.job_queue = load_job_queue()
+
+    def stats(self):
+        """Get the queue depth and job counts of the job queue."""
+        return self.job_queue.stats()
+
+    def get_job(self, job_id):
+        job = self.job_queue.get(job_id)
+        return job.to_dict() if job else None
+
+    def cancel_job(self, job_id):
+        return self.job_queue.cancel(job_id)
+
+
 class SessionHandler:
     def __init__(self, db: BaseDB, **kwargs):
         self.db = db
 
-    def get_sessions(self):
+    def get_sessions(
+        self,
+        limit: int = None,
+        cursor: str = None,
+        collection_id: str = None,
+        video_id: str = None,
+        fields: list = None,
+    ):
+        """Get sessions, newest first.
+
+        Without a limit all sessions are returned as a list. With a limit a page is returned as
+        ``{"sessions": [...], "next_cursor": ...}``, pass ``next_cursor`` back to get the next page.
+        """
         session = Session(db=self.db)
-        return session.get_all()
+        if limit is None and cursor is None:
+            return session.get_all(
+                collection_id=collection_id, video_id=video_id, fields=fields
+            )
 
-    def get_session(self, session_id):
-        session = Session(db=self.db, session_id=session_id)
-        return session.get()
+        limit = limit or 20
+        sessions = session.get_all(
+            limit=limit + 1,
+            cursor=self._decode_cursor(cursor) if cursor else None,
+            collection_id=collection_id,
+            video_id=video_id,
+            fields=fields,
+        )
+        next_cursor = None
+        if len(sessions) > limit:
+            sessions = sessions[:limit]
+            next_cursor = self._encode_cursor(
+                {
+                    "updated_at": sessions[-1]["updated_at"],
+                    "session_id": sessions[-1]["session_id"],
+                }
+            )
+        return {"sessions": sessions, "next_cursor": next_cursor}
+
+    @staticmethod
+    def _encode_cursor(cursor: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> dict:
+        try:
+            return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except Exception:
+            raise ValueError("Invalid cursor")
+
+    def get_session(
+        self,
+        session_id,
+        limit: int = None,
+        cursor: str = None,
+        summary: bool = False,
+    ):
+        """Get a session with its conversation.
+
+        The session and its messages are read straight from the database, the reasoning context is not loaded.
+        With a limit or cursor the conversation is paginated newest first and ``next_cursor`` is added to the session.
+        """
+        paginated = limit is not None or cursor is not None
+        limit = limit or 20
+        session_data = self.db.get_session(session_id)
+        conversation = self.db.get_conversations(
+            session_id,
+            limit=limit + 1 if paginated else None,
+            cursor=self._decode_cursor(cursor) if cursor else None,
+        )
+        next_cursor = None
+        if paginated and len(conversation) > limit:
+            conversation = conversation[:limit]
+            next_cursor = self._encode_cursor(
+                {
+                    "created_at": conversation[-1]["created_at"],
+                    "msg_id": conversation[-1]["msg_id"],
+                }
+            )
+        if summary:
+            for message in conversation:
+                message["content"] = summarize_content(message["content"])
+                message["content_summary"] = True
+        session_data["conversation"] = conversation
+        if paginated:
+            session_data["next_cursor"] = next_cursor
+        return session_data
+
+    def get_message(self, session_id, msg_id):
+        """Get a single message of a session with its full content."""
+        messages = self.db.get_conversations(session_id, msg_id=msg_id)
+        return messages[0] if messages else {}
 
     def delete_session(self, session_id):
         session = Session(db=self.db, session_id=session_id)
@@ -145,8 +289,64 @@ class VideoDBHandler:
     def __init__(self, collection_id="default"):
         self.videodb_tool = VideoDBTool(collection_id=collection_id)
 
-    def upload(self, source, source_type="url", media_type="video", name=None):
-        return self.videodb_tool.upload(source, source_type, media_type, name)
+    def upload(
+        self,
+        source,
+        source_type="url",
+        media_type="video",
+        name=None,
+        content_type=None,
+        on_progress=None,
+    ):
+        return self.videodb_tool.upload(
+            source, source_type, media_type, name, content_type, on_progress
+        )
+
+    def create_upload_session(self, name, size, media_type="video", content_type=None):
+        """Start a resumable upload of a file of ``size`` bytes."""
+        return upload_sessions.create(
+            collection_id=self.videodb_tool.collection.id,
+            name=name,
+            size=size,
+            media_type=media_type,
+            content_type=content_type,
+        )
+
+    def get_upload_session(self, upload_id):
+        """Get an upload session of the collection."""
+        session = upload_sessions.get(upload_id)
+        if session["collection_id"] != self.videodb_tool.collection.id:
+            raise UploadSessionNotFound(f"Upload session {upload_id} not found")
+        return session
+
+    def upload_chunk(self, upload_id, offset, stream):
+        """Append a chunk to an upload session, returns the session with the offset to continue from."""
+        self.get_upload_session(upload_id)
+        return upload_sessions.append(upload_id, offset, stream)
+
+    def complete_upload(self, upload_id, on_progress=None):
+        """Stream the received file of an upload session to VideoDB and remove the session."""
+        session = self.get_upload_session(upload_id)
+        if session["offset"] < session["size"]:
+            raise ValueError(
+                f"Upload is incomplete, {session['offset']} of {session['size']} bytes received"
+            )
+        with upload_sessions.open(upload_id) as file:
+            media = self.upload(
+                file,
+                source_type="file",
+                media_type=session["media_type"],
+                name=session["name"],
+                content_type=session["content_type"],
+                on_progress=on_progress,
+            )
+        upload_sessions.delete(upload_id)
+        return media
+
+    def delete_upload_session(self, upload_id):
+        """Abort an upload session."""
+        self.get_upload_session(upload_id)
+        upload_sessions.delete(upload_id)
 
     def get_collection(self):
         """Get a collection by ID."""
@@ -0,0 +1,27 @@
+import os
+import threading
+
+from director.constants import JobQueueType
+from .base import BaseJobQueue, Job, JobQueueFull, JobStatus, current_job
+from .local import LocalJobQueue
+
+job_queue_types = {
+    JobQueueType.LOCAL: LocalJobQueue,
+}
+
+_job_queues = {}
+_job_queues_lock = threading.Lock()
+
+
+def load_job_queue(queue_type: str = None) -> BaseJobQueue:
+    """Return the process-wide job queue of the given type, it is created on first use."""
+    if queue_type is None:
+        queue_type = os.getenv("JOB_QUEUE_TYPE", "local").lower()
+    if queue_type not in job_queue_types:
+        raise ValueError(
+            f"Unknown job queue type: {queue_type}, Valid job queue types are: {[queue_type.value for queue_type in job_queue_types]}"
+        )
+    with _job_queues_lock:
+        if queue_type not in _job_queues:
+            _job_queues[queue_type] = job_queue_types[JobQueueType(queue_type)]()
+        return _job_queues[queue_type]
@@ -0,0 +1,142 @@
+import time
+import uuid
+import logging
+import threading
+import contextvars
+
+from abc import ABC, abstractmethod
+from enum import Enum
+
+logger = logging.getLogger(__name__)
+
+# The job running in the current thread, set by the queue while the job runs
+_current_job = contextvars.ContextVar("current_job", default=None)
+
+
+def current_job():
+    """Return the job running in the current context, None outside of a job."""
+    return _current_job.get()
+
+
+class JobStatus(str, Enum):
+    """Status of a job."""
+
+    queued = "queued"
+    running = "running"
+    success = "success"
+    error = "error"
+    cancelled = "cancelled"
+
+
+FINISHED_STATUSES = (JobStatus.success, JobStatus.error, JobStatus.cancelled)
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted to a queue which has no room left."""
+
+
+class Job:
+    """A unit of work run by a job queue.
+
+    Cancellation is cooperative: queued jobs don't start, running jobs get their ``cancel_event`` set and
+    their cancel callbacks called, the work is expected to check them and stop early.
+
+    :param str name: Name of the job, e.g. ``chat``
+    :param dict metadata: Identifiers of the work, e.g. ``session_id`` and ``conv_id``
+    """
+
+    def __init__(self, name: str = "job", metadata: dict = None):
+        self.job_id = str(uuid.uuid4())
+        self.name = name
+        self.metadata = metadata or {}
+        self.status = JobStatus.queued
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self._cancel_callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def add_cancel_callback(self, callback):
+        """Call ``callback`` when the job is cancelled, right away if it already is.
+
+        :return: Function removing the callback once the work it stops is done
+        """
+        with self._lock:
+            if not self.cancel_event.is_set():
+                self._cancel_callbacks.append(callback)
+                return lambda: self._remove_cancel_callback(callback)
+        callback()
+        return lambda: None
+
+    def _remove_cancel_callback(self, callback):
+        with self._lock:
+            try:
+                self._cancel_callbacks.remove(callback)
+            except ValueError:
+                # Already called or removed
+                pass
+
+    def request_cancel(self):
+        """Set the cancel event and call the cancel callbacks once."""
+        with self._lock:
+            if self.cancel_event.is_set():
+                return
+            self.cancel_event.set()
+            callbacks, self._cancel_callbacks = self._cancel_callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Cancel callback of job {self.job_id} failed: {e}")
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "name": self.name,
+            "metadata": self.metadata,
+            "status": self.status.value,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class BaseJobQueue(ABC):
+    """Interface for job queues, a queue runs submitted jobs in the background with a bounded concurrency."""
+
+    @abstractmethod
+    def submit(
+        self, fn, *args, name: str = "job", metadata: dict = None, **kwargs
+    ) -> Job:
+        """Queue ``fn(*args, **kwargs)`` as a job.
+
+        :raises JobQueueFull: If the queue has no room for the job
+        """
+        pass
+
+    @abstractmethod
+    def get(self, job_id: str) -> Job:
+        """Get a job by job_id, None if it is unknown."""
+        pass
+
+    @abstractmethod
+    def find(self, **metadata) -> list:
+        """Get the unfinished jobs whose metadata match the given values."""
+        pass
+
+    @abstractmethod
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job, returns False if the job is unknown or already finished."""
+        pass
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Get the queue metrics, e.g. the number of queued and running jobs."""
+        pass
@@ -0,0 +1,149 @@
+import time
+import logging
+import threading
+import contextvars
+import concurrent.futures
+
+from collections import Counter, OrderedDict
+
+from director.jobs.base import (
+    BaseJobQueue,
+    Job,
+    JobQueueFull,
+    JobStatus,
+    FINISHED_STATUSES,
+    _current_job,
+)
+from director.utils.env import env_int
+
+logger = logging.getLogger(__name__)
+
+
+class LocalJobQueue(BaseJobQueue):
+    """Run jobs in a thread pool of the current process.
+
+    The context of the submitting thread is copied to the job, so socket emits of a chat turn still reach
+    the client which sent the message.
+
+    :param int max_concurrency: Jobs running at the same time, defaults to ``JOB_MAX_CONCURRENCY`` (4)
+    :param int max_queued: Jobs waiting for a worker before submits are rejected, defaults to ``JOB_MAX_QUEUED`` (100)
+    :param int history_size: Finished jobs kept for status lookups, defaults to ``JOB_HISTORY_SIZE`` (1000)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = None,
+        max_queued: int = None,
+        history_size: int = None,
+    ):
+        self.max_concurrency = max_concurrency or env_int("JOB_MAX_CONCURRENCY", 4)
+        self.max_queued = max_queued or env_int("JOB_MAX_QUEUED", 100)
+        self.history_size = history_size or env_int("JOB_HISTORY_SIZE", 1000)
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="job"
+        )
+        self._jobs = OrderedDict()
+        self._futures = {}
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def _count(self, status: JobStatus) -> int:
+        return sum(1 for job in self._jobs.values() if job.status == status)
+
+    def _prune(self):
+        finished = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.status in FINISHED_STATUSES
+        ]
+        for job_id in finished[: max(len(finished) - self.history_size, 0)]:
+            del self._jobs[job_id]
+
+    def _finish(self, job: Job, status: JobStatus, error: str = None):
+        with self._lock:
+            job.status = status
+            job.error = error
+            job.finished_at = time.time()
+            self._futures.pop(job.job_id, None)
+            self._counts[status] += 1
+            self._prune()
+
+    def submit(
+        self, fn, *args, name: str = "job", metadata: dict = None, **kwargs
+    ) -> Job:
+        job = Job(name=name, metadata=metadata)
+        context = contextvars.copy_context()
+        with self._lock:
+            queued = self._count(JobStatus.queued)
+            if queued >= self.max_queued:
+                raise JobQueueFull(
+                    f"Too many queued jobs ({queued}), please try again later"
+                )
+            self._jobs[job.job_id] = job
+            self._futures[job.job_id] = self._executor.submit(
+                context.run, self._run, job, fn, args, kwargs
+            )
+        logger.info(
+            f"Queued {name} job {job.job_id}, {queued + 1} queued, {self._count(JobStatus.running)} running"
+        )
+        return job
+
+    def _run(self, job: Job, fn, args, kwargs):
+        with self._lock:
+            if job.status != JobStatus.queued:
+                return
+            job.status = JobStatus.running
+            job.started_at = time.time()
+        token = _current_job.set(job)
+        try:
+            fn(*args, **kwargs)
+        except Exception as e:
+            logger.exception(f"Job {job.job_id} failed: {e}")
+            self._finish(job, JobStatus.error, str(e))
+            return
+        finally:
+            _current_job.reset(token)
+        self._finish(
+            job, JobStatus.cancelled if job.cancel_requested else JobStatus.success
+        )
+
+    def get(self, job_id: str) -> Job:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def find(self, **metadata) -> list:
+        with self._lock:
+            return [
+                job
+                for job in self._jobs.values()
+                if job.status not in FINISHED_STATUSES
+                and all(
+                    job.metadata.get(key) == value for key, value in metadata.items()
+                )
+            ]
+
+    def cancel(self, job_id: str) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED_STATUSES:
+                return False
+            future = self._futures.get(job_id)
+            queued = job.status == JobStatus.queued
+        job.request_cancel()
+        if queued and future is not None and future.cancel():
+            self._finish(job, JobStatus.cancelled)
+        logger.info(f"Cancelled job {job_id}")
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "type": "local",
+                "max_concurrency": self.max_concurrency,
+                "max_queued": self.max_queued,
+                "queued": self._count(JobStatus.queued),
+                "running": self._count(JobStatus.running),
+                "succeeded": self._counts[JobStatus.success],
+                "failed": self._counts[JobStatus.error],
+                "cancelled": self._counts[JobStatus.cancelled],
+            }
@@ -58,6 +58,10 @@ class AnthropicAI(BaseLLM):
 
         self.client = anthropic.Anthropic(api_key=self.api_key)
 
+    def count_tokens(self, text: str) -> int:
+        """Estimate tokens for Claude models, which average ~3.5 characters per token."""
+        return len(text) * 2 // 7 + 1
+
     def _format_messages(self, messages: list):
         system = ""
         formatted_messages = []
@@ -183,3 +187,34 @@ class AnthropicAI(BaseLLM):
             total_tokens=(response.usage.input_tokens + response.usage.output_tokens),
             status=LLMResponseStatus.SUCCESS,
         )
+
+    def stream_chat_completions(self, messages: list, on_delta, stop=None):
+        """Stream the completion of a chat, ``on_delta`` is called with each new piece of the text.
+
+        docs: https://docs.anthropic.com/en/api/messages-streaming
+        """
+        system, messages = self._format_messages(messages)
+        params = {
+            "model": self.chat_model,
+            "messages": messages,
+            "system": system,
+            "max_tokens": self.max_tokens,
+        }
+        if stop:
+            params["stop_sequences"] = [stop] if isinstance(stop, str) else stop
+
+        content = []
+        with self.client.messages.stream(**params) as stream:
+            for text in stream.text_stream:
+                content.append(text)
+                on_delta(text)
+            response = stream.get_final_message()
+
+        return LLMResponse(
+            content="".join(content),
+            finish_reason=response.stop_reason,
+            send_tokens=response.usage.input_tokens,
+            recv_tokens=response.usage.output_tokens,
+            total_tokens=(response.usage.input_tokens + response.usage.output_tokens),
+            status=LLMResponseStatus.SUCCESS,
+        )
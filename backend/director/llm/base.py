@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import Callable, List, Dict
 
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings
@@ -33,6 +33,9 @@ class BaseLLMConfig(BaseSettings):
     :param float top_p: Top p sampling for completions.
     :param int max_tokens: Maximum tokens to generate.
     :param int timeout: Timeout for the request.
+    :param int context_token_budget: Maximum prompt tokens sent from the reasoning context.
+    :param int chunk_token_budget: Maximum tokens of content sent in one request when a long input is chunked.
+    :param int max_concurrent_requests: Maximum requests sent in parallel, keep it under the rate limit of the provider.
     """
 
     llm_type: str = ""
@@ -44,6 +47,9 @@ class BaseLLMConfig(BaseSettings):
     max_tokens: int = 4096
     timeout: int = 120
     enable_langfuse: bool = False
+    context_token_budget: int = 100000
+    chunk_token_budget: int = 8000
+    max_concurrent_requests: int = 8
 
 
 class BaseLLM(ABC):
@@ -63,8 +69,91 @@ class BaseLLM(ABC):
         self.max_tokens = config.max_tokens
         self.timeout = config.timeout
         self.enable_langfuse = config.enable_langfuse
+        self.context_token_budget = config.context_token_budget
+        self.chunk_token_budget = config.chunk_token_budget
+        self.max_concurrent_requests = config.max_concurrent_requests
+
+    def count_tokens(self, text: str) -> int:
+        """Estimate the number of tokens in the text.
+
+        The default estimate assumes ~4 characters per token, LLMs with a local tokenizer should override this.
+        """
+        return len(text) // 4 + 1
 
     @abstractmethod
     def chat_completions(self, messages: List[Dict], tools: List[Dict]) -> LLMResponse:
         """Abstract method for chat completions"""
         pass
+
+    def stream_chat_completions(
+        self, messages: List[Dict], on_delta: Callable[[str], None], stop=None
+    ) -> LLMResponse:
+        """Streaming variant of :meth:`chat_completions` for plain text answers.
+
+        ``on_delta`` is called with each new piece of the text as it is generated, the returned response holds
+        the full text. LLMs without streaming support get the whole text in a single delta.
+
+        :param list messages: The messages of the chat
+        :param on_delta: Function called with each new piece of the text
+        :param stop: Sequences where the generation stops
+        """
+        response = self.chat_completions(messages=messages, stop=stop)
+        if response.status and response.content:
+            on_delta(response.content)
+        return response
+
+    def _stream_openai_chat(self, params: dict, on_delta: Callable[[str], None]):
+        """Run a streamed chat completion on an OpenAI compatible ``self.client`` and collect the deltas.
+
+        :param dict params: Parameters of ``chat.completions.create``, with ``stream`` set
+        :param on_delta: Function called with each new piece of the text
+        """
+        content = []
+        finish_reason = ""
+        usage = None
+        try:
+            for chunk in self.client.chat.completions.create(**params):
+                if getattr(chunk, "usage", None):
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                if choice.delta and choice.delta.content:
+                    content.append(choice.delta.content)
+                    on_delta(choice.delta.content)
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+        except Exception as e:
+            print(f"Error: {e}")
+            return LLMResponse(content=f"Error: {e}")
+
+        return LLMResponse(
+            content="".join(content),
+            finish_reason=finish_reason,
+            send_tokens=usage.prompt_tokens if usage else 0,
+            recv_tokens=usage.completion_tokens if usage else 0,
+            total_tokens=usage.total_tokens if usage else 0,
+            status=LLMResponseStatus.SUCCESS,
+        )
+
+
+class TiktokenMixin:
+    """Count tokens with the tiktoken encoding of ``chat_model``, for LLMs using OpenAI tokenizers.
+
+    Falls back to the estimate of :meth:`BaseLLM.count_tokens` if tiktoken is not installed or doesn't know the model.
+    """
+
+    _encoding = None
+
+    def count_tokens(self, text: str) -> int:
+        """Count tokens using tiktoken if it is installed, else fall back to the estimate."""
+        if self._encoding is None:
+            try:
+                import tiktoken
+
+                self._encoding = tiktoken.encoding_for_model(self.chat_model)
+            except Exception:
+                self._encoding = False
+        if not self._encoding:
+            return super().count_tokens(text)
+        return len(self._encoding.encode(text, disallowed_special=()))
@@ -183,3 +183,21 @@ class GoogleAI(BaseLLM):
             total_tokens=response.usage.total_tokens,
             status=LLMResponseStatus.SUCCESS,
         )
+
+    def stream_chat_completions(self, messages: list, on_delta, stop=None):
+        """Stream the completion of a chat, ``on_delta`` is called with each new piece of the text.
+
+        docs: https://ai.google.dev/gemini-api/docs/openai#streaming
+        """
+        params = {
+            "model": self.chat_model,
+            "messages": self._format_messages(messages),
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "top_p": self.top_p,
+            "stop": stop,
+            "timeout": self.timeout,
+            "stream": True,
+        }
+
+        return self._stream_openai_chat(params, on_delta)
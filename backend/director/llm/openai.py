@@ -5,7 +5,13 @@ from pydantic import Field, field_validator, FieldValidationInfo
 from pydantic_settings import SettingsConfigDict
 
 
-from director.llm.base import BaseLLM, BaseLLMConfig, LLMResponse, LLMResponseStatus
+from director.llm.base import (
+    BaseLLM,
+    BaseLLMConfig,
+    LLMResponse,
+    LLMResponseStatus,
+    TiktokenMixin,
+)
 from director.constants import (
     LLMType,
     EnvPrefix,
@@ -48,7 +54,7 @@ class OpenaiConfig(BaseLLMConfig):
         return v
 
 
-class OpenAI(BaseLLM):
+class OpenAI(TiktokenMixin, BaseLLM):
     def __init__(self, config: OpenaiConfig = None):
         """
         :param config: OpenAI Config
@@ -68,6 +74,9 @@ class OpenAI(BaseLLM):
 
         self.chat_completions = observe(name=type(self).__name__)(self.chat_completions)
         self.text_completions = observe(name=type(self).__name__)(self.text_completions)
+        self.stream_chat_completions = observe(name=type(self).__name__)(
+            self.stream_chat_completions
+        )
 
     def _format_messages(self, messages: list):
         """Format the messages to the format that OpenAI expects."""
@@ -188,3 +197,22 @@ class OpenAI(BaseLLM):
             total_tokens=response.usage.total_tokens,
             status=LLMResponseStatus.SUCCESS,
         )
+
+    def stream_chat_completions(self, messages: list, on_delta, stop=None):
+        """Stream the completion of a chat, ``on_delta`` is called with each new piece of the text.
+
+        docs: https://platform.openai.com/docs/api-reference/chat-streaming
+        """
+        params = {
+            "model": self.chat_model,
+            "messages": self._format_messages(messages),
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "top_p": self.top_p,
+            "stop": stop,
+            "timeout": self.timeout,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
+
+        return self._stream_openai_chat(params, on_delta)
@@ -5,7 +5,13 @@ from enum import Enum
 from pydantic import Field, field_validator, FieldValidationInfo
 
 
-from director.llm.base import BaseLLM, BaseLLMConfig, LLMResponse, LLMResponseStatus
+from director.llm.base import (
+    BaseLLM,
+    BaseLLMConfig,
+    LLMResponse,
+    LLMResponseStatus,
+    TiktokenMixin,
+)
 from director.constants import (
     LLMType,
 )
@@ -34,7 +40,7 @@ class VideoDBProxyConfig(BaseLLMConfig):
         return v
 
 
-class VideoDBProxy(BaseLLM):
+class VideoDBProxy(TiktokenMixin, BaseLLM):
     def __init__(self, config: VideoDBProxyConfig = None):
         """
         :param config: OpenAI Config
@@ -168,3 +174,21 @@ class VideoDBProxy(BaseLLM):
             total_tokens=response.usage.total_tokens,
             status=LLMResponseStatus.SUCCESS,
         )
+
+    def stream_chat_completions(self, messages: list, on_delta, stop=None):
+        """Stream the completion of a chat, ``on_delta`` is called with each new piece of the text.
+
+        docs: https://platform.openai.com/docs/api-reference/chat-streaming
+        """
+        params = {
+            "model": self.chat_model,
+            "messages": self._format_messages(messages),
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "top_p": self.top_p,
+            "stop": stop,
+            "timeout": self.timeout,
+            "stream": True,
+        }
+
+        return self._stream_openai_chat(params, on_delta)
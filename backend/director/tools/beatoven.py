@@ -1,7 +1,11 @@
-import time
 from typing import Optional
 import requests
 import logging
+import concurrent.futures
+
+from director.utils.cancellation import RunCancelled, current_cancel_event
+from director.utils.download import DOWNLOAD_TIMEOUT, download_file
+from director.utils.poller import PollResult, get_poller, retry_after_hint
 
 logger = logging.getLogger(__name__)
 
@@ -45,26 +49,38 @@ class BeatovenTool:
             compose_response.raise_for_status()
             compose_data = compose_response.json()
             task_id = compose_data["task_id"]
+            # The checks run on the poller threads, take the cancellation of the calling run along
+            cancel_event = current_cancel_event()
 
-            while True:
+            def check():
                 status_response = requests.get(
-                    f"{self.base_url}/api/v1/tasks/{task_id}", headers=self.headers
+                    f"{self.base_url}/api/v1/tasks/{task_id}",
+                    headers=self.headers,
+                    timeout=DOWNLOAD_TIMEOUT,
                 )
                 status_response.raise_for_status()
                 status_data = status_response.json()
 
                 if status_data["status"] == "composed":
-                    track_url = status_data["meta"]["track_url"]
-                    audio_response = requests.get(track_url)
-                    audio_response.raise_for_status()
-
-                    with open(save_at, "wb") as f:
-                        f.write(audio_response.content)
-                    break
+                    return PollResult.complete(status_data["meta"]["track_url"])
                 elif status_data["status"] in ["composing", "running"]:
-                    time.sleep(5)
+                    return PollResult.pending(
+                        retry_after=retry_after_hint(status_response)
+                    )
                 else:
                     raise Exception(f"Unexpected status: {status_data['status']}")
 
+            track_url = get_poller().wait(
+                check,
+                interval=5,
+                max_interval=15,
+                cancel_event=cancel_event,
+                name=f"beatoven {task_id}",
+            )
+            # Download on this thread, the poller threads only check the status
+            download_file(track_url, save_at, cancel_event=cancel_event)
+
+        except (RunCancelled, concurrent.futures.CancelledError):
+            raise RunCancelled()
         except Exception as e:
             raise Exception(f"Error generating sound effect: {str(e)}")
@@ -1,10 +1,22 @@
-import time
+import os
+import logging
+import concurrent.futures
+
 from typing import Optional
 
 from elevenlabs.client import ElevenLabs
 from elevenlabs import VoiceSettings
 from elevenlabs.core import RequestOptions
 
+from director.utils.cancellation import (
+    RunCancelled,
+    current_cancel_event,
+    raise_if_cancelled,
+)
+from director.utils.poller import PollResult, get_poller
+
+logger = logging.getLogger(__name__)
+
 DEFAULT_VOICES = """
 1. 9BWtsMINqrJLrRacOk9x - Aria: Expressive, American, female.
 2. CwhRBWXzGAHq8TQ4Fs17 - Roger: Confident, American, male.
@@ -218,35 +230,47 @@ class ElevenLabsTool:
 
     def wait_for_dub_job(self, dubbing_id: str) -> bool:
         """Wait for dubbing to complete."""
-        MAX_ATTEMPTS = 120
+        TIMEOUT = 3600  # In seconds
         CHECK_INTERVAL = 30  # In seconds
 
-        for _ in range(MAX_ATTEMPTS):
-            try:
-                metadata = self.client.dubbing.get_dubbing_project_metadata(dubbing_id)
-                print("this is metadata", metadata)
-                if metadata.status == "dubbed":
-                    return True
-                elif metadata.status == "dubbing":
-                    time.sleep(CHECK_INTERVAL)
-                else:
-                    return False
-            except Exception as e:
-                print(f"Error checking dubbing status: {str(e)}")
-                return False
-        return False
+        def check():
+            metadata = self.client.dubbing.get_dubbing_project_metadata(dubbing_id)
+            logger.debug(f"Dubbing {dubbing_id} status: {metadata.status}")
+            if metadata.status == "dubbing":
+                return PollResult.pending()
+            return PollResult.complete(metadata.status == "dubbed")
+
+        try:
+            return get_poller().wait(
+                check,
+                interval=10,
+                max_interval=CHECK_INTERVAL,
+                timeout=TIMEOUT,
+                cancel_event=current_cancel_event(),
+                name=f"elevenlabs dubbing {dubbing_id}",
+            )
+        except concurrent.futures.CancelledError:
+            raise RunCancelled()
+        except Exception as e:
+            logger.error(f"Error checking dubbing status: {str(e)}")
+            return False
 
     def download_dub_file(
         self, dubbing_id: str, language_code: str, output_path: str
     ) -> Optional[str]:
-        """Download the dubbed file."""
+        """Download the dubbed file, the partial file is removed if the run is cancelled."""
         try:
             with open(output_path, "wb") as file:
                 for chunk in self.client.dubbing.get_dubbed_file(
                     dubbing_id, language_code
                 ):
+                    raise_if_cancelled()
                     file.write(chunk)
             return output_path
+        except RunCancelled:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            raise
         except Exception as e:
             print(f"Error downloading dubbed file: {str(e)}")
             return None
@@ -1,8 +1,9 @@
 import os
 import fal_client
-import requests
 from typing import Optional
 
+from director.utils.download import download_file
+
 
 PARAMS_CONFIG = {
     "text_to_video": {
@@ -84,8 +85,7 @@ class FalVideoGenerationTool:
                 arguments={"prompt": prompt, "duration": duration},
             )
             video_url = res["video"]["url"]
-            with open(save_at, "wb") as f:
-                f.write(requests.get(video_url).content)
+            download_file(video_url, save_at)
 
         except Exception as e:
             raise Exception(f"Error generating video: {type(e).__name__}: {str(e)}")
@@ -120,8 +120,7 @@ class FalVideoGenerationTool:
 
             video_url = res["video"]["url"]
 
-            with open(save_at, "wb") as f:
-                f.write(requests.get(video_url).content)
+            download_file(video_url, save_at)
         except Exception as e:
             raise Exception(f"Error generating video: {type(e).__name__}: {str(e)}")
 
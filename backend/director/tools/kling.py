@@ -1,6 +1,11 @@
 import requests
 import time
 import jwt
+import concurrent.futures
+
+from director.utils.cancellation import RunCancelled, current_cancel_event
+from director.utils.download import download_file
+from director.utils.poller import PollResult, get_poller, retry_after_hint
 
 PARAMS_CONFIG = {
     "text_to_video": {
@@ -126,16 +131,16 @@ class KlingAITool:
         token = jwt.encode(payload, self.secret_key, headers=headers)
         return token
 
-    def text_to_video(
-        self, prompt: str, save_at: str, duration: float, config: dict
-    ):
+    def submit_text_to_video(self, prompt: str, duration: float, config: dict):
         """
-        Generate a video from a text prompt using KlingAI's API.
+        Start a video generation with KlingAI's API, the job is polled by the shared job poller.
         :param str prompt: The text prompt to generate the video
-        :param str save_at: File path to save the generated video
         :param float duration: Duration of the video in seconds
         :param dict config: Additional configuration options
+        :return: Future resolved with the URL of the generated video
         """
+        # The checks run on the poller threads, take the cancellation of the calling run along
+        cancel_event = current_cancel_event()
         api_key = self.get_authorization_token()
         headers = {
             "Authorization": f"Bearer {api_key}",
@@ -162,26 +167,47 @@ class KlingAITool:
         # Polling for the video generation completion
         result_endpoint = f"{self.api_route}/v1/videos/text2video/{job_id}"
 
-        while True:
+        def check():
+            # The token expires after 30 minutes, refresh it for every check
             response = requests.get(
-                result_endpoint, headers={"Authorization": f"Bearer {api_key}"}
+                result_endpoint,
+                headers={"Authorization": f"Bearer {self.get_authorization_token()}"},
             )
             response.raise_for_status()
 
-            print("Kling Response", response)
-
-            status = response.json()["data"]["task_status"]
+            data = response.json()["data"]
+            status = data["task_status"]
 
             if status == "succeed":
-                # Video generation is complete
-                video_url = response.json()["data"]["task_result"]["videos"][0]["url"]
-                # Download and save the video
-                video_response = requests.get(video_url)
-                video_response.raise_for_status()
-                with open(save_at, "wb") as f:
-                    f.write(video_response.content)
-                break
-            else:
-                # Still processing
-                time.sleep(self.polling_interval)
-                continue
\ No newline at end of file
+                # Video generation is complete, the caller downloads it so the poller threads stay free
+                return PollResult.complete(data["task_result"]["videos"][0]["url"])
+            elif status == "failed":
+                raise Exception(
+                    f"Video generation failed: {data.get('task_status_msg', '')}"
+                )
+            # Still processing
+            return PollResult.pending(retry_after=retry_after_hint(response))
+
+        return get_poller().submit(
+            check,
+            interval=self.polling_interval,
+            max_interval=self.polling_interval * 2,
+            cancel_event=cancel_event,
+            name=f"kling {job_id}",
+        )
+
+    def text_to_video(
+        self, prompt: str, save_at: str, duration: float, config: dict
+    ):
+        """
+        Generate a video from a text prompt using KlingAI's API.
+        :param str prompt: The text prompt to generate the video
+        :param str save_at: File path to save the generated video
+        :param float duration: Duration of the video in seconds
+        :param dict config: Additional configuration options
+        """
+        try:
+            video_url = self.submit_text_to_video(prompt, duration, config).result()
+        except concurrent.futures.CancelledError:
+            raise RunCancelled()
+        download_file(video_url, save_at, cancel_event=current_cancel_event())
@@ -1,7 +1,11 @@
 import requests
-import time
 from PIL import Image
 import io
+import concurrent.futures
+
+from director.utils.cancellation import RunCancelled, current_cancel_event
+from director.utils.download import download_file
+from director.utils.poller import PollResult, get_poller, retry_after_hint
 
 PARAMS_CONFIG = {
     "text_to_video": {
@@ -118,18 +122,39 @@ class StabilityAITool:
             "authorization": f"Bearer {self.api_key}",
         }
 
-        while True:
+        result_url = f"{self.result_endpoint}/{generation_id}"
+        # The checks run on the poller threads, take the cancellation of the calling run along
+        cancel_event = current_cancel_event()
+
+        def check():
+            # Only the status is needed here, the body is downloaded by the caller
             result_response = requests.get(
-                f"{self.result_endpoint}/{generation_id}", headers=result_headers
+                result_url, headers=result_headers, stream=True
             )
 
             if result_response.status_code == 202:
                 # Still processing
-                time.sleep(self.polling_interval)
-                continue
+                result_response.close()
+                return PollResult.pending(
+                    retry_after=retry_after_hint(result_response)
+                )
             elif result_response.status_code == 200:
-                with open(save_at, "wb") as f:
-                    f.write(result_response.content)
-                break
+                result_response.close()
+                return PollResult.complete(result_url)
             else:
                 raise Exception(f"Error fetching video: {result_response.text}")
+
+        try:
+            get_poller().wait(
+                check,
+                interval=self.polling_interval,
+                max_interval=self.polling_interval * 3,
+                cancel_event=cancel_event,
+                name=f"stabilityai {generation_id}",
+            )
+        except concurrent.futures.CancelledError:
+            raise RunCancelled()
+        # The finished video is the body of the result, stream it to disk on this thread
+        download_file(
+            result_url, save_at, headers=result_headers, cancel_event=cancel_event
+        )
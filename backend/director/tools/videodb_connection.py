@@ -0,0 +1,112 @@
+import os
+import time
+import logging
+import threading
+
+import videodb
+
+from director.utils.env import env_int
+
+logger = logging.getLogger(__name__)
+
+
+class VideoDBConnectionManager:
+    """Process-wide cache of VideoDB connections and collection handles.
+
+    Entries are keyed by ``(api_key, base_url, collection_id)``. Every entry owns its connection, so the
+    keep-alive HTTP session of the connection is reused across requests and the collection bound to the
+    connection (used by uploads and web search) never changes under another caller. Collection handles
+    expire after ``ttl`` seconds, configured with ``VIDEO_DB_CONNECTION_TTL``.
+
+    :param int ttl: Seconds after which a collection handle is fetched again
+    :param int max_size: Maximum number of cached entries, the least recently used entries are evicted
+    """
+
+    def __init__(self, ttl: int = None, max_size: int = 128):
+        self.ttl = ttl if ttl is not None else env_int("VIDEO_DB_CONNECTION_TTL", 300)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _key(self, collection_id, api_key, base_url):
+        return (
+            api_key or os.getenv("VIDEO_DB_API_KEY"),
+            base_url or os.getenv("VIDEO_DB_BASE_URL", "https://api.videodb.io"),
+            collection_id,
+        )
+
+    def get(self, collection_id: str = None, api_key: str = None, base_url: str = None):
+        """Get a connection and the handle of the collection.
+
+        :param str collection_id: ID of the collection, no collection is fetched if None
+        :param str api_key: VideoDB API key, defaults to ``VIDEO_DB_API_KEY``
+        :param str base_url: VideoDB base URL, defaults to ``VIDEO_DB_BASE_URL``
+        :return: Tuple of the connection and the collection (None without collection_id)
+        """
+        key = self._key(collection_id, api_key, base_url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry["created_at"] < self.ttl:
+                self.hits += 1
+                # Move to the end to keep the entries ordered by last use
+                self._entries[key] = self._entries.pop(key)
+                return entry["conn"], entry["collection"]
+            self.misses += 1
+        logger.debug(
+            f"VideoDB connection cache miss for {collection_id}: {self.stats()}"
+        )
+
+        conn = (
+            entry["conn"] if entry else videodb.connect(api_key=key[0], base_url=key[1])
+        )
+        collection = conn.get_collection(collection_id) if collection_id else None
+
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = {
+                "conn": conn,
+                "collection": collection,
+                "created_at": time.monotonic(),
+            }
+            while len(self._entries) > self.max_size:
+                self._entries.pop(next(iter(self._entries)))
+        return conn, collection
+
+    def connect(self, api_key: str = None, base_url: str = None):
+        """Open a new connection which is not cached or shared.
+
+        Used for calls which change the collection bound to the connection, e.g. ``create_collection``.
+        """
+        api_key, base_url, _ = self._key(None, api_key, base_url)
+        return videodb.connect(api_key=api_key, base_url=base_url)
+
+    def invalidate(
+        self, collection_id: str = None, api_key: str = None, base_url: str = None
+    ):
+        """Drop the cached handle of a collection, e.g. after it is updated or deleted."""
+        with self._lock:
+            self._entries.pop(self._key(collection_id, api_key, base_url), None)
+
+    def clear(self):
+        """Drop all the cached entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return the hit and miss counters of the cache."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+            }
+
+
+connection_manager = VideoDBConnectionManager()
+
+
+def get_videodb_connection(collection_id: str = None, **kwargs):
+    """Get a cached VideoDB connection and collection handle, see :class:`VideoDBConnectionManager`."""
+    return connection_manager.get(collection_id, **kwargs)
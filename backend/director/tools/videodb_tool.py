@@ -1,23 +1,124 @@
+import io
 import os
+import time
 import requests
-import videodb
 import logging
+import threading
+
+from collections import OrderedDict
 
 from videodb import SearchType, SubtitleStyle, IndexType, SceneExtractionType
 from videodb.timeline import Timeline
 from videodb.asset import VideoAsset, ImageAsset
 from director.tools.elevenlabs import VOICE_ID_MAP
-from director.constants import DOWNLOADS_PATH
+from director.utils.download import download_file
+from director.utils.disk_cache import DiskCache
+from director.utils.env import env_int
+from director.tools.videodb_upload import MultipartStream
+from director.tools.videodb_connection import (
+    connection_manager,
+    get_videodb_connection,
+)
+
+
+class MediaMetadataCache:
+    """Size bounded cache of video, audio and image metadata keyed by collection and media ID.
+
+    Entries are seeded by bulk listings of a collection and dropped when the media is deleted, so repeated
+    lookups of the same media during a chat cost no network calls. Entries expire after ``ttl`` seconds,
+    configured with ``VIDEO_DB_MEDIA_CACHE_TTL``.
+
+    :param int max_size: Maximum number of cached entries, the least recently used entries are evicted
+    :param int ttl: Seconds after which an entry is fetched again
+    """
+
+    def __init__(self, max_size: int = None, ttl: int = None):
+        self.max_size = max_size or env_int("VIDEO_DB_MEDIA_CACHE_SIZE", 2048)
+        self.ttl = ttl if ttl is not None else env_int("VIDEO_DB_MEDIA_CACHE_TTL", 300)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, collection_id: str, media_id: str):
+        """Return a copy of the cached metadata, None if missing or expired."""
+        key = (collection_id, media_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] >= self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return dict(entry[1])
+
+    def set(self, collection_id: str, media_id: str, data: dict):
+        key = (collection_id, media_id)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), dict(data))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, collection_id: str, media_id: str = None):
+        """Drop a media, or every media of the collection if media_id is None."""
+        with self._lock:
+            if media_id is not None:
+                self._entries.pop((collection_id, media_id), None)
+                return
+            for key in [key for key in self._entries if key[0] == collection_id]:
+                del self._entries[key]
+
+    def seed_videos(self, videos):
+        """Cache the metadata of videos returned by a collection listing."""
+        for video in videos:
+            self.set(video.collection_id, video.id, video_metadata(video))
+
+    def seed_images(self, images):
+        """Cache the metadata of images returned by a collection listing."""
+        for image in images:
+            self.set(image.collection_id, image.id, image_metadata(image))
+
+
+def video_metadata(video) -> dict:
+    return {
+        "id": video.id,
+        "name": video.name,
+        "description": video.description,
+        "collection_id": video.collection_id,
+        "stream_url": video.stream_url,
+        "length": video.length,
+        "thumbnail_url": video.thumbnail_url,
+    }
+
+
+def image_metadata(image) -> dict:
+    return {
+        "id": image.id,
+        "url": image.url,
+        "name": image.name,
+        "description": getattr(image, "description", None),
+        "collection_id": image.collection_id,
+    }
+
+
+media_cache = MediaMetadataCache()
+
+# Transcripts and scene indexes don't change once indexed, they are kept on disk across restarts
+index_cache = DiskCache()
+
+
+def transcript_text(segments: list) -> str:
+    """Build the text of a transcript from its timed word segments, silences are marked with ``-``."""
+    return " ".join(
+        segment["text"].strip()
+        for segment in segments
+        if segment.get("text", "").strip() not in ("", "-")
+    )
 
 
 class VideoDBTool:
     def __init__(self, collection_id="default"):
-        self.conn = videodb.connect(
-            base_url=os.getenv("VIDEO_DB_BASE_URL", "https://api.videodb.io")
-        )
-        self.collection = None
-        if collection_id:
-            self.collection = self.conn.get_collection(collection_id)
+        self.conn, self.collection = get_videodb_connection(collection_id)
         self.timeline = None
 
     def get_collection(self):
@@ -44,20 +145,20 @@ class VideoDBTool:
         Fetch image details by ID or validate an image URL.
         """
         try:
+            cached = media_cache.get(self.collection.id, image_id)
+            if cached:
+                return cached
             image = self.collection.get_image(image_id)
-            return {
-                "id": image.id,
-                "url": image.url,
-                "name": image.name,
-                "description": getattr(image, "description", None),
-                "collection_id": image.collection_id,
-            }
+            data = image_metadata(image)
+            media_cache.set(self.collection.id, image_id, data)
+            return data
         except Exception as e:
             raise Exception(f"Failed to fetch image with ID {image_id}: {e}")
 
     def get_images(self):
         """Get all images in a collection."""
         images = self.collection.get_images()
+        media_cache.seed_images(images)
         return [
             {
                 "id": image.id,
@@ -75,7 +176,10 @@ class VideoDBTool:
             raise ValueError("Collection name is required to create a collection.")
 
         try:
-            new_collection = self.conn.create_collection(name, description)
+            # create_collection binds its connection to the new collection, the shared connection must not change
+            new_collection = connection_manager.connect().create_collection(
+                name, description
+            )
             return {
                 "success": True,
                 "message": f"Collection '{new_collection.id}' created successfully",
@@ -95,6 +199,8 @@ class VideoDBTool:
             raise ValueError("Collection ID is required to delete a collection.")
         try:
             self.collection.delete()
+            connection_manager.invalidate(self.collection.id)
+            media_cache.invalidate(self.collection.id)
             return {
                 "success": True,
                 "message": f"Collection {self.collection.id} deleted successfully",
@@ -106,16 +212,13 @@ class VideoDBTool:
 
     def get_video(self, video_id):
         """Get a video by ID."""
+        cached = media_cache.get(self.collection.id, video_id)
+        if cached:
+            return cached
         video = self.collection.get_video(video_id)
-        return {
-            "id": video.id,
-            "name": video.name,
-            "description": video.description,
-            "collection_id": video.collection_id,
-            "stream_url": video.stream_url,
-            "length": video.length,
-            "thumbnail_url": video.thumbnail_url,
-        }
+        data = video_metadata(video)
+        media_cache.set(self.collection.id, video_id, data)
+        return data
 
     def delete_video(self, video_id):
         """Delete a specific video by its ID."""
@@ -129,6 +232,8 @@ class VideoDBTool:
                 )
 
             video.delete()
+            media_cache.invalidate(self.collection.id, video_id)
+            index_cache.delete_prefix(f"transcript:{video_id}:")
             return {
                 "success": True,
                 "message": f"Video {video.id} deleted successfully",
@@ -147,6 +252,7 @@ class VideoDBTool:
     def get_videos(self):
         """Get all videos in a collection."""
         videos = self.collection.get_videos()
+        media_cache.seed_videos(videos)
         return [
             {
                 "id": video.id,
@@ -163,14 +269,19 @@ class VideoDBTool:
 
     def get_audio(self, audio_id):
         """Get an audio by ID."""
+        cached = media_cache.get(self.collection.id, audio_id)
+        if cached:
+            return cached
         audio = self.collection.get_audio(audio_id)
-        return {
+        data = {
             "id": audio.id,
             "name": audio.name,
             "collection_id": audio.collection_id,
             "length": audio.length,
             "url": audio.generate_url(),
         }
+        media_cache.set(self.collection.id, audio_id, data)
+        return data
 
     def get_audios(self):
         """Get all audios in a collection."""
@@ -194,7 +305,22 @@ class VideoDBTool:
         image = self.collection.get_image(image_id)
         return image.generate_url()
 
-    def upload(self, source, source_type="url", media_type="video", name=None):
+    def upload(
+        self,
+        source,
+        source_type="url",
+        media_type="video",
+        name=None,
+        content_type=None,
+        on_progress=None,
+    ):
+        """Upload a media to the collection.
+
+        With ``source_type`` ``file`` the source is a binary file object (or bytes), it is streamed to the
+        signed upload URL in chunks.
+
+        :param on_progress: Optional function called with (bytes sent, total bytes) of a file upload
+        """
         upload_args = {"media_type": media_type}
         if name:
             upload_args["name"] = name
@@ -206,13 +332,23 @@ class VideoDBTool:
                 params={"name": name},
             )
             upload_url = upload_url_data.get("upload_url")
-            files = {"file": (name, source)}
-            response = requests.post(upload_url, files=files)
+            if isinstance(source, (bytes, bytearray)):
+                source = io.BytesIO(source)
+            body = MultipartStream(
+                source,
+                filename=name,
+                content_type=content_type,
+                on_progress=on_progress,
+            )
+            response = requests.post(
+                upload_url, data=body, headers={"Content-Type": body.content_type}
+            )
             response.raise_for_status()
             upload_args["url"] = upload_url
         else:
             upload_args["file_path"] = source
         media = self.conn.upload(**upload_args)
+        media_cache.invalidate(media.collection_id, media.id)
         name = media.name
         if media_type == "video":
             return {
@@ -250,18 +386,38 @@ class VideoDBTool:
             "url": image.url,
         }
 
-    def get_transcript(self, video_id: str, text=True):
-        video = self.collection.get_video(video_id)
+    def get_transcript(
+        self,
+        video_id: str,
+        text=True,
+        language_code: str = None,
+        segmenter: str = "word",
+        length: int = 1,
+    ):
+        """Get the transcript of a video, the text is built from the cached timed segments.
+
+        The segments are cached per video, language, segmenter and length.
+
+        :param str video_id: ID of the video
+        :param bool text: Return the text instead of the timed segments
+        :param str language_code: Language of the spoken index the transcript comes from, if known
+        :param str segmenter: Segmenter of the transcript, ``word``, ``sentence`` or ``time``
+        :param int length: Length of the segments for the ``time`` segmenter
+        """
+        key = f"transcript:{video_id}:{language_code or 'default'}:{segmenter}:{length}"
+        segments = index_cache.get(key)
+        if segments is None:
+            video = self.collection.get_video(video_id)
+            segments = video.get_transcript(segmenter=segmenter, length=length)
+            index_cache.set(key, segments)
         if text:
-            transcript = video.get_transcript_text()
-        else:
-            transcript = video.get_transcript()
-        return transcript
+            return transcript_text(segments)
+        return segments
 
-    def index_spoken_words(self, video_id: str):
-        # TODO: Language support
+    def index_spoken_words(self, video_id: str, language_code: str = None):
         video = self.collection.get_video(video_id)
-        index = video.index_spoken_words()
+        index = video.index_spoken_words(language_code=language_code)
+        index_cache.delete_prefix(f"transcript:{video_id}:")
         return index
 
     def index_scene(
@@ -283,8 +439,13 @@ class VideoDBTool:
         return video.list_scene_index()
 
     def get_scene_index(self, video_id: str, scene_id: str):
-        video = self.collection.get_video(video_id)
-        return video.get_scene_index(scene_id)
+        key = f"scene_index:{video_id}:{scene_id}"
+        scene_index = index_cache.get(key)
+        if scene_index is None:
+            video = self.collection.get_video(video_id)
+            scene_index = video.get_scene_index(scene_id)
+            index_cache.set(key, scene_index)
+        return scene_index
 
     def download(self, stream_link: str, name: str = None):
         download_response = self.conn.download(stream_link, name)
@@ -436,6 +597,7 @@ class VideoDBTool:
                 )
 
             audio.delete()
+            media_cache.invalidate(self.collection.id, audio_id)
             return {
                 "success": True,
                 "message": f"Video {audio.id} deleted successfully",
@@ -463,6 +625,7 @@ class VideoDBTool:
                 )
 
             image.delete()
+            media_cache.invalidate(self.collection.id, image_id)
             return {
                 "success": True,
                 "message": f"Image {image_id} deleted successfully",
@@ -482,19 +645,10 @@ class VideoDBTool:
 class VDBVideoGenerationTool:
     def __init__(self, collection_id="default"):
         self.videodb_tool = VideoDBTool(collection_id=collection_id)
-        self.collection = self.videodb_tool.conn.get_collection(collection_id)
+        self.collection = self.videodb_tool.collection
 
     def _download_video_file(self, video_url: str, save_at: str) -> bool:
-        os.makedirs(DOWNLOADS_PATH, exist_ok=True)
-
-        response = requests.get(video_url, stream=True)
-        response.raise_for_status()
-
-        if not response.headers.get("Content-Type", "").startswith("video"):
-            raise ValueError(f"The URL does not point to a video file: {video_url}")
-
-        with open(save_at, "wb") as file:
-            file.write(response.content)
+        download_file(video_url, save_at, content_type="video")
 
     def text_to_video(
         self, prompt: str, save_at: str, duration: float, config: dict = {}
@@ -524,15 +678,10 @@ class VDBVideoGenerationTool:
 class VDBAudioGenerationTool:
     def __init__(self, collection_id="default"):
         self.videodb_tool = VideoDBTool(collection_id=collection_id)
-        self.collection = self.videodb_tool.conn.get_collection(collection_id)
+        self.collection = self.videodb_tool.collection
 
     def _download_audio_file(self, audio_url: str, save_at: str) -> bool:
-        os.makedirs(DOWNLOADS_PATH, exist_ok=True)
-        response = requests.get(audio_url, stream=True)
-        response.raise_for_status()
-
-        with open(save_at, "wb") as file:
-            file.write(response.content)
+        download_file(audio_url, save_at)
 
     def generate_sound_effect(
         self, prompt: str, save_at: str, duration: float, config: dict
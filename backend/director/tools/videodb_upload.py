@@ -0,0 +1,266 @@
+"""Stream uploads to VideoDB with bounded memory and resumable upload sessions."""
+
+import io
+import os
+import re
+import json
+import time
+import uuid
+import shutil
+import logging
+import threading
+
+from director.constants import DATA_PATH
+from director.utils.env import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = env_int("UPLOAD_CHUNK_SIZE", 8 * 1024 * 1024)
+UPLOAD_PROGRESS_INTERVAL = env_float("UPLOAD_PROGRESS_INTERVAL", 0.5)
+
+_UPLOAD_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class UploadSessionNotFound(Exception):
+    """Raised when an upload session doesn't exist or has expired."""
+
+
+class UploadOffsetMismatch(Exception):
+    """Raised when a chunk doesn't start where the upload session left off.
+
+    :param int offset: Number of bytes received so far, the client should resume from there
+    """
+
+    def __init__(self, offset: int):
+        super().__init__(f"Upload should resume at offset {offset}")
+        self.offset = offset
+
+
+def remaining_size(fileobj) -> int:
+    """Number of bytes from the current position to the end of a seekable file."""
+    position = fileobj.tell()
+    fileobj.seek(0, os.SEEK_END)
+    size = fileobj.tell() - position
+    fileobj.seek(position)
+    return size
+
+
+class MultipartStream:
+    """A ``multipart/form-data`` body read from a file chunk by chunk.
+
+    ``requests`` sends it with a ``Content-Length`` computed up front, so the file is never loaded into
+    memory and signed upload URLs which reject chunked transfer encoding still accept it.
+
+    :param fileobj: Seekable binary file to send
+    :param str filename: Name of the file in the form
+    :param str field: Name of the form field
+    :param str content_type: Content type of the file part, omitted if None
+    :param int chunk_size: Maximum bytes read at once, defaults to ``UPLOAD_CHUNK_SIZE`` (8 MB)
+    :param on_progress: Optional function called with (bytes sent, total bytes) at most every
+        ``UPLOAD_PROGRESS_INTERVAL`` seconds and once at the end
+    """
+
+    def __init__(
+        self,
+        fileobj,
+        filename: str,
+        field: str = "file",
+        content_type: str = None,
+        chunk_size: int = None,
+        on_progress=None,
+    ):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self.chunk_size = chunk_size or UPLOAD_CHUNK_SIZE
+        self.on_progress = on_progress
+        filename = (filename or "file").replace('"', "%22")
+        head = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        )
+        if content_type:
+            head += f"Content-Type: {content_type}\r\n"
+        head = (head + "\r\n").encode()
+        tail = f"\r\n--{self.boundary}--\r\n".encode()
+        self.size = len(head) + remaining_size(fileobj) + len(tail)
+        self.sent = 0
+        self._parts = [io.BytesIO(head), fileobj, io.BytesIO(tail)]
+        self._reported_at = 0
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(self.chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0 or size > self.chunk_size:
+            size = self.chunk_size
+        data = b""
+        while self._parts and len(data) < size:
+            chunk = self._parts[0].read(size - len(data))
+            if not chunk:
+                self._parts.pop(0)
+                continue
+            data += chunk
+        self.sent += len(data)
+        self._report()
+        return data
+
+    def _report(self):
+        if self.on_progress is None:
+            return
+        now = time.monotonic()
+        if self.sent < self.size and now - self._reported_at < UPLOAD_PROGRESS_INTERVAL:
+            return
+        self._reported_at = now
+        try:
+            self.on_progress(self.sent, self.size)
+        except Exception as e:
+            logger.warning(f"Failed to report upload progress: {e}")
+
+
+class UploadSessionStore:
+    """Resumable upload sessions kept on disk.
+
+    A client creates a session with the size of the file and sends it in chunks, each chunk starting at the
+    offset received so far. If the connection drops the client asks for the offset and resumes from there,
+    the bytes written before the drop are kept. Sessions not updated for ``ttl`` seconds are removed.
+
+    :param str path: Directory of the sessions, defaults to ``UPLOADS_PATH`` (~/.director/uploads)
+    :param int ttl: Seconds an idle session is kept, defaults to ``UPLOAD_SESSION_TTL`` (86400)
+    """
+
+    def __init__(self, path: str = None, ttl: int = None):
+        self.path = (
+            path or os.getenv("UPLOADS_PATH") or os.path.join(DATA_PATH, "uploads")
+        )
+        self.ttl = ttl if ttl is not None else env_int("UPLOAD_SESSION_TTL", 86400)
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _session_dir(self, upload_id: str) -> str:
+        if not upload_id or not _UPLOAD_ID_PATTERN.match(upload_id):
+            raise UploadSessionNotFound(f"Upload session {upload_id} not found")
+        return os.path.join(self.path, upload_id)
+
+    def _data_path(self, upload_id: str) -> str:
+        return os.path.join(self._session_dir(upload_id), "data")
+
+    def _session_lock(self, upload_id: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(upload_id, threading.Lock())
+
+    def _save(self, session: dict):
+        session_dir = self._session_dir(session["upload_id"])
+        temp_path = os.path.join(session_dir, "session.json.tmp")
+        with open(temp_path, "w") as file:
+            json.dump(session, file)
+        os.replace(temp_path, os.path.join(session_dir, "session.json"))
+
+    def create(
+        self,
+        collection_id: str,
+        name: str,
+        size: int,
+        media_type: str = "video",
+        content_type: str = None,
+    ) -> dict:
+        """Create an upload session for a file of ``size`` bytes."""
+        if size is None or size <= 0:
+            raise ValueError("size must be a positive number of bytes")
+        self.cleanup()
+        upload_id = uuid.uuid4().hex
+        os.makedirs(self._session_dir(upload_id))
+        open(self._data_path(upload_id), "wb").close()
+        now = int(time.time())
+        session = {
+            "upload_id": upload_id,
+            "collection_id": collection_id,
+            "name": name,
+            "media_type": media_type,
+            "content_type": content_type,
+            "size": size,
+            "offset": 0,
+            "created_at": now,
+            "updated_at": now,
+        }
+        self._save(session)
+        return session
+
+    def get(self, upload_id: str) -> dict:
+        """Get an upload session, raises :class:`UploadSessionNotFound` if it doesn't exist."""
+        try:
+            with open(
+                os.path.join(self._session_dir(upload_id), "session.json")
+            ) as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            raise UploadSessionNotFound(f"Upload session {upload_id} not found")
+
+    def append(
+        self, upload_id: str, offset: int, stream, chunk_size: int = None
+    ) -> dict:
+        """Write the bytes read from ``stream`` at ``offset`` of the upload.
+
+        The stream is copied chunk by chunk, whatever was received before a disconnect is kept.
+
+        :raises UploadOffsetMismatch: If ``offset`` isn't the number of bytes received so far
+        :raises ValueError: If the data goes past the size of the upload
+        :return: The updated session
+        """
+        chunk_size = chunk_size or UPLOAD_CHUNK_SIZE
+        with self._session_lock(upload_id):
+            session = self.get(upload_id)
+            if offset != session["offset"]:
+                raise UploadOffsetMismatch(session["offset"])
+            written = 0
+            try:
+                with open(self._data_path(upload_id), "r+b") as file:
+                    file.seek(offset)
+                    file.truncate()
+                    while True:
+                        chunk = stream.read(chunk_size)
+                        if not chunk:
+                            break
+                        if offset + written + len(chunk) > session["size"]:
+                            raise ValueError("Upload is larger than the declared size")
+                        file.write(chunk)
+                        written += len(chunk)
+            finally:
+                session["offset"] = offset + written
+                session["updated_at"] = int(time.time())
+                self._save(session)
+            return session
+
+    def open(self, upload_id: str):
+        """Open the received data of an upload for reading."""
+        self.get(upload_id)
+        return open(self._data_path(upload_id), "rb")
+
+    def delete(self, upload_id: str):
+        """Remove an upload session and its data."""
+        shutil.rmtree(self._session_dir(upload_id), ignore_errors=True)
+        with self._lock:
+            self._locks.pop(upload_id, None)
+
+    def cleanup(self):
+        """Remove the sessions which weren't updated within the ttl."""
+        if not os.path.isdir(self.path):
+            return
+        expired_before = time.time() - self.ttl
+        for upload_id in os.listdir(self.path):
+            try:
+                if self.get(upload_id)["updated_at"] < expired_before:
+                    self.delete(upload_id)
+            except UploadSessionNotFound:
+                continue
+            except Exception as e:
+                logger.warning(f"Failed to clean up upload session {upload_id}: {e}")
+
+
+upload_sessions = UploadSessionStore()
@@ -0,0 +1,142 @@
+"""Align text returned by an LLM with the timed transcript or scenes of a video."""
+
+import re
+
+from collections import Counter
+from difflib import SequenceMatcher
+
+_TOKEN_PATTERN = re.compile(r"[\w']+")
+
+
+def normalize_tokens(text: str) -> list:
+    """Split text into lowercase word tokens without punctuation."""
+    return [token.strip("'") for token in _TOKEN_PATTERN.findall(text.lower())]
+
+
+class TranscriptAligner:
+    """Map sentences onto the word segments of a transcript.
+
+    Candidate positions are found with an inverted index of the transcript tokens, each candidate window is
+    then scored with a semi-global edit distance over tokens, so the sentence may match any substring of the
+    window. Sentences which differ slightly from the transcript (punctuation, casing, a few missing or
+    changed words) are still aligned.
+
+    :param list transcript: Timed segments of the transcript, dicts with ``start``, ``end`` and ``text``
+    :param float min_score: Minimum share of matching tokens for a confident match
+    :param int band: Number of extra tokens searched on each side of a candidate position
+    """
+
+    def __init__(self, transcript: list, min_score: float = 0.8, band: int = 8):
+        self.min_score = min_score
+        self.band = band
+        self.tokens = []
+        self.spans = []
+        self.segments = []
+        for segment_index, segment in enumerate(transcript):
+            text = segment.get("text", "")
+            if text.strip() in ("", "-"):
+                continue
+            for token in normalize_tokens(text):
+                if not token:
+                    continue
+                self.tokens.append(token)
+                self.spans.append((float(segment["start"]), float(segment["end"])))
+                self.segments.append(segment_index)
+        self.transcript = transcript
+        self.index = {}
+        for position, token in enumerate(self.tokens):
+            self.index.setdefault(token, []).append(position)
+
+    def _candidates(self, query: list, max_candidates: int = 5) -> list:
+        """Return the most likely start positions of the query in the transcript."""
+        anchors = sorted(
+            (offset for offset, token in enumerate(query) if token in self.index),
+            key=lambda offset: len(self.index[query[offset]]),
+        )[:8]
+        votes = Counter()
+        for offset in anchors:
+            for position in self.index[query[offset]]:
+                votes[position - offset] += 1
+        return [start for start, _ in votes.most_common(max_candidates)]
+
+    def _match_window(self, query: list, window_start: int, window_end: int):
+        """Semi-global edit distance of the query within the window, returns (distance, start, end)."""
+        window = self.tokens[window_start:window_end]
+        # Row for the empty query, the match can start anywhere in the window
+        distances = [0] * (len(window) + 1)
+        starts = list(range(len(window) + 1))
+        for i, token in enumerate(query, start=1):
+            previous_distances, previous_starts = distances, starts
+            distances = [i] + [0] * len(window)
+            starts = [0] + [0] * len(window)
+            for j, word in enumerate(window, start=1):
+                options = (
+                    (
+                        previous_distances[j - 1] + (token != word),
+                        previous_starts[j - 1],
+                    ),
+                    (previous_distances[j] + 1, previous_starts[j]),
+                    (distances[j - 1] + 1, starts[j - 1]),
+                )
+                distances[j], starts[j] = min(options)
+        end = min(range(1, len(window) + 1), key=lambda j: distances[j])
+        return distances[end], window_start + starts[end], window_start + end - 1
+
+    def align(self, sentence: str):
+        """Find the span of the sentence in the transcript.
+
+        :param str sentence: The sentence to align
+        :return: Tuple of (start, end, text) in seconds, None if there is no confident match
+        """
+        query = normalize_tokens(sentence)
+        if not query or not self.tokens:
+            return None
+
+        best = None
+        for candidate in self._candidates(query):
+            window_start = max(candidate - self.band, 0)
+            window_end = min(candidate + len(query) + self.band, len(self.tokens))
+            if window_end <= window_start:
+                continue
+            match = self._match_window(query, window_start, window_end)
+            if best is None or match[0] < best[0]:
+                best = match
+        if best is None:
+            return None
+
+        distance, start, end = best
+        if 1 - distance / len(query) < self.min_score:
+            return None
+        text = " ".join(
+            self.transcript[segment_index]["text"].strip()
+            for segment_index in sorted(set(self.segments[start : end + 1]))
+        )
+        return self.spans[start][0], self.spans[end][1], text
+
+
+def match_scene(description: str, scenes: list, min_score: float = 0.8):
+    """Find the scene with the given description.
+
+    :param str description: The scene description returned by the LLM
+    :param list scenes: Scenes of the video, dicts with ``start``, ``end`` and ``description``
+    :param float min_score: Minimum similarity of the descriptions for a confident match
+    :return: Tuple of (start, end, description), None if there is no confident match
+    """
+    target = " ".join(normalize_tokens(description))
+    best, best_score = None, 0
+    for scene in scenes:
+        candidate = " ".join(normalize_tokens(scene.get("description") or ""))
+        if candidate == target:
+            best, best_score = scene, 1
+            break
+        matcher = SequenceMatcher(None, target, candidate, autojunk=False)
+        if matcher.real_quick_ratio() <= max(best_score, min_score):
+            continue
+        if matcher.quick_ratio() <= max(best_score, min_score):
+            continue
+        score = matcher.ratio()
+        if score > best_score:
+            best, best_score = scene, score
+    if best is None or best_score < min_score:
+        return None
+    return float(best["start"]), float(best["end"]), best["description"]
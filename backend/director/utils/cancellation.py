@@ -0,0 +1,102 @@
+"""Cooperative cancellation of reasoning runs, agents and tools."""
+
+import logging
+import threading
+import contextvars
+
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Token of the run in the current context, threads started with a copied context share it
+_current_token = contextvars.ContextVar("cancellation_token", default=None)
+
+
+class RunCancelled(Exception):
+    """Raised by long running work once its run has been cancelled."""
+
+    def __init__(self, message="The run was cancelled by the user"):
+        super().__init__(message)
+
+
+class CancellationToken:
+    """Flag shared by everything working for one run.
+
+    Work checks :attr:`cancelled` or calls :meth:`raise_if_cancelled` between steps, pollers and waits use
+    :attr:`event` directly. Callbacks let components with their own stop mechanism react right away.
+    """
+
+    def __init__(self):
+        self.event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.event.is_set()
+
+    def cancel(self):
+        """Cancel the run, callbacks are called once."""
+        with self._lock:
+            if self.event.is_set():
+                return
+            self.event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Cancellation callback failed: {e}")
+
+    def add_callback(self, callback):
+        """Call ``callback`` on cancel, right away if the token is already cancelled.
+
+        :return: Function removing the callback, call it once the work it stops is done so a long lived token
+            doesn't keep every finished component alive
+        """
+        with self._lock:
+            if not self.event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove_callback(callback)
+        callback()
+        return lambda: None
+
+    def _remove_callback(self, callback):
+        with self._lock:
+            try:
+                self._callbacks.remove(callback)
+            except ValueError:
+                # Already called or removed
+                pass
+
+    def raise_if_cancelled(self):
+        if self.event.is_set():
+            raise RunCancelled()
+
+
+def current_cancel_token():
+    """Return the cancellation token of the current run, None outside of a run."""
+    return _current_token.get()
+
+
+def current_cancel_event():
+    """Return the ``threading.Event`` of the current run's token, None outside of a run."""
+    token = _current_token.get()
+    return token.event if token is not None else None
+
+
+def raise_if_cancelled():
+    """Raise :class:`RunCancelled` if the current run has been cancelled."""
+    token = _current_token.get()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+@contextmanager
+def cancellation_scope(token: CancellationToken):
+    """Make ``token`` the cancellation token of the code run inside the block."""
+    reset = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset)
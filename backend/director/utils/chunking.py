@@ -0,0 +1,218 @@
+"""Pack transcripts and documents into chunks that fit the token budget of an LLM."""
+
+import math
+
+from typing import Callable, List
+
+from director.utils.env import env_int
+
+SENTENCE_ENDINGS = (".", "?", "!")
+
+
+def split_text(
+    text: str, count_tokens: Callable[[str], int], token_budget: int
+) -> List[str]:
+    """Split a text at word boundaries into parts of at most ``token_budget`` tokens.
+
+    Words larger than the budget on their own are cut into pieces of characters.
+
+    :param str text: The text to split
+    :param count_tokens: Function returning the number of tokens of a text
+    :param int token_budget: Maximum number of tokens of a part
+    :return: List of parts, the text itself if it fits the budget
+    """
+    if count_tokens(text) <= token_budget:
+        return [text]
+    parts = []
+    words, words_tokens = [], 0
+    for word in text.split():
+        size = count_tokens(word)
+        if size > token_budget:
+            pieces = _split_word(word, count_tokens, token_budget)
+            word, size = pieces[-1], count_tokens(pieces[-1])
+            if words:
+                parts.append(" ".join(words))
+                words, words_tokens = [], 0
+            parts.extend(pieces[:-1])
+        if words and words_tokens + size > token_budget:
+            parts.append(" ".join(words))
+            words, words_tokens = [], 0
+        words.append(word)
+        words_tokens += size
+    if words:
+        parts.append(" ".join(words))
+    return parts
+
+
+def _split_word(word: str, count_tokens: Callable[[str], int], token_budget: int):
+    length = max(len(word) * token_budget // count_tokens(word), 1)
+    while length > 1 and count_tokens(word[:length]) > token_budget:
+        length //= 2
+    return [word[i : i + length] for i in range(0, len(word), length)]
+
+
+def split_field(
+    item: dict,
+    field: str,
+    count_tokens: Callable[[str], int],
+    token_budget: int,
+    to_text: Callable = str,
+) -> List[dict]:
+    """Split a dict item into copies whose ``field`` holds consecutive parts of its text.
+
+    The other fields are repeated in every copy and count towards the budget.
+
+    :param dict item: The item to split, e.g. a scene with a long description
+    :param str field: Key of the text to split
+    :param count_tokens: Function returning the number of tokens of a text
+    :param int token_budget: Maximum number of tokens of a copy
+    :param to_text: Function converting an item to the text sent to the LLM
+    :raises ValueError: If the other fields alone exceed the budget
+    """
+    field_budget = token_budget - count_tokens(to_text({**item, field: ""}))
+    if field_budget < 1:
+        raise ValueError(f"An item without its {field} exceeds the token budget")
+    return [
+        {**item, field: part}
+        for part in split_text(item[field] or "", count_tokens, field_budget)
+    ]
+
+
+def timed_sentences(
+    transcript: list,
+    count_tokens: Callable[[str], int] = None,
+    max_tokens: int = None,
+) -> List[dict]:
+    """Group the timed word segments of a transcript into sentences with their start and end.
+
+    Silences (``-``) are skipped. With ``count_tokens`` and ``max_tokens`` a sentence is also closed before it
+    grows over ``max_tokens``, so transcripts without punctuation (common for speech recognition output)
+    still come out in pieces that fit a chunk.
+    """
+    sentences = []
+    words, words_tokens = [], 0
+    for segment in transcript:
+        text = segment.get("text", "").strip()
+        if text in ("", "-"):
+            continue
+        size = count_tokens(text) if max_tokens else 0
+        if words and max_tokens and words_tokens + size > max_tokens:
+            sentences.append({"start": start, "end": end, "text": " ".join(words)})
+            words, words_tokens = [], 0
+        if not words:
+            start = segment["start"]
+        words.append(text)
+        words_tokens += size
+        end = segment["end"]
+        if text.endswith(SENTENCE_ENDINGS):
+            sentences.append({"start": start, "end": end, "text": " ".join(words)})
+            words, words_tokens = [], 0
+    if words:
+        sentences.append({"start": start, "end": end, "text": " ".join(words)})
+    return sentences
+
+
+def transcript_sentences(
+    transcript: list,
+    count_tokens: Callable[[str], int] = None,
+    max_tokens: int = None,
+) -> List[str]:
+    """Group the timed word segments of a transcript into sentences, see :func:`timed_sentences`."""
+    return [
+        sentence["text"]
+        for sentence in timed_sentences(transcript, count_tokens, max_tokens)
+    ]
+
+
+def _pack(sizes: List[int], token_budget: int, overlap_tokens: int, target: int):
+    """Return the ``(start, end)`` item ranges of the chunks, the fresh items of a chunk add up to at most
+    ``target`` tokens, or are a single item."""
+    ranges = []
+    start, current_tokens, fresh_tokens = 0, 0, 0
+    for index, size in enumerate(sizes):
+        if fresh_tokens and (
+            fresh_tokens + size > target or current_tokens + size > token_budget
+        ):
+            ranges.append((start, index))
+            # Repeat the last items of the chunk, leaving room for the next item
+            overlap_budget = min(overlap_tokens, token_budget - size)
+            overlap_start, overlap_size = index, 0
+            while (
+                overlap_start > start
+                and overlap_size + sizes[overlap_start - 1] <= overlap_budget
+            ):
+                overlap_start -= 1
+                overlap_size += sizes[overlap_start]
+            start, current_tokens, fresh_tokens = overlap_start, overlap_size, 0
+        current_tokens += size
+        fresh_tokens += size
+    if fresh_tokens:
+        ranges.append((start, len(sizes)))
+    return ranges
+
+
+def chunk_by_tokens(
+    items: list,
+    count_tokens: Callable[[str], int],
+    token_budget: int,
+    overlap_tokens: int = None,
+    to_text: Callable = str,
+    split: Callable = None,
+) -> List[list]:
+    """Pack items into chunks of at most ``token_budget`` tokens.
+
+    The number of chunks is the minimum needed for the budget and the items are spread evenly across them, so
+    a long video makes fewer, fuller requests and the chunks take similar time to process. The last items of a
+    chunk, up to ``overlap_tokens`` tokens, are repeated at the start of the next chunk to keep the context
+    around the boundary. Items larger than the budget are split first: text items at word boundaries with
+    :func:`split_text`, other items with ``split``.
+
+    :param list items: The items to pack, e.g. transcript sentences or scene documents
+    :param count_tokens: Function returning the number of tokens of a text
+    :param int token_budget: Maximum number of tokens of a chunk
+    :param int overlap_tokens: Tokens repeated between chunks, defaults to ``CHUNK_OVERLAP_TOKENS`` (100)
+    :param to_text: Function converting an item to the text sent to the LLM
+    :param split: Function called with an item and the budget, returning the smaller items it is split into
+    :return: List of chunks, each a list of items
+    :raises ValueError: If an item is larger than the budget and can't be split
+    """
+    if overlap_tokens is None:
+        overlap_tokens = env_int("CHUNK_OVERLAP_TOKENS", 100)
+    if not items:
+        return []
+
+    packed, sizes = [], []
+    for item in items:
+        size = count_tokens(to_text(item))
+        if size <= token_budget:
+            packed.append(item)
+            sizes.append(size)
+            continue
+        if split is not None:
+            parts = split(item, token_budget)
+        elif isinstance(item, str) and to_text is str:
+            parts = split_text(item, count_tokens, token_budget)
+        else:
+            raise ValueError(
+                f"An item of {size} tokens exceeds the token budget of {token_budget}"
+            )
+        for part in parts:
+            packed.append(part)
+            sizes.append(count_tokens(to_text(part)))
+    total = sum(sizes)
+    if total <= token_budget:
+        return [packed]
+
+    # Fewest chunks when every chunk is filled up to the budget, then the smallest chunk size which keeps that
+    # number of chunks, so the chunks come out balanced
+    overlap_tokens = min(overlap_tokens, token_budget // 4)
+    fewest = len(_pack(sizes, token_budget, overlap_tokens, token_budget))
+    low, high = math.ceil(total / fewest), token_budget
+    while low < high:
+        target = (low + high) // 2
+        if len(_pack(sizes, token_budget, overlap_tokens, target)) <= fewest:
+            high = target
+        else:
+            low = target + 1
+    ranges = _pack(sizes, token_budget, overlap_tokens, high)
+    return [packed[start:end] for start, end in ranges]
@@ -0,0 +1,150 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import logging
+import threading
+
+from director.constants import DATA_PATH
+from director.utils.env import env_int
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    """Content-addressed LRU cache persisted in a SQLite file.
+
+    Values are stored once per content hash and keys point to them, so identical values (e.g. the transcript
+    of a copied video) share storage. When the stored size exceeds ``max_bytes`` the least recently read keys
+    are evicted. Cache errors are logged and never raised, a failing cache behaves like an empty one.
+
+    :param str path: Path of the SQLite file, defaults to ``CACHE_PATH``/cache.db (~/.director/cache/cache.db)
+    :param int max_bytes: Maximum size of the stored values, defaults to ``CACHE_MAX_BYTES`` (256 MB)
+    """
+
+    def __init__(self, path: str = None, max_bytes: int = None):
+        self.path = path or os.path.join(
+            os.getenv("CACHE_PATH") or os.path.join(DATA_PATH, "cache"), "cache.db"
+        )
+        self.max_bytes = max_bytes or env_int("CACHE_MAX_BYTES", 256 * 1024 * 1024)
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS cache_blobs (
+                    hash TEXT PRIMARY KEY,
+                    data BLOB,
+                    size INTEGER
+                );
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    hash TEXT,
+                    accessed_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_cache_entries_accessed_at
+                    ON cache_entries (accessed_at);
+                """
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str):
+        """Return the cached value of the key, None if missing."""
+        try:
+            with self._lock, self.conn:
+                row = self.conn.execute(
+                    """
+                    SELECT cache_blobs.data FROM cache_entries
+                    JOIN cache_blobs ON cache_blobs.hash = cache_entries.hash
+                    WHERE cache_entries.key = ?
+                    """,
+                    (key,),
+                ).fetchone()
+                if row is None:
+                    return None
+                self.conn.execute(
+                    "UPDATE cache_entries SET accessed_at = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+            return json.loads(zlib.decompress(row[0]))
+        except Exception as e:
+            logger.warning(f"Failed to read {key} from cache: {e}")
+            return None
+
+    def set(self, key: str, value) -> None:
+        """Store a JSON serializable value under the key."""
+        try:
+            data = zlib.compress(json.dumps(value).encode("utf-8"))
+            content_hash = hashlib.sha256(data).hexdigest()
+            with self._lock, self.conn:
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO cache_blobs (hash, data, size) VALUES (?, ?, ?)",
+                    (content_hash, data, len(data)),
+                )
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries (key, hash, accessed_at) VALUES (?, ?, ?)",
+                    (key, content_hash, time.time()),
+                )
+                self._evict()
+        except Exception as e:
+            logger.warning(f"Failed to write {key} to cache: {e}")
+
+    def delete(self, key: str) -> None:
+        """Drop the key from the cache."""
+        try:
+            with self._lock, self.conn:
+                self.conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                self._delete_orphan_blobs()
+        except Exception as e:
+            logger.warning(f"Failed to delete {key} from cache: {e}")
+
+    def delete_prefix(self, prefix: str) -> None:
+        """Drop every key starting with the prefix."""
+        try:
+            with self._lock, self.conn:
+                self.conn.execute(
+                    "DELETE FROM cache_entries WHERE substr(key, 1, ?) = ?",
+                    (len(prefix), prefix),
+                )
+                self._delete_orphan_blobs()
+        except Exception as e:
+            logger.warning(f"Failed to delete {prefix}* from cache: {e}")
+
+    def _delete_orphan_blobs(self):
+        self.conn.execute(
+            "DELETE FROM cache_blobs WHERE hash NOT IN (SELECT hash FROM cache_entries)"
+        )
+
+    def _evict(self):
+        self._delete_orphan_blobs()
+        (total,) = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM cache_blobs"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = self.conn.execute(
+            """
+            SELECT cache_entries.key, cache_blobs.size FROM cache_entries
+            JOIN cache_blobs ON cache_blobs.hash = cache_entries.hash
+            ORDER BY cache_entries.accessed_at ASC
+            """
+        ).fetchall()
+        evicted = []
+        for key, size in rows[:-1]:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            # Shared blobs are only freed with their last key, this is an upper bound
+            total -= size
+        self.conn.executemany("DELETE FROM cache_entries WHERE key = ?", evicted)
+        self._delete_orphan_blobs()
+        logger.info(f"Evicted {len(evicted)} entries from cache")
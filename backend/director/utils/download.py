@@ -0,0 +1,153 @@
+"""Stream remote media files to disk."""
+
+import os
+import time
+import uuid
+import logging
+
+from urllib.parse import urlparse
+
+import requests
+
+from director.constants import DOWNLOADS_PATH
+from director.utils.cancellation import RunCancelled, current_cancel_event
+from director.utils.env import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_CHUNK_SIZE = env_int("DOWNLOAD_CHUNK_SIZE", 1024 * 1024)
+DOWNLOAD_RETRIES = env_int("DOWNLOAD_RETRIES", 3)
+DOWNLOAD_TIMEOUT = env_float("DOWNLOAD_TIMEOUT", 60)
+
+
+class DownloadError(Exception):
+    """Raised when a file could not be downloaded completely."""
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, requests.HTTPError):
+        status = error.response.status_code if error.response is not None else None
+        return status is None or status == 429 or status >= 500
+    return isinstance(error, (requests.RequestException, DownloadError))
+
+
+def _expected_size(response, offset: int):
+    """Total size of the file from the headers of a full or partial response, None if unknown."""
+    if response.headers.get("Content-Encoding", "identity") != "identity":
+        # The body is decoded while streaming, its size won't match the header
+        return None
+    if response.status_code == 206:
+        total = response.headers.get("Content-Range", "").rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+    length = response.headers.get("Content-Length")
+    return int(length) if length and length.isdigit() else None
+
+
+def download_file(
+    url: str,
+    save_at: str = None,
+    headers: dict = None,
+    content_type: str = None,
+    response: requests.Response = None,
+    chunk_size: int = None,
+    retries: int = None,
+    timeout: float = None,
+    cancel_event=None,
+) -> str:
+    """Download a file to disk without holding it in memory.
+
+    The body is streamed in chunks to a temporary file next to ``save_at``. If the connection drops, the
+    download is resumed with an HTTP ``Range`` request from the bytes already written, or restarted when the
+    server doesn't support ranges. The size is checked against ``Content-Length`` and the file is renamed into
+    place only once it is complete, so ``save_at`` never holds a partial file.
+
+    :param str url: URL of the file
+    :param str save_at: Path to save the file at, defaults to the name of the file in ``DOWNLOADS_PATH``
+    :param dict headers: Headers sent with every request
+    :param str content_type: Expected prefix of the ``Content-Type``, e.g. ``video``
+    :param response: Optional response of ``url`` already opened with ``stream=True``, used for the first attempt
+    :param int chunk_size: Bytes read at once, defaults to ``DOWNLOAD_CHUNK_SIZE`` (1 MB)
+    :param int retries: Attempts after a failed one, defaults to ``DOWNLOAD_RETRIES`` (3)
+    :param float timeout: Connect and read timeout in seconds, defaults to ``DOWNLOAD_TIMEOUT`` (60)
+    :param cancel_event: Optional ``threading.Event``, defaults to the event of the current run's cancellation
+        token. Once set the download stops and the partial file is removed
+    :return: Path of the downloaded file
+    :raises ValueError: If the ``Content-Type`` doesn't match ``content_type``
+    :raises DownloadError: If the file couldn't be downloaded completely
+    :raises RunCancelled: If the download was cancelled
+    """
+    chunk_size = chunk_size or DOWNLOAD_CHUNK_SIZE
+    retries = DOWNLOAD_RETRIES if retries is None else retries
+    timeout = timeout or DOWNLOAD_TIMEOUT
+    if cancel_event is None:
+        cancel_event = current_cancel_event()
+    if save_at is None:
+        name = os.path.basename(urlparse(url).path) or str(uuid.uuid4())
+        save_at = os.path.join(DOWNLOADS_PATH, name)
+    directory = os.path.dirname(save_at)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = os.path.join(
+        directory, f".{os.path.basename(save_at)}.{uuid.uuid4().hex}.part"
+    )
+
+    written = 0
+    expected = None
+    try:
+        with open(temp_path, "wb") as file:
+            for attempt in range(retries + 1):
+                try:
+                    if response is None:
+                        request_headers = dict(headers or {})
+                        if written:
+                            request_headers["Range"] = f"bytes={written}-"
+                        response = requests.get(
+                            url, headers=request_headers, stream=True, timeout=timeout
+                        )
+                    with response:
+                        if response.status_code == 416 and written == expected:
+                            break
+                        response.raise_for_status()
+                        if content_type and not response.headers.get(
+                            "Content-Type", ""
+                        ).startswith(content_type):
+                            raise ValueError(
+                                f"The URL does not point to a {content_type} file: {url}"
+                            )
+                        if response.status_code != 206 and written:
+                            # Range is not supported, start over
+                            file.seek(0)
+                            file.truncate()
+                            written = 0
+                        expected = _expected_size(response, written)
+                        for chunk in response.iter_content(chunk_size=chunk_size):
+                            if cancel_event is not None and cancel_event.is_set():
+                                raise RunCancelled()
+                            if chunk:
+                                file.write(chunk)
+                                written += len(chunk)
+                    if expected is None or written == expected:
+                        break
+                    raise DownloadError(
+                        f"Incomplete download of {url}: {written} of {expected} bytes"
+                    )
+                except Exception as e:
+                    if not _is_retryable(e) or attempt == retries:
+                        raise
+                    logger.warning(
+                        f"Download of {url} interrupted at {written} bytes, retrying: {e}"
+                    )
+                    response = None
+                    time.sleep(min(2**attempt, 10))
+            file.flush()
+            os.fsync(file.fileno())
+        if expected is not None and written != expected:
+            raise DownloadError(
+                f"Incomplete download of {url}: {written} of {expected} bytes"
+            )
+        os.replace(temp_path, save_at)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return save_at
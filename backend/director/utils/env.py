@@ -0,0 +1,35 @@
+"""Read numeric settings from the environment."""
+
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _env_number(name: str, default, cast):
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return cast(value.strip())
+    except ValueError:
+        logger.warning(f"Invalid value {value!r} for {name}, using {default}")
+        return default
+
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer setting, ``default`` if the variable is unset, empty or not a number.
+
+    :param str name: Name of the environment variable
+    :param int default: Value used when the variable can't be read
+    """
+    return _env_number(name, default, int)
+
+
+def env_float(name: str, default: float) -> float:
+    """Read a float setting, ``default`` if the variable is unset, empty or not a number.
+
+    :param str name: Name of the environment variable
+    :param float default: Value used when the variable can't be read
+    """
+    return _env_number(name, default, float)
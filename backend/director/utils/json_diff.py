@@ -0,0 +1,48 @@
+"""JSON patch style diffs used to send incremental updates over the socket."""
+
+
+def _escape(key) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def json_diff(old, new, path: str = "") -> list:
+    """Return the list of JSON patch (RFC 6902) operations that turn ``old`` into ``new``.
+
+    Only ``add``, ``remove`` and ``replace`` operations are produced. Lists are diffed by index,
+    which suits the append-mostly lists of output messages (actions, content, videos).
+
+    :param old: The previous JSON document.
+    :param new: The new JSON document.
+    :param str path: JSON pointer of the documents, used for recursion.
+    :return: List of patch operations.
+    :rtype: list
+    """
+    if old == new:
+        return []
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            key_path = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": key_path, "value": value})
+            else:
+                ops.extend(json_diff(old[key], value, key_path))
+        return ops
+
+    if isinstance(old, list) and isinstance(new, list):
+        ops = []
+        common = min(len(old), len(new))
+        for index in range(common):
+            ops.extend(json_diff(old[index], new[index], f"{path}/{index}"))
+        for index in range(common, len(new)):
+            ops.append({"op": "add", "path": f"{path}/{index}", "value": new[index]})
+        # Remove from the end so that the indexes of the remaining items stay valid
+        for index in range(len(old) - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{index}"})
+        return ops
+
+    return [{"op": "replace", "path": path, "value": new}]
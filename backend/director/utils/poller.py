@@ -0,0 +1,206 @@
+"""Shared poller for long running jobs of generation and dubbing providers."""
+
+import time
+import heapq
+import logging
+import itertools
+import threading
+import concurrent.futures
+
+from email.utils import parsedate_to_datetime
+
+from director.utils.env import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+
+class PollResult:
+    """Result of a single status check of a job.
+
+    :param bool done: Whether the job is finished
+    :param value: Result of the job, returned by the future when done
+    :param float retry_after: Seconds to wait before the next check, hinted by the provider
+    """
+
+    def __init__(self, done: bool = False, value=None, retry_after: float = None):
+        self.done = done
+        self.value = value
+        self.retry_after = retry_after
+
+    @classmethod
+    def complete(cls, value=None) -> "PollResult":
+        return cls(done=True, value=value)
+
+    @classmethod
+    def pending(cls, retry_after: float = None) -> "PollResult":
+        return cls(done=False, retry_after=retry_after)
+
+
+def retry_after_hint(response) -> float:
+    """Read the ``Retry-After`` header of an HTTP response, None if missing or invalid."""
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+class _PollJob:
+    def __init__(
+        self, check, interval, max_interval, backoff, deadline, cancel_event, name
+    ):
+        self.check = check
+        self.interval = interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.deadline = deadline
+        self.cancel_event = cancel_event
+        self.name = name
+        self.future = concurrent.futures.Future()
+
+
+class JobPoller:
+    """Poll many jobs with one scheduler thread and a small pool of workers.
+
+    Jobs are kept in a heap ordered by their next check time, a scheduler thread hands due checks to the
+    worker pool, so outstanding jobs don't hold a thread while they wait. After every pending check the
+    interval grows by ``backoff`` up to ``max_interval``, unless the provider hints when to check again.
+
+    :param int workers: Threads running the checks, defaults to ``POLLER_WORKERS`` (4)
+    """
+
+    def __init__(self, workers: int = None):
+        self.workers = workers or env_int("POLLER_WORKERS", 4)
+        self._heap = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._executor = None
+        self._thread = None
+
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="job-poller"
+            )
+            self._thread = threading.Thread(
+                target=self._run, name="job-poller-scheduler", daemon=True
+            )
+            self._thread.start()
+
+    def submit(
+        self,
+        check,
+        interval: float = 5,
+        max_interval: float = 60,
+        backoff: float = 1.5,
+        timeout: float = None,
+        initial_delay: float = None,
+        cancel_event=None,
+        name: str = "job",
+    ) -> concurrent.futures.Future:
+        """Poll a job until it is done.
+
+        :param check: Function checking the status of the job, returns a :class:`PollResult`
+        :param float interval: Seconds between the first checks
+        :param float max_interval: Maximum seconds between checks
+        :param float backoff: Factor applied to the interval after every pending check
+        :param float timeout: Seconds after which the future fails with ``TimeoutError``,
+            defaults to ``POLLER_TIMEOUT`` (3600)
+        :param float initial_delay: Seconds before the first check, defaults to interval
+        :param cancel_event: Optional ``threading.Event``, the job is cancelled once it is set
+        :param str name: Name of the job used in logs
+        :return: Future resolved with the value of the job, cancel it to stop polling
+        """
+        if timeout is None:
+            timeout = env_float("POLLER_TIMEOUT", 3600)
+        job = _PollJob(
+            check=check,
+            interval=interval,
+            max_interval=max_interval,
+            backoff=backoff,
+            deadline=time.monotonic() + timeout,
+            cancel_event=cancel_event,
+            name=name,
+        )
+        with self._condition:
+            self._start()
+        self._schedule(job, interval if initial_delay is None else initial_delay)
+        return job.future
+
+    def wait(self, check, **kwargs):
+        """Poll a job and block until it is done, see :meth:`submit`."""
+        return self.submit(check, **kwargs).result()
+
+    def _schedule(self, job, delay):
+        with self._condition:
+            heapq.heappush(
+                self._heap, (time.monotonic() + delay, next(self._counter), job)
+            )
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._heap:
+                    self._condition.wait()
+                due_at, _, job = self._heap[0]
+                delay = due_at - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                heapq.heappop(self._heap)
+            self._executor.submit(self._poll, job)
+
+    @staticmethod
+    def _finish(job, value=None, error=None):
+        if not job.future.set_running_or_notify_cancel():
+            return
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(value)
+
+    def _poll(self, job):
+        if job.future.cancelled():
+            return
+        if job.cancel_event is not None and job.cancel_event.is_set():
+            logger.info(f"Polling of {job.name} cancelled")
+            job.future.cancel()
+            return
+        if time.monotonic() >= job.deadline:
+            self._finish(job, error=TimeoutError(f"{job.name} timed out"))
+            return
+
+        try:
+            result = job.check()
+        except Exception as e:
+            self._finish(job, error=e)
+            return
+
+        if result.done:
+            self._finish(job, value=result.value)
+            return
+
+        delay = result.retry_after if result.retry_after is not None else job.interval
+        job.interval = min(job.interval * job.backoff, job.max_interval)
+        remaining = job.deadline - time.monotonic()
+        self._schedule(job, max(min(delay, remaining), 0))
+
+
+_poller = None
+_poller_lock = threading.Lock()
+
+
+def get_poller() -> JobPoller:
+    """Return the process-wide job poller."""
+    global _poller
+    with _poller_lock:
+        if _poller is None:
+            _poller = JobPoller()
+        return _poller
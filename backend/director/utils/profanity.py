@@ -0,0 +1,96 @@
+"""Local profanity matcher for English transcripts."""
+
+import os
+import re
+
+# Profane in any context with their compounds and inflections (e.g. "motherfucking", "bullshitter"),
+# matched against whole tokens so that words like "shitake" are left alone
+PROFANE_PATTERN = re.compile(
+    r"(?:mother|bull|horse|chicken|dip)?(?:fuck|shit)"
+    r"(?:s|ed|er|ers|ing|in|y|ty|tier|head|heads|face|faced)?"
+)
+
+# Profane in any context, matched as whole words
+PROFANE_WORDS = {
+    "asshole",
+    "assholes",
+    "bullshit",
+    "cunt",
+    "cunts",
+    "dickhead",
+    "dickheads",
+    "goddamn",
+    "goddamnit",
+    "jackass",
+    "motherfucker",
+    "wanker",
+    "wankers",
+}
+
+# Profane depending on the context, these are checked by the LLM
+AMBIGUOUS_WORDS = {
+    "arse",
+    "ass",
+    "asses",
+    "balls",
+    "bastard",
+    "bastards",
+    "bitch",
+    "bitches",
+    "bloody",
+    "bollocks",
+    "cock",
+    "crap",
+    "damn",
+    "damned",
+    "dick",
+    "dicks",
+    "hell",
+    "piss",
+    "pissed",
+    "prick",
+    "pussy",
+    "screw",
+    "screwed",
+    "slut",
+    "sucks",
+    "twat",
+    "whore",
+}
+
+_TOKEN_PATTERN = re.compile(r"[\w']+")
+
+
+class ProfanityMatcher:
+    """Classify transcript words as profane, ambiguous or clean.
+
+    Words are split into tokens and only whole tokens are matched, "ass" matches "ass" but not "class" or
+    "assistant". The word lists are English, transcripts in other languages have to be checked by the LLM.
+    Extra profane words can be added with the comma separated ``CENSOR_WORDS`` environment variable.
+    """
+
+    def __init__(self, extra_words: list = None):
+        if extra_words is None:
+            extra_words = os.getenv("CENSOR_WORDS", "").split(",")
+        self.profane_words = PROFANE_WORDS | {
+            word.strip().lower() for word in extra_words if word.strip()
+        }
+        self.ambiguous_words = AMBIGUOUS_WORDS - self.profane_words
+
+    @staticmethod
+    def tokens(word: str) -> list:
+        """Lowercase tokens of a transcript word, e.g. ``["half", "assed"]`` for ``Half-assed,``."""
+        return [
+            token.strip("'")
+            for token in _TOKEN_PATTERN.findall(word.lower())
+            if token.strip("'")
+        ]
+
+    def is_profane(self, word: str) -> bool:
+        return any(
+            token in self.profane_words or PROFANE_PATTERN.fullmatch(token)
+            for token in self.tokens(word)
+        )
+
+    def is_ambiguous(self, word: str) -> bool:
+        return any(token in self.ambiguous_words for token in self.tokens(word))
@@ -0,0 +1,27 @@
+from director.utils.cancellation import CancellationToken
+
+
+def test_removed_callbacks_are_released():
+    token = CancellationToken()
+    calls = []
+
+    remove = token.add_callback(lambda: calls.append("removed"))
+    token.add_callback(lambda: calls.append("kept"))
+    remove()
+    assert len(token._callbacks) == 1
+
+    token.cancel()
+    assert calls == ["kept"]
+    # Removing after the cancel, or twice, does nothing
+    remove()
+
+
+def test_callback_added_after_cancel_runs_right_away():
+    token = CancellationToken()
+    token.cancel()
+    calls = []
+
+    remove = token.add_callback(lambda: calls.append("late"))
+
+    assert calls == ["late"]
+    remove()
@@ -0,0 +1,54 @@
+from director.utils.chunking import chunk_by_tokens, split_text, timed_sentences
+
+
+def count_words(text):
+    return len(text.split())
+
+
+def words_transcript(count):
+    return [{"start": i, "end": i + 1, "text": f"word{i}"} for i in range(count)]
+
+
+def test_unpunctuated_transcript_fits_the_budget():
+    transcript = words_transcript(1000)
+    sentences = timed_sentences(transcript, count_words, 50)
+    assert len(sentences) == 20
+    assert sentences[0]["start"] == 0 and sentences[0]["end"] == 50
+    chunks = chunk_by_tokens(
+        sentences,
+        count_tokens=count_words,
+        token_budget=120,
+        overlap_tokens=0,
+        to_text=lambda sentence: sentence["text"],
+    )
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert count_words(" ".join(sentence["text"] for sentence in chunk)) <= 120
+
+
+def test_text_over_the_budget_is_split_at_word_boundaries():
+    text = " ".join(f"word{i}" for i in range(1000))
+    chunks = chunk_by_tokens([text], count_words, 100, overlap_tokens=10)
+    assert len(chunks) == 10
+    assert all(count_words(" ".join(chunk)) <= 100 for chunk in chunks)
+    assert " ".join(" ".join(chunk) for chunk in chunks) == text
+
+
+def test_long_word_is_cut():
+    parts = split_text("a" * 100, len, 30)
+    assert "".join(parts) == "a" * 100
+    assert all(len(part) <= 30 for part in parts)
+
+
+def test_chunks_are_the_fewest_and_balanced():
+    items = ["a b c"] * 7
+    chunks = chunk_by_tokens(items, count_words, 10, overlap_tokens=0)
+    assert len(chunks) == 3
+    assert all(count_words(" ".join(chunk)) <= 10 for chunk in chunks)
+
+
+def test_overlap_stays_within_the_budget():
+    items = [" ".join(["w"] * size) for size in (3, 9, 2, 8, 4, 10, 1, 6)]
+    chunks = chunk_by_tokens(items, count_words, 10, overlap_tokens=4)
+    assert all(count_words(" ".join(chunk)) <= 10 for chunk in chunks)
+    assert chunks[0][0] == items[0] and chunks[-1][-1] == items[-1]
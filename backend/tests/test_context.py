@@ -0,0 +1,75 @@
+from director.core.context import ContextWindow
+from director.core.session import ContextMessage, RoleTypes
+
+
+class FakeLLM:
+    context_token_budget = 300
+
+    def count_tokens(self, text):
+        return len(text.split())
+
+
+def words(count):
+    return " ".join(["word"] * count)
+
+
+def tool_call(call_id):
+    return [{"id": call_id, "type": "function", "function": {"name": "agent"}}]
+
+
+def test_recent_turns_over_the_budget_are_trimmed():
+    context = [
+        ContextMessage(role=RoleTypes.system, content=words(50)),
+        ContextMessage(role=RoleTypes.user, content=words(20)),
+        ContextMessage(role=RoleTypes.assistant, tool_calls=tool_call("1")),
+        ContextMessage(role=RoleTypes.tool, tool_call_id="1", content=words(2000)),
+        ContextMessage(role=RoleTypes.assistant, content=words(20)),
+        ContextMessage(role=RoleTypes.user, content=words(20)),
+        ContextMessage(role=RoleTypes.assistant, tool_calls=tool_call("2")),
+        ContextMessage(role=RoleTypes.tool, tool_call_id="2", content=words(2000)),
+    ]
+    window = ContextWindow(FakeLLM(), max_tool_output_tokens=100)
+
+    messages = window.build(context)
+
+    total = sum(window.count_message_tokens(message) for message in messages)
+    assert total <= window.token_budget
+    assert messages[0]["role"] == RoleTypes.system
+    # The latest user message is kept and tool calls keep their results
+    assert context[5].to_llm_msg() in messages
+    call_ids = [
+        call["id"]
+        for message in messages
+        if message.get("tool_calls")
+        for call in message["tool_calls"]
+    ]
+    result_ids = [
+        message["tool_call_id"]
+        for message in messages
+        if message["role"] == RoleTypes.tool
+    ]
+    assert call_ids == result_ids
+
+
+def test_trimmed_context_starts_with_a_user_message():
+    context = [
+        ContextMessage(role=RoleTypes.system, content=words(50)),
+        ContextMessage(role=RoleTypes.user, content=words(20)),
+        ContextMessage(role=RoleTypes.assistant, tool_calls=tool_call("1")),
+        ContextMessage(role=RoleTypes.tool, tool_call_id="1", content=words(2000)),
+        ContextMessage(role=RoleTypes.assistant, content=words(20)),
+        ContextMessage(role=RoleTypes.user, content=words(20)),
+        ContextMessage(role=RoleTypes.assistant, content=words(150)),
+    ]
+    window = ContextWindow(FakeLLM(), max_tool_output_tokens=100)
+
+    messages = window.build(context)
+
+    total = sum(window.count_message_tokens(message) for message in messages)
+    assert total <= window.token_budget
+    # The first turn is dropped whole instead of leaving its answers without the question
+    assert [message["role"] for message in messages] == [
+        RoleTypes.system,
+        RoleTypes.user,
+        RoleTypes.assistant,
+    ]
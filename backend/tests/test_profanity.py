@@ -0,0 +1,21 @@
+from director.utils.profanity import ProfanityMatcher
+
+
+def test_only_whole_tokens_match():
+    matcher = ProfanityMatcher(extra_words=[])
+
+    for word in ("class", "assistant", "Passing,", "shitake", "Scunthorpe", "hello"):
+        assert not matcher.is_profane(word), word
+        assert not matcher.is_ambiguous(word), word
+
+    for word in ("Fuck!", "motherfucking", "bullshit.", "fuckin'", "Shitty"):
+        assert matcher.is_profane(word), word
+    assert matcher.is_ambiguous("ass,")
+    assert matcher.is_ambiguous("Half-ass")
+
+
+def test_extra_words_match_whole_tokens():
+    matcher = ProfanityMatcher(extra_words=[" Frak ", ""])
+
+    assert matcher.is_profane("Frak!")
+    assert not matcher.is_profane("frakking")
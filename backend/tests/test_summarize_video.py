@@ -0,0 +1,96 @@
+from director.agents import summarize_video
+from director.agents.summarize_video import SummarizeVideoAgent
+
+
+class FakeLLM:
+    chat_model = "fake"
+    context_token_budget = 1000
+    chunk_token_budget = 200
+    max_concurrent_requests = 4
+
+    def __init__(self):
+        self.prompts = []
+
+    def count_tokens(self, text):
+        return len(text.split())
+
+    def chat_completions(self, messages, **kwargs):
+        self.prompts.append(messages[0]["content"])
+        return type("LLMResponse", (), {"status": True, "content": "summary"})()
+
+
+class FakeCache:
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+
+class FakeOutputMessage:
+    def __init__(self):
+        self.actions = []
+        self.content = []
+
+    def push_update(self, **kwargs):
+        pass
+
+    def publish(self):
+        pass
+
+
+class FakeTextContent:
+    status_message = None
+
+
+def test_map_windows_stay_within_the_budget(monkeypatch):
+    monkeypatch.setattr(summarize_video, "index_cache", FakeCache())
+    agent = SummarizeVideoAgent.__new__(SummarizeVideoAgent)
+    agent.llm = FakeLLM()
+    agent.output_message = FakeOutputMessage()
+    # Speech recognition output without punctuation
+    transcript = [{"start": i, "end": i + 1, "text": f"word{i}"} for i in range(5000)]
+    windows = []
+    original = agent._summarize_window
+
+    def summarize_window(video_id, window):
+        windows.append(window)
+        return original(video_id, window)
+
+    agent._summarize_window = summarize_window
+    agent._map_transcript("video", transcript, "Summarize", FakeTextContent())
+
+    assert len(windows) >= 5000 // agent.llm.chunk_token_budget
+    for window in windows:
+        text = " ".join(sentence["text"] for sentence in window)
+        assert agent.llm.count_tokens(text) <= agent.llm.chunk_token_budget
+
+
+def summarize(monkeypatch, words):
+    transcript = [{"start": i, "end": i + 1, "text": f"word{i}"} for i in range(words)]
+    fake_tool = type(
+        "FakeVideoDBTool", (), {"get_transcript": lambda *a, **k: transcript}
+    )
+    monkeypatch.setattr(summarize_video, "index_cache", FakeCache())
+    monkeypatch.setattr(summarize_video, "VideoDBTool", lambda **kwargs: fake_tool())
+    agent = SummarizeVideoAgent.__new__(SummarizeVideoAgent)
+    agent.agent_name = "summarize_video"
+    agent.llm = FakeLLM()
+    agent.output_message = FakeOutputMessage()
+    response = agent.run("collection", "video", "Summarize the key points")
+    assert response.data["summary"] == "summary"
+    return agent.llm.prompts
+
+
+def test_transcripts_within_the_context_budget_are_summarized_at_once(monkeypatch):
+    # Over the chunk budget, but the transcript and the prompt fit in one request
+    prompts = summarize(monkeypatch, 900)
+
+    assert len(prompts) == 1
+    assert prompts[0].endswith("Summarize the key points")
+
+
+def test_transcripts_over_the_context_budget_are_mapped(monkeypatch):
+    prompts = summarize(monkeypatch, 1000)
+
+    assert len(prompts) > 1